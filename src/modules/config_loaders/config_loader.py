@@ -1,6 +1,8 @@
 import json
 import os
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 
 
 class ConfigLoaderInterface(ABC):
@@ -62,5 +64,91 @@ class SimCaseConfigs:
     class FileNames:
         LAMMPS_LOG_FILE_TEMPLATE_NAME = 'log.lammps'
         GLOBAL_PROPS_TIME_AVERAGED = 'GlobalPropsTimeAvg.prop'
+        # Only needed to read the free-energy data, see SimCaseConfigResolver.require().
         NEFE_IRWORK_BACKWARD_FILENAME = None
         NEFE_IRWORK_FORWARD_FILENAME = None
+
+
+class FrozenConfigs(Mapping):
+    """
+    Read-only, picklable view of a nested configs dict; nested sections are returned as FrozenConfigs as well.
+    """
+
+    def __init__(self, configs_dict):
+        self._configs_dict = {key: FrozenConfigs(value) if isinstance(value, dict) else value
+                              for key, value in configs_dict.items()}
+
+    def __getitem__(self, key):
+        return self._configs_dict[key]
+
+    def __iter__(self):
+        return iter(self._configs_dict)
+
+    def __len__(self):
+        return len(self._configs_dict)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._configs_dict!r})"
+
+    def to_dict(self):
+        return {key: value.to_dict() if isinstance(value, FrozenConfigs) else value
+                for key, value in self._configs_dict.items()}
+
+
+class SimCaseConfigResolver:
+    """
+    Resolves the configs of the sim cases once per process.
+
+    The SimCaseConfigs constants are the defaults; the values of the JSON config file(s) override them. A key with a
+    default value must not be overridden with null. The keys defaulting to None are optional and only checked for the
+    projects that need them, either by passing them as required_keys to resolve() or through require(). Missing keys
+    raise a KeyError when the configs are resolved (i.e. when a project starts) instead of when a sim case first needs
+    them. All sim cases share the same resolved, immutable FrozenConfigs.
+    """
+    _resolved_configs = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def resolve(cls, config_loader: ConfigLoaderInterface, required_keys=()) -> FrozenConfigs:
+        """
+        :param config_loader: Loader of the JSON config file(s)
+        :param required_keys: Optional keys ('Section.KEY') the caller needs on top of the keys with a default value
+        """
+        configs_path = config_loader.configs_path
+        configs_key = tuple(os.path.abspath(path) for path in configs_path) if isinstance(configs_path, (list, tuple)) \
+            else os.path.abspath(configs_path)
+        with cls._lock:
+            if configs_key not in cls._resolved_configs:
+                cls._resolved_configs[configs_key] = cls._merge_and_validate(config_loader.load_configs())
+            configs = cls._resolved_configs[configs_key]
+        return cls.require(configs, required_keys)
+
+    @staticmethod
+    def require(configs: FrozenConfigs, required_keys) -> FrozenConfigs:
+        missing_keys = [key for key in required_keys
+                        if configs.get(key.split('.', 1)[0], {}).get(key.split('.', 1)[1]) is None]
+        if missing_keys:
+            raise KeyError(f'Missing sim-case configs: {", ".join(missing_keys)}')
+        return configs
+
+    @staticmethod
+    def get_default_configs(configs_class=SimCaseConfigs):
+        return {section_name: {key: value for key, value in vars(section).items() if not key.startswith('_')}
+                for section_name, section in vars(configs_class).items() if isinstance(section, type)}
+
+    @classmethod
+    def _merge_and_validate(cls, file_configs):
+        configs_dict = cls.get_default_configs()
+        for section_name, section in file_configs.items():
+            if isinstance(section, dict) and isinstance(configs_dict.get(section_name), dict):
+                configs_dict[section_name].update(section)
+            else:
+                configs_dict[section_name] = section
+
+        missing_keys = [f'{section_name}.{key}' for section_name, section in cls.get_default_configs().items()
+                        for key, default_value in section.items()
+                        if default_value is not None and configs_dict[section_name].get(key) is None]
+        if missing_keys:
+            raise KeyError(f'Missing sim-case configs: {", ".join(missing_keys)}')
+
+        return FrozenConfigs(configs_dict)
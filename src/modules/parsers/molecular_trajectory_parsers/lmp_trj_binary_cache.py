@@ -0,0 +1,137 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from src.modules.parsers.molecular_trajectory_parsers.mol_traj_parser_interface import MolTrajParserInterface
+
+
+class LAMMPSTrajBinaryCache:
+    """
+    Opt-in binary sidecar of a LAMMPS text trajectory, for trajectories that are analysed many times.
+
+    The sidecar directory (<trajectory>.bincache) holds the float32 coordinates (frames x atoms x 3), the atom ids and
+    small-int atom types, and the per-frame time-steps and boxes as .npy files, which are memory-mapped when loaded.
+    Atoms are stored sorted by id. The sidecar is rebuilt when the size or the modification time of the trajectory
+    changes.
+    """
+    CACHE_DIR_SUFFIX = '.bincache'
+    META_FILE_NAME = 'meta.json'
+    CACHE_FORMAT_VERSION = 1
+    COORDINATE_COLUMNS = (('x', 'y', 'z'), ('xu', 'yu', 'zu'), ('xs', 'ys', 'zs'), ('xsu', 'ysu', 'zsu'))
+    ARRAY_NAMES = ('timesteps', 'box_bounds', 'box_tilt', 'ids', 'types', 'coordinates')
+
+    def __init__(self, lmp_trj_parser: MolTrajParserInterface):
+        self._lmp_trj_parser = lmp_trj_parser
+        self._trj_file_path = lmp_trj_parser.general_file_reader.input_file_path
+
+    @property
+    def cache_dir_path(self):
+        return self._trj_file_path + self.CACHE_DIR_SUFFIX
+
+    def _get_source_signature(self):
+        file_stat = os.stat(self._trj_file_path)
+        return {'source_size': file_stat.st_size, 'source_mtime_ns': file_stat.st_mtime_ns,
+                'version': self.CACHE_FORMAT_VERSION}
+
+    def is_valid(self):
+        meta_file_path = os.path.join(self.cache_dir_path, self.META_FILE_NAME)
+        if not os.path.isfile(meta_file_path):
+            return False
+
+        try:
+            with open(meta_file_path, 'r') as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return False
+
+        source_signature = self._get_source_signature()
+        return all(meta.get(key) == value for key, value in source_signature.items())
+
+    def load(self):
+        """
+        Memory-map the cached arrays, (re)building the cache first if it is missing or stale.
+        :return: Dict with the read-only arrays 'timesteps', 'box_bounds' (frames x 3 x 2), 'box_tilt' (frames x 3),
+        'ids', 'types', 'coordinates' (frames x atoms x 3) and the name of the 'coordinate_columns' they came from
+        """
+        if not self.is_valid():
+            self.build()
+
+        with open(os.path.join(self.cache_dir_path, self.META_FILE_NAME), 'r') as meta_file:
+            meta = json.load(meta_file)
+
+        cached_data = {name: np.load(os.path.join(self.cache_dir_path, f'{name}.npy'), mmap_mode='r')
+                       for name in self.ARRAY_NAMES}
+        cached_data['coordinate_columns'] = meta['coordinate_columns']
+        return cached_data
+
+    def build(self):
+        source_signature = self._get_source_signature()
+        num_frames = self._lmp_trj_parser.num_frames
+        if num_frames == 0:
+            raise ValueError(f'No frames found in {self._trj_file_path}')
+
+        # Build in a private directory and swap it in at the end, so readers never see a half-written cache.
+        tmp_cache_dir_path = f'{self.cache_dir_path}.{os.getpid()}.tmp'
+        shutil.rmtree(tmp_cache_dir_path, ignore_errors=True)
+        os.makedirs(tmp_cache_dir_path)
+        try:
+            meta = self._write_arrays(tmp_cache_dir_path, num_frames)
+            meta.update(source_signature)
+            with open(os.path.join(tmp_cache_dir_path, self.META_FILE_NAME), 'w') as meta_file:
+                json.dump(meta, meta_file)
+
+            shutil.rmtree(self.cache_dir_path, ignore_errors=True)
+            os.rename(tmp_cache_dir_path, self.cache_dir_path)
+        except Exception:
+            shutil.rmtree(tmp_cache_dir_path, ignore_errors=True)
+            raise
+
+    def _write_arrays(self, cache_dir_path, num_frames):
+        timesteps = np.empty(num_frames, dtype=np.int64)
+        box_bounds = np.zeros((num_frames, 3, 2), dtype=np.float64)
+        box_tilt = np.zeros((num_frames, 3), dtype=np.float64)
+        coordinates = None
+        coordinate_columns = None
+        num_atoms = None
+
+        for frame_number, frame in enumerate(self._lmp_trj_parser.iter_frames()):
+            atoms = frame['atoms']
+            if coordinates is None:
+                num_atoms = len(atoms)
+                coordinate_columns = self._get_coordinate_columns(atoms.dtype.names)
+                first_frame_atoms = np.sort(atoms, order='id') if 'id' in atoms.dtype.names else atoms
+                ids = first_frame_atoms['id'] if 'id' in atoms.dtype.names else np.arange(1, num_atoms + 1)
+                np.save(os.path.join(cache_dir_path, 'ids.npy'), ids.astype(np.int64))
+                types = first_frame_atoms['type'] if 'type' in atoms.dtype.names else np.ones(num_atoms)
+                np.save(os.path.join(cache_dir_path, 'types.npy'),
+                        types.astype(np.min_scalar_type(int(types.max()))))
+                # Coordinates are streamed frame by frame into the memory-mapped .npy file.
+                coordinates = np.lib.format.open_memmap(os.path.join(cache_dir_path, 'coordinates.npy'), mode='w+',
+                                                        dtype=np.float32, shape=(num_frames, num_atoms, 3))
+            elif len(atoms) != num_atoms:
+                raise ValueError(f'The binary cache needs a constant number of atoms; frame {frame_number} of '
+                                 f'{self._trj_file_path} has {len(atoms)} atoms instead of {num_atoms}')
+
+            order = np.argsort(atoms['id'], kind='stable') if 'id' in atoms.dtype.names else slice(None)
+            for dim, column in enumerate(coordinate_columns):
+                coordinates[frame_number, :, dim] = atoms[column][order]
+            timesteps[frame_number] = frame['time-step']
+            if frame['box'] is not None:
+                box_bounds[frame_number] = frame['box']['bounds']
+                box_tilt[frame_number] = frame['box']['tilt'] if frame['box']['tilt'] is not None else 0.0
+
+        coordinates.flush()
+        del coordinates
+        np.save(os.path.join(cache_dir_path, 'timesteps.npy'), timesteps)
+        np.save(os.path.join(cache_dir_path, 'box_bounds.npy'), box_bounds)
+        np.save(os.path.join(cache_dir_path, 'box_tilt.npy'), box_tilt)
+
+        return {'num_frames': num_frames, 'num_atoms': num_atoms, 'coordinate_columns': list(coordinate_columns)}
+
+    def _get_coordinate_columns(self, column_names):
+        for coordinate_columns in self.COORDINATE_COLUMNS:
+            if all(column in column_names for column in coordinate_columns):
+                return coordinate_columns
+        raise ValueError(f'No coordinate columns found in {self._trj_file_path} (columns: {column_names})')
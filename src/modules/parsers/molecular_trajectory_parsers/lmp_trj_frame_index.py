@@ -0,0 +1,145 @@
+import mmap
+import os
+
+import numpy as np
+
+from src.utilities.files.compression import is_compressed, open_file
+
+
+class LAMMPSTrajFrameIndex:
+    """
+    Byte-offset index of the frames of a LAMMPS text trajectory (.lammpstrj).
+
+    The index is built once by scanning the memory-mapped trajectory for the "ITEM: TIMESTEP" records and is
+    persisted next to the trajectory. A persisted index is only reused while the size and the modification time of
+    the trajectory are unchanged. For compressed trajectories the offsets refer to the decompressed stream.
+    """
+    FRAME_LABEL = b'ITEM: TIMESTEP'
+    INDEX_FILE_SUFFIX = '.frameidx.npz'
+
+    def __init__(self, trj_file_path):
+        self._trj_file_path = trj_file_path
+        self._timesteps = None
+        self._offsets = None
+        self._timestep_to_frame = None
+
+    @property
+    def trj_file_path(self):
+        return self._trj_file_path
+
+    @property
+    def index_file_path(self):
+        return self._trj_file_path + self.INDEX_FILE_SUFFIX
+
+    @property
+    def timesteps(self) -> np.ndarray:
+        self.load()
+        return self._timesteps
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """Start offset of every frame followed by the size of the trajectory (length: number of frames + 1)."""
+        self.load()
+        return self._offsets
+
+    def __len__(self):
+        return len(self.timesteps)
+
+    def load(self):
+        if self._offsets is not None:
+            return self
+
+        file_stat = os.stat(self.trj_file_path)
+        if not self._read_persisted_index(file_stat):
+            self._build(file_stat)
+            self._persist_index(file_stat)
+
+        return self
+
+    def get_frame_bounds(self, frame_number):
+        offsets = self.offsets
+        return int(offsets[frame_number]), int(offsets[frame_number + 1])
+
+    def get_frame_number(self, timestep):
+        if self._timestep_to_frame is None:
+            # The first frame wins if a timestep is repeated (e.g. a run restarted from that timestep).
+            self._timestep_to_frame = {}
+            for frame_number, frame_timestep in enumerate(self.timesteps.tolist()):
+                self._timestep_to_frame.setdefault(frame_timestep, frame_number)
+
+        if timestep not in self._timestep_to_frame:
+            raise KeyError(f'Time-step {timestep} not found in {self.trj_file_path}')
+        return self._timestep_to_frame[timestep]
+
+    def _build(self, file_stat):
+        if is_compressed(self.trj_file_path):
+            self._build_from_stream()
+            return
+
+        timesteps = []
+        offsets = []
+        if file_stat.st_size > 0:
+            with open(self.trj_file_path, 'rb') as trj_file, \
+                    mmap.mmap(trj_file.fileno(), 0, access=mmap.ACCESS_READ) as trj_mmap:
+                position = trj_mmap.find(self.FRAME_LABEL)
+                while position != -1:
+                    if position == 0 or trj_mmap[position - 1] == ord('\n'):
+                        value_start = trj_mmap.find(b'\n', position) + 1
+                        value_end = trj_mmap.find(b'\n', value_start)
+                        value_end = value_end if value_end != -1 else file_stat.st_size
+                        offsets.append(position)
+                        timesteps.append(int(trj_mmap[value_start:value_end]))
+                    position = trj_mmap.find(self.FRAME_LABEL, position + len(self.FRAME_LABEL))
+
+        self._timesteps = np.array(timesteps, dtype=np.int64)
+        self._offsets = np.array(offsets + [file_stat.st_size], dtype=np.int64)
+        self._timestep_to_frame = None
+
+    def _build_from_stream(self):
+        timesteps = []
+        offsets = []
+        offset = 0
+        with open_file(self.trj_file_path, 'rb') as trj_file:
+            read_timestep = False
+            for line in trj_file:
+                if read_timestep:
+                    timesteps.append(int(line))
+                    read_timestep = False
+                elif line.startswith(self.FRAME_LABEL):
+                    offsets.append(offset)
+                    read_timestep = True
+                offset += len(line)
+
+        self._timesteps = np.array(timesteps, dtype=np.int64)
+        self._offsets = np.array(offsets + [offset], dtype=np.int64)
+        self._timestep_to_frame = None
+
+    def _read_persisted_index(self, file_stat):
+        if not os.path.isfile(self.index_file_path):
+            return False
+
+        try:
+            with np.load(self.index_file_path) as persisted_index:
+                if int(persisted_index['source_size']) != file_stat.st_size or \
+                        int(persisted_index['source_mtime_ns']) != file_stat.st_mtime_ns:
+                    return False
+                self._timesteps = persisted_index['timesteps']
+                self._offsets = persisted_index['offsets']
+        except (OSError, ValueError, KeyError):
+            return False
+
+        self._timestep_to_frame = None
+        return True
+
+    def _persist_index(self, file_stat):
+        # Write to a temporary file first so concurrent readers never see a partial index.
+        tmp_index_file_path = f'{self.index_file_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_index_file_path, 'wb') as index_file:
+                np.savez(index_file, timesteps=self._timesteps, offsets=self._offsets,
+                         source_size=np.int64(file_stat.st_size), source_mtime_ns=np.int64(file_stat.st_mtime_ns))
+            os.replace(tmp_index_file_path, self.index_file_path)
+        except OSError as e:
+            print(f"Warning: could not persist the frame index of {self.trj_file_path}: {e}")
+            if os.path.exists(tmp_index_file_path):
+                os.remove(tmp_index_file_path)
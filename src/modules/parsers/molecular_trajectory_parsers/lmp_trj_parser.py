@@ -1,14 +1,33 @@
+import io
+import mmap
+
+import numpy as np
 import pandas as pd
 
 from src.modules.parsers.molecular_trajectory_parsers.mol_traj_parser_interface import MolTrajParserInterface
+from src.modules.parsers.molecular_trajectory_parsers.lmp_trj_frame_index import LAMMPSTrajFrameIndex
 from utilities.files.file_reader import GeneralFileReaderInterface, GeneralFileReader
+from src.utilities.files.compression import is_compressed, open_file
 
 
 class LAMMPSTrajParser(MolTrajParserInterface):
+    # Per-atom dump columns that are not floating point; every other column is decoded as float64.
+    ATOM_COLUMN_DTYPES = {'id': np.int64, 'mol': np.int64, 'type': np.int32, 'proc': np.int32, 'procp1': np.int32,
+                          'ix': np.int32, 'iy': np.int32, 'iz': np.int32, 'element': 'U8'}
 
     def __init__(self, general_file_reader: GeneralFileReaderInterface):
         self._general_file_reader = general_file_reader
         self._parsed_data = []
+        self._frame_index = None
+        self._trj_file = None
+        self._trj_mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
 
     @property
     def general_file_reader(self):
@@ -18,44 +37,160 @@ class LAMMPSTrajParser(MolTrajParserInterface):
     def parsed_data(self):
         return self._parsed_data
 
+    @property
+    def frame_index(self) -> LAMMPSTrajFrameIndex:
+        if self._frame_index is None:
+            self._frame_index = LAMMPSTrajFrameIndex(self.general_file_reader.input_file_path).load()
+        return self._frame_index
+
+    @property
+    def num_frames(self):
+        return len(self.frame_index)
+
+    def _read_bytes(self, start, end):
+        trj_file_path = self.general_file_reader.input_file_path
+        if self._trj_file is None:
+            self._trj_file = open_file(trj_file_path, 'rb')
+            if not is_compressed(trj_file_path):
+                self._trj_mmap = mmap.mmap(self._trj_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._trj_mmap is not None:
+            return self._trj_mmap[start:end]
+
+        # Compressed trajectories are read from the decompressed stream. Seeking forward (sequential access) is cheap,
+        # seeking backward restarts the decompression.
+        self._trj_file.seek(start)
+        return self._trj_file.read(end - start)
+
+    def close(self):
+        if self._trj_mmap is not None:
+            self._trj_mmap.close()
+            self._trj_mmap = None
+        if self._trj_file is not None:
+            self._trj_file.close()
+            self._trj_file = None
+
+    def get_frame(self, frame_number):
+        # Negative frame numbers count from the end, as for lists.
+        frame_number = range(self.num_frames)[frame_number]
+        return self._decode_frame(frame_number)
+
+    def get_frame_by_timestep(self, timestep):
+        return self.get_frame(self.frame_index.get_frame_number(timestep))
+
+    def iter_frames(self, start=None, stop=None, stride=None, timestep_range=None):
+        """
+        Yield the selected frames of the trajectory one at a time.
+
+        Frames outside the selection are never decoded, and only one decoded frame is held at a time.
+
+        :param start: First frame number (slice semantics)
+        :param stop: Frame number to stop before (slice semantics)
+        :param stride: Step between the selected frame numbers
+        :param timestep_range: Optional (min, max) time-steps, both inclusive; either bound may be None
+        :return: Generator of frame dicts, see _decode_frame()
+        """
+        frame_numbers = np.arange(self.num_frames)[start:stop:stride]
+        if timestep_range is not None:
+            min_timestep, max_timestep = timestep_range
+            frame_timesteps = self.frame_index.timesteps[frame_numbers]
+            in_range = np.ones(len(frame_numbers), dtype=bool)
+            in_range &= frame_timesteps >= min_timestep if min_timestep is not None else True
+            in_range &= frame_timesteps <= max_timestep if max_timestep is not None else True
+            frame_numbers = frame_numbers[in_range]
+
+        for frame_number in frame_numbers:
+            yield self._decode_frame(int(frame_number))
+
     def parse(self):
         if self.parsed_data:
             return self.parsed_data
 
-        timestep = None
-        lines = self.general_file_reader.file_lines
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            if line.startswith("ITEM: TIMESTEP"):
-                timestep = int(lines[i + 1].strip())
-                i += 2  # Move past the TIMESTEP line and its value
-            elif line.startswith("ITEM: ATOMS"):
-                # Extracting column names from this line
-                columns = line.split()[2:]  # The column names start from the third element
-                atoms_data = []
-                i += 1  # Move to the first line of atom data
-                while not lines[i].startswith("ITEM:"):
-                    atom_data = lines[i].split()
-                    atoms_data.append(atom_data)
-                    i += 1
-                    if i >= len(lines):  # Check to prevent index out of range
-                        break
-                # Convert atom data to DataFrame and append to trajectory data
-                if atoms_data:
-                    df = pd.DataFrame(atoms_data, columns=columns).apply(pd.to_numeric, errors='ignore')
-                    self.parsed_data.append({'time-step': timestep, 'atoms': df})
-                continue  # Continue to the next iteration of the loop
-            i += 1  # General increment for the while loop
+        for frame_number in range(self.num_frames):
+            self.parsed_data.append(self._decode_frame(frame_number))
 
         return self.parsed_data
 
+    @classmethod
+    def get_atoms_dtype(cls, columns):
+        return np.dtype([(column, cls.ATOM_COLUMN_DTYPES.get(column, np.float64)) for column in columns])
+
+    def _decode_frame(self, frame_number):
+        """
+        Decode one frame into a dict with the keys:
+        'time-step': the time-step of the frame,
+        'box': dict with 'bounds' (3x2 array of the lo/hi of x, y and z; for triclinic boxes the lo/hi of the
+        parallelepiped, not of its bounding box), 'tilt' (xy, xz, yz or None for orthogonal boxes) and 'boundary',
+        'atoms': structured array with one record per atom and one typed field per dumped column.
+        """
+        start, end = self.frame_index.get_frame_bounds(frame_number)
+        frame_bytes = self._read_bytes(start, end)
+        atoms_label_start = frame_bytes.find(b'ITEM: ATOMS')
+        atoms_start = frame_bytes.find(b'\n', atoms_label_start) + 1
+        if atoms_label_start == -1 or atoms_start == 0:
+            raise ValueError(f'Frame {frame_number} of {self.general_file_reader.input_file_path} has no atoms section')
+
+        header_lines = [line.strip() for line in frame_bytes[:atoms_start].decode().splitlines()]
+        timestep = int(header_lines[header_lines.index('ITEM: TIMESTEP') + 1])
+        num_atoms = int(header_lines[header_lines.index('ITEM: NUMBER OF ATOMS') + 1])
+        columns = header_lines[-1].split()[2:]
+        box = self._parse_box(header_lines)
+
+        atoms_dtype = self.get_atoms_dtype(columns)
+        atom_columns = self._read_atom_columns(frame_bytes[atoms_start:], num_atoms, atoms_dtype)
+        if len(atom_columns) != num_atoms:
+            raise ValueError(f'Frame {frame_number} of {self.general_file_reader.input_file_path} has '
+                             f'{len(atom_columns)} atom lines, expected {num_atoms}')
+
+        atoms = np.empty(num_atoms, dtype=atoms_dtype)
+        for column in columns:
+            atoms[column] = atom_columns[column].to_numpy()
+
+        return {'time-step': timestep, 'box': box, 'atoms': atoms}
+
+    @staticmethod
+    def _read_atom_columns(atoms_bytes, num_atoms, atoms_dtype):
+        # The typed columns are tokenized by the C parser of pandas. LAMMPS writes one space between values (and a
+        # trailing one), for which the single-space separator is much faster than the whitespace regex; padded
+        # custom formats fall back to the latter.
+        column_types = {name: str if atoms_dtype[name].kind == 'U' else atoms_dtype[name] for name in atoms_dtype.names}
+        read_kwargs = dict(header=None, names=list(atoms_dtype.names), usecols=range(len(atoms_dtype.names)),
+                           nrows=num_atoms, dtype=column_types, na_filter=False)
+        first_line = atoms_bytes[:atoms_bytes.find(b'\n')]
+        if not first_line.startswith(b' ') and b'  ' not in first_line:
+            try:
+                return pd.read_csv(io.BytesIO(atoms_bytes), sep=' ', engine='c', **read_kwargs)
+            except (ValueError, pd.errors.ParserError):
+                pass
+        return pd.read_csv(io.BytesIO(atoms_bytes), sep=r'\s+', **read_kwargs)
+
+    @staticmethod
+    def _parse_box(header_lines):
+        box_label_line_num = next((line_num for line_num, line in enumerate(header_lines)
+                                   if line.startswith('ITEM: BOX BOUNDS')), None)
+        if box_label_line_num is None:
+            return None
+
+        box_label_items = header_lines[box_label_line_num].split()[3:]
+        box_values = np.array([header_lines[box_label_line_num + i].split() for i in range(1, 4)], dtype=np.float64)
+        if box_values.shape[1] == 2:
+            return {'bounds': box_values, 'tilt': None, 'boundary': box_label_items}
+
+        # Triclinic dumps give the bounding box of the parallelepiped, which is converted back to its lo/hi.
+        xy, xz, yz = box_values[:, 2]
+        bounds = box_values[:, :2].copy()
+        bounds[0, 0] -= min(0.0, xy, xz, xy + xz)
+        bounds[0, 1] -= max(0.0, xy, xz, xy + xz)
+        bounds[1, 0] -= min(0.0, yz)
+        bounds[1, 1] -= max(0.0, yz)
+        return {'bounds': bounds, 'tilt': np.array([xy, xz, yz]), 'boundary': box_label_items[3:]}
+
 
 if __name__ == "__main__":
     path_to_lmp_trj_file = "/Users/unconvrs/Documents/GitHub/co2hydrates/nefe_calc/data/exp_match/DHdiss/H_co2/base_case_ff/simulations/water_co2_sw_001/NPT_Trajectory.lammpstrj"
     file_reader = GeneralFileReader(path_to_lmp_trj_file)
-    file_reader.read()
-    lmp_trj_parser = LAMMPSTrajParser(file_reader)
-    lmp_trj_parser.parse()
-    print(lmp_trj_parser.parsed_data[0]['time-step'])
+    with LAMMPSTrajParser(file_reader) as lmp_trj_parser:
+        print(lmp_trj_parser.get_frame(-1)['time-step'])
+        lmp_trj_parser.parse()
+        print(lmp_trj_parser.parsed_data[0]['time-step'])
     pass
@@ -8,6 +8,14 @@ class MolTrajParserInterface(ABC):
     def parse(self):
         pass
 
+    @abstractmethod
+    def get_frame(self, frame_number):
+        pass
+
+    @abstractmethod
+    def iter_frames(self, start=None, stop=None, stride=None, timestep_range=None):
+        pass
+
     @property
     @abstractmethod
     def general_file_reader(self) -> GeneralFileReaderInterface:
@@ -43,10 +43,11 @@ class LAMMPSProjectFFDevHeader(HeaderInterface):
     def add_data(self, data: list):
         new_row = pd.DataFrame([data], columns=self.header_columns)
 
-        # Append the new row to the existing DataFrame
-        # Assuming you want to ignore the index, or you can add a specific index if you need
-        self.header_data = self.header_data.append(new_row, ignore_index=True)
-
+        # Append the new row to the existing DataFrame (DataFrame.append was removed in pandas 2)
+        if self._header_data.empty:
+            self._header_data = new_row
+        else:
+            self._header_data = pd.concat([self._header_data, new_row], ignore_index=True)
 
     @property
     def header_columns(self):
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+
+import numpy as np
 import pandas as pd
 
 class ProjectDataInterface(ABC):
@@ -20,24 +22,110 @@ class ProjectData:
 
 
 class GlobalScalerProjectData:
+    """
+    Table of the per-sim-case results of a project (one row per force field).
+
+    Rows are appended into one typed numpy buffer per column, which grows geometrically, so appending n rows costs
+    O(n) instead of the O(n^2) of concatenating a DataFrame per row. The DataFrame is only built when df is read and
+    is reused until the next append.
+    """
+    INITIAL_CAPACITY = 16
+    DEFAULT_DTYPES = {'ff_filename': object, 'epsilon': np.float64, 'sigma': np.float64}
+
     def __init__(self):
-        self.df = pd.DataFrame(columns=['ff_filename', 'epsilon', 'sigma'])
-        # Cast columns to desired data types
-        self.df = self.df.astype({
-            'ff_filename': str,
-            'epsilon': float,
-            'sigma': float
-        })
+        self._dtypes = {}
+        self._buffers = {}
+        self._num_rows = 0
+        self._capacity = self.INITIAL_CAPACITY
+        self._df = None
+        for column, dtype in self.DEFAULT_DTYPES.items():
+            self._add_column(column, dtype)
 
-    def add_attributes(self, columns):
+    @property
+    def dtypes(self):
+        return dict(self._dtypes)
+
+    @property
+    def columns(self):
+        return list(self._buffers)
+
+    def __len__(self):
+        return self._num_rows
+
+    @property
+    def df(self):
+        if self._df is None:
+            self._df = pd.DataFrame({column: buffer[:self._num_rows] for column, buffer in self._buffers.items()})
+        return self._df
+
+    @df.setter
+    def df(self, value):
+        # Replace the table by an externally built DataFrame, keeping the dtypes of its columns.
+        self._dtypes = {}
+        self._buffers = {}
+        self._num_rows = len(value)
+        self._capacity = max(self.INITIAL_CAPACITY, self._num_rows)
+        for column in value.columns:
+            self._add_column(column, value[column].dtype)
+            self._buffers[column][:self._num_rows] = value[column].to_numpy()
+        self._df = None
+
+    @staticmethod
+    def _get_missing_value(dtype):
+        return np.nan if np.dtype(dtype).kind in 'fc' else None
+
+    def _add_column(self, column, dtype):
+        buffer = np.empty(self._capacity, dtype=dtype)
+        buffer[:] = self._get_missing_value(dtype)
+        self._dtypes[column] = buffer.dtype
+        self._buffers[column] = buffer
+
+    def add_attributes(self, columns, dtype=np.float64):
+        """
+        Declare result columns; rows without a value for a column get NaN (float columns) or None.
+        :param columns: Column name or list of column names
+        :param dtype: dtype of the new columns
+        """
         # Ensure that columns is a list, even if a single column name is provided
         if isinstance(columns, str):
             columns = [columns]
 
         for column in columns:
-            if column not in self.df.columns:
-                self.df[column] = None
+            if column not in self._buffers:
+                self._add_column(column, dtype)
+        self._df = None
+
+    def _grow(self):
+        self._capacity *= 2
+        for column, buffer in self._buffers.items():
+            grown_buffer = np.empty(self._capacity, dtype=buffer.dtype)
+            grown_buffer[:self._num_rows] = buffer[:self._num_rows]
+            grown_buffer[self._num_rows:] = self._get_missing_value(buffer.dtype)
+            self._buffers[column] = grown_buffer
+
+    def _set_value(self, column, value):
+        buffer = self._buffers[column]
+        try:
+            buffer[self._num_rows] = value
+        except (TypeError, ValueError):
+            # A value that does not fit the declared dtype (e.g. a list of profiles) turns the column into objects.
+            object_buffer = buffer.astype(object)
+            object_buffer[self._num_rows] = value
+            self._buffers[column] = object_buffer
+            self._dtypes[column] = object_buffer.dtype
 
     def add_data(self, new_dat):
+        """
+        Append one row.
+        :param new_dat: Dict column name -> value; undeclared columns are added with an object dtype
+        """
+        if self._num_rows == self._capacity:
+            self._grow()
+
+        for column, value in new_dat.items():
+            if column not in self._buffers:
+                self._add_column(column, object)
+            self._set_value(column, value)
 
-        self.df = pd.concat([self.df, pd.DataFrame([new_dat])], ignore_index=True)
+        self._num_rows += 1
+        self._df = None
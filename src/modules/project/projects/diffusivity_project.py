@@ -95,9 +95,8 @@ class diffusivity_project(ProjectInterface):
                 with HydrationNumberCalculator(current_sim_case, rdf_reader) as nw_calculator:
                     nw_calculator.process(self._grcol_num, self._nrcol_num)
                     ff_file = os.path.basename(current_sim_case.forcefield.ff_file_path)
-                    ff_pairs = find_dict_from_lod(current_sim_case.forcefield.params,
-                                                  {'key': 'p1', 'value': self._particle_types[0]},
-                                                  {'key': 'p2', 'value': self._particle_types[1]})
+                    ff_pairs = current_sim_case.forcefield.get_pair_params(self._particle_types[0],
+                                                                           self._particle_types[1])
                     nw.loc[len(nw)] = {'ff_file': ff_file, 'epsilon': ff_pairs['eps'], 'sigma': ff_pairs['sigma'],
                                        'nw': current_sim_case.sim_out_data.data["nw"]["mean"],
                                        'std': current_sim_case.sim_out_data.data["nw"]["std"]}
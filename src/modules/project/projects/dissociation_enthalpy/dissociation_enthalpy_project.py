@@ -1,11 +1,13 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict
 import __main__
 
 from src.modules.project.inout_data.project_data import GlobalScalerProjectData
 from src.modules.project.projects.project_interface import ProjectInterface
-from src.utilities.handle_data_struct import find_dict_from_lod
 from src.utilities.manage_file_folder import get_file_names_and_paths
+from src.utilities.files.file_catalog import ProjectFileCatalog
+from src.utilities.files.parsed_data_cache import ParsedDataCache
 from src.modules.simulation.sim_case.lammps_sim_case import LAMMPSSimCase
 from src.modules.simulation.sim_data.data_interface import ThermoData
 from src.modules.thermodynamics.reactions.physical_reaction import PhysicalReaction
@@ -18,7 +20,8 @@ from src.modules.simulation.forcefield.forcefield import SWFF
 from src.modules.simulation.properties.property_reader.property_reader import JSONParticlePropertyReader
 from src.modules.simulation.properties.property_calculator.simcase.enthalpy.enthalpy_change import ReactionEnthalpyChangeCalculator
 from src.modules.simulation.properties.property_calculator.particle.particle_property_calculator import SubstancePropertyCalculator
-from src.modules.config_loaders.config_loader import MultipleConfigLoader, ConfigLoader
+from src.modules.config_loaders.config_loader import MultipleConfigLoader, ConfigLoader, SimCaseConfigResolver
+from src.modules.simulation.sim_data.data_processors.equilibration_processor import EquilibrationProcessor
 
 # This will give you the full path to the main file
 main_file_path = __main__.__file__
@@ -36,11 +39,16 @@ class DissociationEnthalpyProject(ProjectInterface):
         self._path_to_proj_dir = None
         self._simulations_dir = None
         self._project_outputs = dict()
+        # Resolved once in run() and handed to the sim cases (and the workers along with the project).
+        self._sim_case_configs = None
         self._logs_dir = None
         self.path_to_sim_cases = None
         self.path_to_log_files = None
         self.time_step0 = None
         self._particle_types = None
+        self._workers = 1
+        self._parsed_data_cache = None
+        self._auto_t0 = False
         self._configs = MultipleConfigLoader(self.CONFIGS_PATH).load_configs()
         self.output_req = ["global"]
 
@@ -87,11 +95,20 @@ class DissociationEnthalpyProject(ProjectInterface):
         parser.add_argument('-pt', '--particles_type', nargs=2, type=str, required=True, help='Type of particles (a pair of strings)',
                             default=["C", "O"])
         parser.add_argument('-rn', '--reaction_name', type=str, required=True, help='The name of the reaction')
-        parser.add_argument('-t0', '--time_step0', type=int, required=True,
-                            help='Initial time-step to read the simulation output data')
+        parser.add_argument('-t0', '--time_step0', type=int, default=None,
+                            help='Initial time-step to read the simulation output data (required unless --auto_t0; '
+                                 'with --auto_t0 the equilibration is searched after it)')
         parser.add_argument('-s', '--simulations_directory', type=str, help='Simulations directory',
                             default='simulations')
         parser.add_argument('-l', '--logs_directory', type=str, help='Logs directory', default=None)
+        parser.add_argument('-w', '--workers', type=int, default=1,
+                            help='Number of worker processes used to evaluate the reactants and products')
+        parser.add_argument('-c', '--cache', action='store_true',
+                            help='Cache the parsed simulation outputs in the project directory for later runs')
+        parser.add_argument('--cache_size_mb', type=float, default=1024,
+                            help='Size cap of the parsed-data cache (MB); least recently used entries are evicted')
+        parser.add_argument('--auto_t0', action='store_true',
+                            help='Detect the end of the equilibration of every sim case instead of using one t0')
 
     def set_project_argv(self, project_args):
         self.path_to_proj_dir = project_args.project_path
@@ -100,6 +117,10 @@ class DissociationEnthalpyProject(ProjectInterface):
         self._logs_dir = project_args.logs_directory
         self.time_step0 = project_args.time_step0
         self._particle_types = project_args.particles_type
+        self._workers = project_args.workers
+        self._parsed_data_cache = ParsedDataCache.for_project(self.path_to_proj_dir, project_args.cache_size_mb) \
+            if project_args.cache else None
+        self._auto_t0 = project_args.auto_t0
         # Instantiate the reaction object and populate its properties from the database.
         self._load_reaction_data()
 
@@ -122,7 +143,12 @@ class DissociationEnthalpyProject(ProjectInterface):
             raise e
 
     def run(self):
-        global product_sim_case
+        if self.time_step0 is None and not self._auto_t0:
+            raise ValueError('The initial time-step (-t0) is required unless the automatic t0 (--auto_t0) is used.')
+
+        # Fail on missing sim-case configs before any sim case is processed.
+        self._sim_case_configs = SimCaseConfigResolver.resolve(ConfigLoader(self._get_path_to_sim_config()))
+
         proj_data = GlobalScalerProjectData()
         proj_data.add_attributes('dH_diss')
 
@@ -133,43 +159,99 @@ class DissociationEnthalpyProject(ProjectInterface):
         else:
             print("Warning: no reactants defined for the reaction.")
 
-        for sim_case_filename in sim_case_filenames:
-            for reactant in self.reaction.reactants:
-                reactant_sim_case = self._set_sim_case(reactant, sim_case_filename)
-                SubstancePropertyCalculator().calculate_enthalpy(reactant, reactant_sim_case, "global_props",
-                                                                 "TimeStep", "v_HoutPerMol", self.time_step0)
+        # The reactant and product sim cases of every FF sample are independent reads, so they are all evaluated
+        # as one flat list of tasks. The first reactant of each sample also reports the FF parameters (all
+        # simulation cases of a sample share the same force field parameters).
+        substances = self.reaction.reactants + self.reaction.products
+        task_substances = [substance for _ in sim_case_filenames for substance in substances]
+        task_filenames = [sim_case_filename for sim_case_filename in sim_case_filenames for _ in substances]
+        task_read_ff = [substance_index == 0 for _ in sim_case_filenames for substance_index in range(len(substances))]
+        # One scan of the simulation folders of all substances serves the file lookups of all sim cases.
+        file_catalog = ProjectFileCatalog()
+        for substance in substances:
+            file_catalog.scan(os.path.join(self.path_to_proj_dir, substance.sim_folder, self.simulations_dir))
+        if self.path_to_log_files is not None:
+            file_catalog.scan(self.path_to_log_files)
+
+        task_results = self._evaluate_substances(task_substances, task_filenames, task_read_ff, file_catalog)
+
+        for sample_index, _ in enumerate(sim_case_filenames):
+            sample_results = task_results[sample_index * len(substances):(sample_index + 1) * len(substances)]
+            for substance, (enthalpy, _, _) in zip(substances, sample_results):
+                substance.enthalpy = enthalpy
 
-            for product in self.reaction.products:
-                product_sim_case = self._set_sim_case(product, sim_case_filename)
-                SubstancePropertyCalculator().calculate_enthalpy(product, product_sim_case, "global_props",
-                                                                 "TimeStep", "v_HoutPerMol", self.time_step0)
             # Calculate the enthalpy of dissociation.
             self.reaction.properties.dH = ReactionEnthalpyChangeCalculator(self.reaction).calculate()
 
-            # Get the force field parameters using one of the simulation case objects (all simulation cases share the same force field parameters)
-            sample_sim_case = reactant_sim_case
-            sample_sim_case.read_input_data(["ff"])
-            ff_file = os.path.basename(sample_sim_case.forcefield.ff_file_path)
-            ff_pairs = find_dict_from_lod(sample_sim_case.forcefield.params,
-                                          {'key': 'p1', 'value': self._particle_types[0]},
-                                          {'key': 'p2', 'value': self._particle_types[1]})
-
+            _, ff_file, ff_pairs = sample_results[0]
             proj_data.add_data({'ff_filename': ff_file, 'epsilon': ff_pairs['eps'], 'sigma': ff_pairs['sigma'],
                                 'dH_diss': self.reaction.properties.dH})
 
         self.project_outputs["dH_diss"] = proj_data
 
-    def _set_sim_case(self, substance, sim_case_filename):
+    def _evaluate_substances(self, substances, sim_case_filenames, read_ff, file_catalog):
+        if self._workers is None or self._workers <= 1:
+            return [self._evaluate_substance(substance, sim_case_filename, task_read_ff, file_catalog)
+                    for substance, sim_case_filename, task_read_ff in zip(substances, sim_case_filenames, read_ff)]
+
+        # Each task only carries the catalog of its sim case folder and the path to its log file, so the payload does
+        # not grow with the number of sim cases (the logs folder may hold the logs of all of them).
+        sim_case_paths = [self._get_sim_case_path(substance, sim_case_filename)
+                          for substance, sim_case_filename in zip(substances, sim_case_filenames)]
+        log_file_paths = [SimCaseFileFolderManager(sim_case_path, self._get_path_to_folder_of_log_file(sim_case_path),
+                                                   file_catalog, configs=self._sim_case_configs).log_file_path
+                          for sim_case_path in sim_case_paths]
+        file_catalogs = [file_catalog.get_subcatalog([sim_case_path]) for sim_case_path in sim_case_paths]
+        # Results come back in task order, so they can be reduced per FF sample afterwards.
+        chunk_size = max(1, len(substances) // (4 * self._workers))
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            return list(executor.map(self._evaluate_substance, substances, sim_case_filenames, read_ff,
+                                     file_catalogs, log_file_paths, chunksize=chunk_size))
+
+    def _evaluate_substance(self, substance, sim_case_filename, read_ff, file_catalog=None, log_file_path=None):
+        substance_sim_case = self._set_sim_case(substance, sim_case_filename, file_catalog, log_file_path)
+        if self._auto_t0:
+            # The equilibration is detected in the task, so only the enthalpy after it is returned and no task's
+            # series outlives the task.
+            substance_sim_case.read_output_data({"global_props": {"time_step0": self.time_step0,
+                                                                  "columns": ["v_HoutPerMol"]}})
+            enthalpy_stats = EquilibrationProcessor({0: substance_sim_case.sim_out_data.data["global_props"]}).process(
+                self.time_step0, "TimeStep", ["v_HoutPerMol"])
+            substance_sim_case.sim_out_data.release()
+            substance_result = enthalpy_stats.loc[(0, "v_HoutPerMol"), "mean"]
+        else:
+            SubstancePropertyCalculator().calculate_enthalpy(substance, substance_sim_case, "global_props",
+                                                             "TimeStep", "v_HoutPerMol", self.time_step0)
+            substance_result = substance.enthalpy
+        if not read_ff:
+            return substance_result, None, None
+
+        substance_sim_case.read_input_data(["ff"])
+        ff_file = os.path.basename(substance_sim_case.forcefield.ff_file_path)
+        ff_pairs = substance_sim_case.forcefield.get_pair_params(self._particle_types[0], self._particle_types[1])
+        return substance_result, ff_file, ff_pairs
+
+    def _get_sim_case_path(self, substance, sim_case_filename):
+        return os.path.join(self.path_to_proj_dir, substance.sim_folder, self.simulations_dir, sim_case_filename)
+
+    def _get_path_to_folder_of_log_file(self, sim_case_path):
+        return self.path_to_log_files if self._logs_dir is not None else sim_case_path
+
+    def _get_path_to_sim_config(self):
         # Path to the simulation config (its the same for all simulations)
-        path_to_sim_config = os.path.join(main_file_dir, self.configs["DirectoryPaths"]["REL_PATH_SIMCASE_CONFIG"],
-                                          self.configs["FileNames"]["SIMCASE_CONFIG_FILENAME"])
-        sim_case_path = os.path.join(self.path_to_proj_dir, substance.sim_folder, self.simulations_dir,
-                                     sim_case_filename)
-        path_to_folder_of_log_file = self.path_to_log_files if self._logs_dir is not None else sim_case_path
-        sim_case_file_folder = SimCaseFileFolderManager(sim_case_path, path_to_folder_of_log_file)
+        return os.path.join(main_file_dir, self.configs["DirectoryPaths"]["REL_PATH_SIMCASE_CONFIG"],
+                            self.configs["FileNames"]["SIMCASE_CONFIG_FILENAME"])
+
+    def _set_sim_case(self, substance, sim_case_filename, file_catalog=None, log_file_path=None):
+        path_to_sim_config = self._get_path_to_sim_config()
+        sim_case_path = self._get_sim_case_path(substance, sim_case_filename)
+        sim_case_file_folder = SimCaseFileFolderManager(sim_case_path,
+                                                        self._get_path_to_folder_of_log_file(sim_case_path),
+                                                        file_catalog, log_file_path, self._sim_case_configs)
         lmp_log_parser = LammpsLogParser(GeneralFileReader(sim_case_file_folder.log_file_path))
         current_sim_case = LAMMPSSimCase(sim_case_file_folder, lmp_log_parser, Particles(JSONParticlePropertyReader()),
-                                         SWFF(), ConfigLoader(path_to_sim_config), ThermoData())
+                                         SWFF(self._parsed_data_cache), ConfigLoader(path_to_sim_config), ThermoData(),
+                                         self._parsed_data_cache)
         return current_sim_case
 
 
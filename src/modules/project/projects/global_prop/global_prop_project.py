@@ -1,8 +1,12 @@
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Dict
 
+import pandas as pd
+
 from src.utilities.manage_file_folder import get_and_sort_folders
-from src.utilities.handle_data_struct import find_dict_from_lod
+from src.utilities.files.file_catalog import ProjectFileCatalog
+from src.utilities.files.parsed_data_cache import ParsedDataCache
 from src.modules.simulation.sim_case.lammps_sim_case import LAMMPSSimCase
 from src.modules.project.projects.project_interface import ProjectInterface
 from src.modules.simulation.sim_case.sim_case_interface import SimCaseFileFolderManager
@@ -12,16 +16,24 @@ from src.modules.simulation.forcefield.forcefield import SWFF
 from src.modules.simulation.component.particle.particles import Particles
 from src.modules.simulation.properties.property_reader.property_reader import JSONParticlePropertyReader
 from src.modules.project.projects.global_prop.global_prop_project_configs import GlobalPropProjectConfigs
-from src.modules.simulation_postprocessor.global_props_postprocessor import GlobalPropsPostProcessor
-from src.modules.simulation.sim_data.data_processors.pandas_df_processor import PandasSimDataProcessor
+from src.modules.simulation.sim_data.data_processors.cross_case_stats_processor import CrossCaseStatsProcessor
+from src.modules.simulation.sim_data.data_processors.equilibration_processor import EquilibrationProcessor
 from src.modules.project.inout_data.project_data import GlobalScalerProjectData
 from src.modules.simulation.sim_data.data_interface import ThermoData
+from src.modules.config_loaders.config_loader import ConfigLoader, SimCaseConfigResolver
+
 
 class GlobalPropProject(ProjectInterface):
+    REL_PATH_TO_SIM_CONFIG = '../../../simulation/sim_case/simcase_configs.json'
+    CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
+    ABS_PATH_TO_SIM_CONFIG = os.path.join(CURRENT_DIR, REL_PATH_TO_SIM_CONFIG)
+    # Sim cases whose series are held at once before their statistics are computed (non-streaming mode).
+    CASES_PER_STATS_GROUP = 64
 
     def __init__(self, global_prop_name=None, path_to_proj_dir=None, simulations_dir=None, logs_dir=None,
                  path_to_sim_cases=None,
-                 path_to_log_files=None, time_step0=None, particle_types=None):
+                 path_to_log_files=None, time_step0=None, particle_types=None, workers=1, parsed_data_cache=None,
+                 streaming=False, block_size=None, auto_t0=False):
         self._global_prop_name = global_prop_name
         self._path_to_proj_dir = path_to_proj_dir
         self._simulations_dir = simulations_dir
@@ -30,8 +42,15 @@ class GlobalPropProject(ProjectInterface):
         self._path_to_log_files = path_to_log_files
         self.time_step0 = time_step0
         self._particle_types = particle_types
+        self._workers = workers
+        self._parsed_data_cache = parsed_data_cache
+        self._streaming = streaming
+        self._block_size = block_size
+        self._auto_t0 = auto_t0
 
         self._project_outputs = dict()
+        # Resolved once in run() and handed to the sim cases (and the workers along with the project).
+        self._sim_case_configs = None
         self._configs = GlobalPropProjectConfigs
 
     @property
@@ -61,8 +80,9 @@ class GlobalPropProject(ProjectInterface):
     @classmethod
     def get_project_args(cls, parser):
         parser.add_argument('-p', '--project_path', type=str, required=True, help='Path to the project directory')
-        parser.add_argument('-t0', '--time_step0', type=int, required=True,
-                            help='Initial time-step to read the simulation output data')
+        parser.add_argument('-t0', '--time_step0', type=int, default=None,
+                            help='Initial time-step to read the simulation output data (required unless --auto_t0; '
+                                 'with --auto_t0 the equilibration is searched after it)')
         parser.add_argument('-gp', '--global_prop', type=str, required=True,
                             help='The name of the dumped global property')
         parser.add_argument('-pt', '--particles_type', nargs=2, type=str, required=True,
@@ -72,6 +92,20 @@ class GlobalPropProject(ProjectInterface):
         parser.add_argument('-s', '--simulations_directory', type=str, help='Simulations directory',
                             default='simulations')
         parser.add_argument('-l', '--logs_directory', type=str, help='Logs directory', default=None)
+        parser.add_argument('-w', '--workers', type=int, default=1,
+                            help='Number of worker processes used to process the simulation cases')
+        parser.add_argument('-c', '--cache', action='store_true',
+                            help='Cache the parsed simulation outputs in the project directory for later runs')
+        parser.add_argument('--cache_size_mb', type=float, default=1024,
+                            help='Size cap of the parsed-data cache (MB); least recently used entries are evicted')
+        parser.add_argument('--streaming', action='store_true',
+                            help='Reduce the property files chunk by chunk into running statistics instead of '
+                                 'loading the series (constant memory for very long outputs)')
+        parser.add_argument('--block_size', type=int, default=None,
+                            help='Rows per block of the block-averaged standard error of the mean (streaming mode)')
+        parser.add_argument('--auto_t0', action='store_true',
+                            help='Detect the end of the equilibration of every sim case and report the statistical '
+                                 'inefficiency and the correlation-corrected standard error of the mean')
 
     @staticmethod
     def check_var_in_project_args(project_args, arg):
@@ -81,9 +115,15 @@ class GlobalPropProject(ProjectInterface):
         self.path_to_proj_dir = project_args.project_path
         self.simulations_dir = project_args.simulations_directory
         self._logs_dir = project_args.logs_directory
-        self.time_step0 = project_args._time_step0
+        self.time_step0 = project_args.time_step0
         self._particle_types = project_args.particles_type
         self._global_prop_name = project_args.global_prop
+        self._workers = project_args.workers
+        self._parsed_data_cache = ParsedDataCache.for_project(self.path_to_proj_dir, project_args.cache_size_mb) \
+            if project_args.cache else None
+        self._streaming = project_args.streaming
+        self._block_size = project_args.block_size
+        self._auto_t0 = project_args.auto_t0
         # Update paths based on the new arguments
         self._set_path_to_sim_cases_n_log_files()
 
@@ -99,45 +139,132 @@ class GlobalPropProject(ProjectInterface):
             raise e
 
     @staticmethod
-    def get_ff_pairs(ff_params, particle_types):
-        ff_pairs = find_dict_from_lod(ff_params,
-                                      {'key': 'p1', 'value': particle_types[0]},
-                                      {'key': 'p2', 'value': particle_types[1]})
-        return ff_pairs
+    def get_ff_pairs(forcefield, particle_types):
+        return forcefield.get_pair_params(particle_types[0], particle_types[1])
 
     def run(self):
+        if self.time_step0 is None and not self._auto_t0:
+            raise ValueError('The initial time-step (-t0) is required unless the automatic t0 (--auto_t0) is used.')
+        if self._auto_t0 and self._streaming:
+            raise ValueError('The automatic t0 needs the whole series and cannot be combined with the streaming mode.')
+        if self._block_size is not None and not self._streaming:
+            raise ValueError('The block size (--block_size) is only used in the streaming mode (--streaming).')
+
+        # Fail on missing sim-case configs before any sim case is processed.
+        self._sim_case_configs = SimCaseConfigResolver.resolve(ConfigLoader(self.ABS_PATH_TO_SIM_CONFIG))
+
         proj_data = GlobalScalerProjectData()
         proj_data.add_attributes(f'{self._global_prop_name}_mean')
         proj_data.add_attributes(f'{self._global_prop_name}_std')
+        if self._block_size is not None:
+            proj_data.add_attributes(f'{self._global_prop_name}_block_sem')
+        if self._auto_t0:
+            proj_data.add_attributes([f'{self._global_prop_name}_{statistic}' for statistic in ('sem', 'g', 't0')])
 
         _, sim_case_paths = get_and_sort_folders(self._path_to_sim_cases)
-        # Path to the simulation config (its the same for all simulations)
-        path_to_sim_config = "/Users/unconvrs/Documents/GitHub/co2hydrates/nefe_calc/src/modules/simulation/sim_case/simcase_configs.json"
-        for sim_case_path in sim_case_paths:
-            path_to_folder_of_log_file = self._path_to_log_files if self._logs_dir is not None else sim_case_path
-            sim_case_file_folder = SimCaseFileFolderManager(sim_case_path, path_to_folder_of_log_file)
-            lmp_log_parser = LammpsLogParser(GeneralFileReader(sim_case_file_folder.log_file_path))
-
-            with LAMMPSSimCase(sim_case_file_folder, lmp_log_parser, Particles(JSONParticlePropertyReader()),
-                               SWFF(), SimCaseConfigs(path_to_sim_config), ThermoData()) as current_sim_case:
-                current_sim_case.read_input_data(["ff"])
-                ff_file = os.path.basename(current_sim_case.forcefield.ff_file_path)
-                ff_pairs = self.get_ff_pairs(current_sim_case.forcefield.params, self._particle_types)
-                current_sim_case.read_output_data("global_props")
-                with GlobalPropsPostProcessor(current_sim_case,
-                                              PandasSimDataProcessor(current_sim_case.sim_out_data.data[
-                                                                         "global_props"])) as global_props_processor:
-                    current_sim_case = global_props_processor.process(self.time_step0, 'TimeStep',
-                                                                      self._global_prop_name)
-
-                    proj_data.add_data({'ff_filename': ff_file, 'epsilon': ff_pairs['eps'], 'sigma': ff_pairs['sigma'],
-                                        f'{self._global_prop_name}_mean':
-                                            current_sim_case.sim_out_data.data[self._global_prop_name]["mean"],
-                                        f'{self._global_prop_name}_std':
-                                            current_sim_case.sim_out_data.data[self._global_prop_name]["std"]})
+        # One scan of the project tree serves the file lookups of all sim cases.
+        file_catalog = ProjectFileCatalog().scan(self._path_to_sim_cases)
+        if self._path_to_log_files is not None:
+            file_catalog.scan(self._path_to_log_files)
+
+        # Rows are added in the sorted folder order regardless of the order the sim cases finished in.
+        sim_case_rows = [None] * len(sim_case_paths)
+        sim_case_stats = [None] * len(sim_case_paths)
+        stats_processor = EquilibrationProcessor() if self._auto_t0 else CrossCaseStatsProcessor()
+        for case_num, (sim_case_row, sim_case_output) in self._process_sim_cases(sim_case_paths, file_catalog):
+            sim_case_rows[case_num] = sim_case_row
+            if self._streaming:
+                # The workers already reduced their files to the statistics of the property.
+                sim_case_stats[case_num] = sim_case_output
+                continue
+
+            # The series are reduced in vectorized passes over groups of sim cases, so only the series of one group
+            # are held at a time.
+            time_steps, global_prop_values = sim_case_output
+            stats_processor.add_case(case_num, pd.DataFrame({'TimeStep': time_steps,
+                                                             self._global_prop_name: global_prop_values}))
+            if len(stats_processor.sim_data) >= self.CASES_PER_STATS_GROUP:
+                self._reduce_stats_group(stats_processor, sim_case_stats)
+        if not self._streaming:
+            self._reduce_stats_group(stats_processor, sim_case_stats)
+
+        for sim_case_row, global_prop_stats in zip(sim_case_rows, sim_case_stats):
+            sim_case_row[f'{self._global_prop_name}_mean'] = global_prop_stats['mean']
+            sim_case_row[f'{self._global_prop_name}_std'] = global_prop_stats['std']
+            if 'block_sem' in global_prop_stats:
+                sim_case_row[f'{self._global_prop_name}_block_sem'] = global_prop_stats['block_sem']
+            if self._auto_t0:
+                for statistic in ('sem', 'g', 't0'):
+                    sim_case_row[f'{self._global_prop_name}_{statistic}'] = global_prop_stats[statistic]
+            proj_data.add_data(sim_case_row)
 
         self.project_outputs[self._global_prop_name] = proj_data
 
+    def _reduce_stats_group(self, stats_processor, sim_case_stats):
+        # Compute the statistics of the sim cases held by the processor, then drop their series.
+        if not stats_processor.sim_data:
+            return
+        global_prop_stats = stats_processor.process(self.time_step0, 'TimeStep', [self._global_prop_name])
+        for case_num in stats_processor.sim_data:
+            sim_case_stats[case_num] = global_prop_stats.loc[(case_num, self._global_prop_name)]
+        stats_processor.sim_data = {}
+
+    def _process_sim_cases(self, sim_case_paths, file_catalog):
+        # Yield (sim case number, result) as the sim cases finish.
+        if self._workers is None or self._workers <= 1:
+            for case_num, sim_case_path in enumerate(sim_case_paths):
+                yield case_num, self._process_sim_case(sim_case_path, file_catalog)
+            return
+
+        # Submit the largest sim cases first, so the long-running ones do not end up as stragglers at the end.
+        submission_order = sorted(range(len(sim_case_paths)),
+                                  key=lambda i: file_catalog.get_folder_size(sim_case_paths[i]), reverse=True)
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            future_to_index = {}
+            for i in submission_order:
+                # Each worker only receives the catalog of its sim case folder and the path to its log file, so the
+                # payload does not grow with the number of sim cases (the logs folder may hold the logs of all).
+                log_file_path = SimCaseFileFolderManager(sim_case_paths[i],
+                                                         self._get_path_to_folder_of_log_file(sim_case_paths[i]),
+                                                         file_catalog,
+                                                         configs=self._sim_case_configs).log_file_path
+                sim_case_catalog = file_catalog.get_subcatalog([sim_case_paths[i]])
+                future_to_index[executor.submit(self._process_sim_case, sim_case_paths[i], sim_case_catalog,
+                                                log_file_path)] = i
+            for future in as_completed(future_to_index):
+                # The finished future is dropped, so its result is freed once it has been reduced.
+                yield future_to_index.pop(future), future.result()
+
+    def _get_path_to_folder_of_log_file(self, sim_case_path):
+        return self._path_to_log_files if self._logs_dir is not None else sim_case_path
+
+    def _process_sim_case(self, sim_case_path, file_catalog=None, log_file_path=None):
+        sim_case_file_folder = SimCaseFileFolderManager(sim_case_path,
+                                                        self._get_path_to_folder_of_log_file(sim_case_path),
+                                                        file_catalog, log_file_path, self._sim_case_configs)
+        lmp_log_parser = LammpsLogParser(GeneralFileReader(sim_case_file_folder.log_file_path))
+
+        with LAMMPSSimCase(sim_case_file_folder, lmp_log_parser, Particles(JSONParticlePropertyReader()),
+                           SWFF(self._parsed_data_cache), ConfigLoader(self.ABS_PATH_TO_SIM_CONFIG), ThermoData(),
+                           self._parsed_data_cache) as current_sim_case:
+            current_sim_case.read_input_data(["ff"])
+            ff_file = os.path.basename(current_sim_case.forcefield.ff_file_path)
+            ff_pairs = self.get_ff_pairs(current_sim_case.forcefield, self._particle_types)
+            sim_case_row = {'ff_filename': ff_file, 'epsilon': ff_pairs['eps'], 'sigma': ff_pairs['sigma']}
+            if self._streaming:
+                current_sim_case.read_output_data({"global_props_stats": {"time_step0": self.time_step0,
+                                                                          "columns": [self._global_prop_name],
+                                                                          "block_size": self._block_size}})
+                return sim_case_row, current_sim_case.sim_out_data.data["global_props_stats"][self._global_prop_name]
+
+            # Only the time-step and the requested property are parsed, starting from t0 (if given), and only their
+            # two arrays are sent back to the parent process.
+            current_sim_case.read_output_data({"global_props": {"time_step0": self.time_step0,
+                                                                "columns": [self._global_prop_name]}})
+            global_props = current_sim_case.sim_out_data.data["global_props"]
+            return sim_case_row, (global_props['TimeStep'].to_numpy(),
+                                  global_props[self._global_prop_name].to_numpy())
+
 
 if __name__ == "__main__":
     from src.modules.project.inout_data.project_output_writer import LAMMPSProjectScalerGlobalOutputWriter
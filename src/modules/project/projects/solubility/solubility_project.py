@@ -4,6 +4,7 @@ from typing import Dict
 import __main__
 
 from modules.config_loaders.config_loader import ConfigLoader, MultipleConfigLoader
+from src.modules.config_loaders.config_loader import SimCaseConfigResolver
 from modules.simulation.sim_data.data_interface import ThermoData
 from src.modules.project.inout_data.project_data import GlobalScalerProjectData
 from src.modules.project.projects.project_interface import ProjectInterface
@@ -14,8 +15,9 @@ from src.modules.simulation.properties.property_reader.property_reader import JS
 from src.modules.simulation.sim_case.sim_case_interface import SimCaseFileFolderManager
 from utilities.files.file_reader import GeneralFileReader
 from src.modules.simulation.sim_case.lammps_sim_case import LAMMPSSimCase
-from src.utilities.handle_data_struct import find_dict_from_lod
+from src.modules.simulation.sim_data.data_interface import SimDataMemoryBudget
 from src.utilities.manage_file_folder import get_and_sort_folders
+from src.utilities.files.file_catalog import ProjectFileCatalog
 
 # This will give you the full path to the main file
 main_file_path = __main__.__file__
@@ -29,7 +31,7 @@ class SolubilityProject(ProjectInterface):
                     os.path.join(main_file_dir, REL_PATH_FROM_SRC_DISS_PROJ_CONFIG)]
 
     def __init__(self, density_pofiles_fn=None, path_to_proj_dir=None, simulations_dir=None, logs_dir=None, path_to_sim_cases=None,
-                 path_to_log_files=None, time_step0=None, particle_types=None):
+                 path_to_log_files=None, time_step0=None, particle_types=None, memory_budget_mb=None):
 
         self._time_stepf = None
         self._density_pofiles_fn = density_pofiles_fn
@@ -40,6 +42,7 @@ class SolubilityProject(ProjectInterface):
         self._path_to_log_files = path_to_log_files
         self._time_step0 = time_step0
         self._particle_types = particle_types
+        self._memory_budget_mb = memory_budget_mb
 
         self._project_outputs = dict()
         self._configs = MultipleConfigLoader(self.CONFIGS_PATH).load_configs()
@@ -84,6 +87,9 @@ class SolubilityProject(ProjectInterface):
         parser.add_argument('-s', '--simulations_directory', type=str, help='Simulations directory',
                             default='simulations')
         parser.add_argument('-l', '--logs_directory', type=str, help='Logs directory', default=None)
+        parser.add_argument('-mb', '--memory_budget_mb', type=float, default=None,
+                            help='Memory budget (MB) of the simulation output data held at once; least recently used '
+                                 'data is released beyond it (default: no budget)')
 
     def set_project_argv(self, project_args):
         self.path_to_proj_dir = project_args.project_path
@@ -93,6 +99,7 @@ class SolubilityProject(ProjectInterface):
         self._time_step0 = project_args.time_step0
         self._time_stepf = project_args.time_stepf
         self._particle_types = project_args.particles_type
+        self._memory_budget_mb = project_args.memory_budget_mb
         # Update paths based on the new arguments
         self._set_path_to_sim_cases_n_log_files()
 
@@ -108,11 +115,8 @@ class SolubilityProject(ProjectInterface):
             raise e
 
     @staticmethod
-    def get_ff_pairs(ff_params, particle_types):
-        ff_pairs = find_dict_from_lod(ff_params,
-                                      {'key': 'p1', 'value': particle_types[0]},
-                                      {'key': 'p2', 'value': particle_types[1]})
-        return ff_pairs
+    def get_ff_pairs(forcefield, particle_types):
+        return forcefield.get_pair_params(particle_types[0], particle_types[1])
 
     def run(self):
         density_profile_inputs = {"file_names": self._density_pofiles_fn, "starting_tstep": 1000, "final_tstep": 2000,
@@ -124,21 +128,35 @@ class SolubilityProject(ProjectInterface):
 
         # Specify the path to the simulation config file
         path_to_sim_config = os.path.join(main_file_dir, 'modules/simulation/sim_case/simcase_configs.json')
+        # Fail on missing sim-case configs before any sim case is processed.
+        sim_case_configs = SimCaseConfigResolver.resolve(ConfigLoader(path_to_sim_config))
+        # One scan of the project tree serves the file lookups of all sim cases.
+        file_catalog = ProjectFileCatalog().scan(self._path_to_sim_cases)
+        if self._path_to_log_files is not None:
+            file_catalog.scan(self._path_to_log_files)
+        memory_budget = SimDataMemoryBudget.from_mb(self._memory_budget_mb) \
+            if self._memory_budget_mb is not None else None
+
         for sim_case_path in sim_case_paths:
             path_to_folder_of_log_file = self._path_to_log_files if self._logs_dir is not None else sim_case_path
-            sim_case_file_folder = SimCaseFileFolderManager(sim_case_path, path_to_folder_of_log_file)
+            sim_case_file_folder = SimCaseFileFolderManager(sim_case_path, path_to_folder_of_log_file, file_catalog,
+                                                            configs=sim_case_configs)
             lmp_log_parser = LammpsLogParser(GeneralFileReader(sim_case_file_folder.log_file_path))
             with LAMMPSSimCase(sim_case_file_folder=sim_case_file_folder,
                                lmp_log_parser=lmp_log_parser,
                                particles=Particles(JSONParticlePropertyReader()), forcefield=SWFF(),
-                               config_loader=ConfigLoader(path_to_sim_config), thermo_data=ThermoData()) as current_sim_case:
+                               config_loader=ConfigLoader(path_to_sim_config), thermo_data=ThermoData(),
+                               memory_budget=memory_budget) as current_sim_case:
                 current_sim_case.read_input_data(["ff"])
                 ff_file = os.path.basename(current_sim_case.forcefield.ff_file_path)
-                ff_pairs = self.get_ff_pairs(current_sim_case.forcefield.params, self._particle_types)
+                ff_pairs = self.get_ff_pairs(current_sim_case.forcefield, self._particle_types)
                 current_sim_case.read_output_data(output_data_to_read)
 
+                # The project data keeps the lazy entry of the profiles rather than the profiles themselves, so the
+                # memory budget can drop them (entry.get() reads them again) and no sim case holds them after exit.
+                density_profiles = current_sim_case.sim_out_data.data.get_entry('density_profiles')
                 proj_data.add_data({'ff_filename': ff_file, 'epsilon': ff_pairs['eps'], 'sigma': ff_pairs['sigma'],
-                                    'density_profiles': current_sim_case.sim_out_data.data['density_profiles']})
+                                    'density_profiles': density_profiles})
 
                 self.project_outputs['density_profiles'] = proj_data
 
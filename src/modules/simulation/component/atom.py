@@ -1,4 +1,6 @@
 class Atom:
+    __slots__ = ('_name', '_mass', '_charge', '_count', '_r', '_v')
+
     def __init__(self, name, mass=None, charge=None, count=None, r=None, v=None):
         self._name = name
         self._mass = mass
@@ -6,6 +8,3 @@ class Atom:
         self._count = count
         self._r = r
         self._v = v
-
-
-
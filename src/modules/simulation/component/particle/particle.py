@@ -8,6 +8,9 @@ mu_const = sc.value('atomic mass constant')
 
 
 class Particle:
+    # Attributes that are stored in the arrays of a Particles collection once the particle is added to one.
+    ARRAY_ATTRIBUTES = ('mass', 'charge', 'count', 'k', 'mu', 'omega')
+    __slots__ = ('name', '_mass', '_charge', '_count', '_k', '_mu', '_omega', '_collection', '_index')
 
     def __init__(self, name, mass=None, charge=None, count=None):
         self.name = name
@@ -17,66 +20,84 @@ class Particle:
         self._k = None
         self._mu = None
         self._omega = None
+        self._collection = None
+        self._index = None
+
+    def attach(self, collection, index):
+        # From now on the attributes are read from and written to the arrays of the collection at the given index.
+        self._collection = collection
+        self._index = index
+
+    def _get_value(self, attribute):
+        if self._collection is not None:
+            return self._collection.get_particle_value(self._index, attribute)
+        return getattr(self, '_' + attribute)
+
+    def _set_value(self, attribute, value):
+        if self._collection is not None:
+            self._collection.set_particle_value(self._index, attribute, value)
+        else:
+            setattr(self, '_' + attribute, value)
 
     @property
     def mass(self):
-        return self._mass
+        return self._get_value('mass')
 
     @mass.setter
     def mass(self, value: float):
         if not isinstance(value, float):
             raise TypeError("Mass must be a float.")
-        self._mass = value
+        self._set_value('mass', value)
 
     @property
     def charge(self):
-        return self._charge
+        return self._get_value('charge')
 
     @charge.setter
     def charge(self, value: int):
         if not isinstance(value, int):
             raise TypeError("Charge must be an integer.")
-        self._charge = value
+        self._set_value('charge', value)
 
     @property
     def count(self):
-        return self._count
+        return self._get_value('count')
 
     @count.setter
     def count(self, value: int):
         if not isinstance(value, int):
             raise TypeError("Count must be an integer.")
-        self._count = value
+        self._set_value('count', value)
 
     @property
     def mu(self):
-        return self._mu
+        return self._get_value('mu')
 
     @mu.setter
     def mu(self, value: float):
         if not isinstance(value, float):
             raise TypeError("mu must be a float.")
-        self._mu = value
+        self._set_value('mu', value)
 
     @property
     def k(self):
-        return self._k
+        return self._get_value('k')
 
     @k.setter
     def k(self, value: float):
         if not isinstance(value, float):
             raise TypeError("k must be a float.")
-        self._k = value
+        self._set_value('k', value)
 
     @property
     def omega(self):
-        return self._omega
+        return self._get_value('omega')
 
     @omega.setter
     def omega(self, value: float):
         if not isinstance(value, float):
             raise TypeError("omega must be a float.")
-        self._omega = value
+        self._set_value('omega', value)
 
     def __eq__(self, other):
         if not isinstance(other, Particle):
@@ -84,8 +105,12 @@ class Particle:
 
         return (self.name == other.name)
 
+    def __hash__(self):
+        return hash(self.name)
+
     def __repr__(self):
-        attributes = ', '.join(f"{key}={value!r}" for key, value in self.__dict__.items())
+        attributes = ', '.join(f"{attribute}={getattr(self, attribute)!r}"
+                               for attribute in ('name',) + self.ARRAY_ATTRIBUTES)
         return f"{self.__class__.__name__}({attributes})"
 
 
@@ -1,42 +1,131 @@
 from typing import List
 
+import numpy as np
+
 from src.modules.simulation.component.particle.particle import Particle
 from src.modules.simulation.properties.property_reader.property_reader import PropertyReaderInterface, JSONParticlePropertyReader
 
 
 class Particles:
+    """
+    Collection of the particles of a sim case.
+
+    The attributes of the particles (mass, charge, count, k, omega, mu) are kept in parallel numpy arrays, one entry per
+    particle in the order the particles were added, so they can be computed on all particles at once; an unset
+    attribute is NaN. The Particle instances stay usable and read and write their entry of the arrays. The particle
+    types are numbered in the order their names first appear.
+    """
+    INITIAL_CAPACITY = 8
+    # Attributes returned as int by the particles (the arrays are float to hold NaN for unset values).
+    INT_ATTRIBUTES = ('charge', 'count')
+
     def __init__(self, property_reader: PropertyReaderInterface):
-        self._particles = []
-        self._num_particles = 0
-        self._num_particle_types = 0
+        self._reset()
         self.property_reader = property_reader
 
-    def _update_particle_number_type(self, particle):
-        if not any(p.name == particle.name for p in self.particles):
-            self._num_particle_types += 1
-        self._num_particles += 1
+    def _reset(self):
+        self._particles = []
+        self._arrays = {attribute: np.full(self.INITIAL_CAPACITY, np.nan) for attribute in Particle.ARRAY_ATTRIBUTES}
+        self._particle_types = np.empty(self.INITIAL_CAPACITY, dtype=np.int64)
+        self._type_index = {}
+
+    def _append(self, particle: Particle):
+        index = len(self._particles)
+        if index == len(self._particle_types):
+            self._grow()
+
+        for attribute, array in self._arrays.items():
+            value = getattr(particle, attribute)
+            array[index] = np.nan if value is None else value
+        self._particle_types[index] = self._type_index.setdefault(particle.name, len(self._type_index))
+        particle.attach(self, index)
+        self._particles.append(particle)
+
+    def _grow(self):
+        capacity = 2 * len(self._particle_types)
+        for attribute, array in self._arrays.items():
+            grown_array = np.full(capacity, np.nan)
+            grown_array[:len(array)] = array
+            self._arrays[attribute] = grown_array
+        grown_particle_types = np.empty(capacity, dtype=np.int64)
+        grown_particle_types[:len(self._particle_types)] = self._particle_types
+        self._particle_types = grown_particle_types
 
     def add_particle(self, particle: Particle):
         self.property_reader.read_properties(particle) if particle.mass == None or particle.charge == None else ...
-        self._update_particle_number_type(particle)
-        self.particles.append(particle)
+        self._append(particle)
         return self
 
+    def get_particle_value(self, index, attribute):
+        value = self._arrays[attribute][index]
+        if np.isnan(value):
+            return None
+        return int(value) if attribute in self.INT_ATTRIBUTES else float(value)
+
+    def set_particle_value(self, index, attribute, value):
+        self._arrays[attribute][index] = np.nan if value is None else value
+
+    def get_values(self, attribute) -> np.ndarray:
+        """
+        Get an attribute of all particles.
+        :param attribute: One of Particle.ARRAY_ATTRIBUTES
+        :return: Read-only float array with one entry per particle (NaN: unset)
+        """
+        values = self._arrays[attribute][:len(self._particles)]
+        values.flags.writeable = False
+        return values
+
+    def set_values(self, attribute, values):
+        """
+        Set an attribute of all particles at once.
+        :param attribute: One of Particle.ARRAY_ATTRIBUTES
+        :param values: Array-like with one entry per particle
+        """
+        self._arrays[attribute][:len(self._particles)] = values
+
+    @property
+    def masses(self) -> np.ndarray:
+        return self.get_values('mass')
+
+    @property
+    def charges(self) -> np.ndarray:
+        return self.get_values('charge')
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self.get_values('count')
+
+    @property
+    def total_count(self):
+        return int(np.nansum(self.counts))
+
+    @property
+    def particle_types(self) -> np.ndarray:
+        """Type number of every particle."""
+        return self._particle_types[:len(self._particles)]
+
+    @property
+    def type_index(self):
+        """Particle name -> type number."""
+        return self._type_index
+
     @property
     def particles(self) -> List[Particle]:
         return self._particles
 
     @particles.setter
     def particles(self, value: List[Particle]):
-        self._particles = value
+        self._reset()
+        for particle in value:
+            self._append(particle)
 
     @property
     def num_particles(self):
-        return self._num_particles
+        return len(self._particles)
 
     @property
     def num_particle_types(self):
-        return self._num_particle_types
+        return len(self._type_index)
 
     def __len__(self):
         return len(self.particles)
@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict
 
+import numpy as np
+
 from utilities.files.file_reader import GeneralFileReader
+from src.utilities.files.parsed_data_cache import ParsedDataCache
 
 
 class ForceFieldInterface(ABC):
@@ -37,18 +40,22 @@ class ForceFieldInterface(ABC):
 
     @property
     @abstractmethod
-    def params(self) -> List[Dict]:
+    def params(self) -> np.ndarray:
         pass
 
     @params.setter
     @abstractmethod
-    def params(self, value: List[Dict]):
+    def params(self, value: np.ndarray):
         pass
 
     @abstractmethod
     def read_params(self, ff_file_path):
         pass
 
+    @abstractmethod
+    def get_pair_params(self, p1, p2) -> Dict:
+        pass
+
 
 class TwoBodyForceFieldInterface(ForceFieldInterface):
     def __init__(self):
@@ -83,12 +90,17 @@ class ThreeBodyForceFieldInterface(ForceFieldInterface):
 
 
 class SWFF(ThreeBodyForceFieldInterface):
-    def __init__(self):
+
+    def __init__(self, parsed_data_cache: ParsedDataCache = None):
         super().__init__()
+        self._parsed_data_cache = parsed_data_cache
         self._ff_file_path = None
         self._ff_keys.extend(["eps", "sigma", "a", "lambda", "gamma", "cos(theta0)", "A", "B", "p", "q", "tol"])
         self._style = 'sw'
-        self._params = []
+        self._params_dtype = self._get_params_dtype()
+        self._params = np.empty(0, dtype=self._params_dtype)
+        self._triplet_index = {}
+        self._pair_index = {}
 
     def __enter__(self):
         return self
@@ -116,38 +128,110 @@ class SWFF(ThreeBodyForceFieldInterface):
             self._style = value
 
     @property
-    def params(self) -> List[Dict]:
+    def param_names(self) -> List[str]:
+        return self._ff_keys[3:]
+
+    @property
+    def params(self) -> np.ndarray:
         return self._params
 
     @params.setter
-    def params(self, value: List[Dict]):
-        if all(len(d) == 14 for d in value):
-            self._params = value
-        else:
-            raise ('Error: incorrect number of key-value pairs in the force field params.')
+    def params(self, value: np.ndarray):
+        if value.dtype.names != self._params_dtype.names:
+            raise ValueError(f'Error: the force field params must have the fields {self._params_dtype.names}.')
+        self._params = value
+        self._build_index()
+
+    def _get_params_dtype(self, particle_name_length=1):
+        # The particle names are fixed-width strings as long as the longest name, so none is truncated.
+        return np.dtype([(key, f'U{particle_name_length}' if key in ("p1", "p2", "p3") else np.float64)
+                         for key in self._ff_keys])
+
+    def _build_index(self):
+        # The first entry wins for a repeated triplet or pair, as in a linear search.
+        self._triplet_index = {}
+        self._pair_index = {}
+        for entry_num, (p1, p2, p3) in enumerate(zip(self._params['p1'].tolist(), self._params['p2'].tolist(),
+                                                     self._params['p3'].tolist())):
+            self._triplet_index.setdefault((p1, p2, p3), entry_num)
+            self._pair_index.setdefault((p1, p2), entry_num)
+
+    def _entry_to_dict(self, entry_num):
+        entry = self._params[entry_num]
+        return {key: entry[key].item() for key in self._ff_keys}
+
+    def get_triplet_params(self, p1, p2, p3) -> Dict:
+        if (p1, p2, p3) not in self._triplet_index:
+            raise KeyError(f'No parameters for the triplet ({p1}, {p2}, {p3}) in {self.ff_file_path}')
+        return self._entry_to_dict(self._triplet_index[(p1, p2, p3)])
+
+    def get_pair_params(self, p1, p2) -> Dict:
+        # The parameters of the first triplet starting with the pair (p1, p2).
+        if (p1, p2) not in self._pair_index:
+            raise KeyError(f'No parameters for the pair ({p1}, {p2}) in {self.ff_file_path}')
+        return self._entry_to_dict(self._pair_index[(p1, p2)])
 
     def read_params(self, ff_file_path):
         self.ff_file_path = ff_file_path
         if len(self.params) != 0:
             return self.params
+        elif self._parsed_data_cache is not None:
+            self.params = self._parsed_data_cache.get_or_compute(self.ff_file_path, self.__class__.__name__, None,
+                                                                 self._parse_params)
         else:
-            for line in GeneralFileReader(self.ff_file_path).read():
-                stripped_line = line.strip()
-                if not stripped_line:
-                    continue
-
-                if stripped_line.startswith('#'):
-                    continue
-                else:
-                    if self.ff_keys:
-                        values = stripped_line.split()
-                        if len(values) == len(self.ff_keys):
-                            entry = dict(zip(self.ff_keys, values))
-                            self.params.append(entry)
-                        else:
-                            print(f"Warning: Line '{stripped_line}' does not match header length and was skipped.")
+            self.params = self._parse_params()
         return self.params
 
+    def _parse_params(self):
+        entries = []
+        for line in GeneralFileReader(self.ff_file_path).read():
+            stripped_line = line.strip()
+            if not stripped_line:
+                continue
+
+            if stripped_line.startswith('#'):
+                continue
+            else:
+                if self.ff_keys:
+                    values = stripped_line.split()
+                    if len(values) == len(self.ff_keys):
+                        entries.append(tuple(values[:3]) + tuple(float(value) for value in values[3:]))
+                    else:
+                        print(f"Warning: Line '{stripped_line}' does not match header length and was skipped.")
+        particle_name_length = max((len(name) for entry in entries for name in entry[:3]), default=1)
+        return np.array(entries, dtype=self._get_params_dtype(particle_name_length))
+
+    @classmethod
+    def read_params_batch(cls, ff_file_paths, parsed_data_cache: ParsedDataCache = None):
+        """
+        Read the parameters of several force-field files into one array.
+        :param ff_file_paths: Paths to the force-field files, e.g. all the files of a campaign
+        :param parsed_data_cache: Optional cache of the parsed files
+        :return: (triplets, param_names, params): the (p1, p2, p3) triplets of all the files, in the order they first
+        appear, the names of the parameters and a float array of shape (n_ff_files, n_triplets, n_params). Triplets
+        missing in a file are NaN.
+        """
+        if len(ff_file_paths) == 0:
+            raise ValueError('Error: no force-field files to read.')
+
+        forcefields = []
+        for ff_file_path in ff_file_paths:
+            forcefield = cls(parsed_data_cache)
+            forcefield.read_params(ff_file_path)
+            forcefields.append(forcefield)
+
+        # dict.fromkeys keeps the first appearance of every triplet.
+        triplets = list(dict.fromkeys(triplet for forcefield in forcefields for triplet in forcefield._triplet_index))
+        param_names = forcefields[0].param_names
+        params = np.full((len(forcefields), len(triplets), len(param_names)), np.nan)
+        for file_num, forcefield in enumerate(forcefields):
+            table = np.column_stack([forcefield.params[name] for name in param_names])
+            for triplet_num, triplet in enumerate(triplets):
+                if triplet in forcefield._triplet_index:
+                    params[file_num, triplet_num] = table[forcefield._triplet_index[triplet]]
+
+        return triplets, param_names, params
+
     def __str__(self):
         return "Stillinger-Webber potential"
 
@@ -1,52 +1,235 @@
 from utilities.files.file_reader import DataReaderInterface
 import re
 
+import numpy as np
+
+from src.utilities.files.compression import open_file
+
 
 class LammpsLogParser:
+    # Labels whose lines are collected while indexing the log; other labels are scanned for once and memoized.
+    INDEXED_LABELS = ('pair_coeff',)
+    VARIABLE_PATTERN = re.compile(r'^\s*variable\s+(\S+)\s+equal\s(.*)$')
+    PRINTED_VALUE_PATTERN = re.compile(r'^\s*([^:"$]+:)\s*(.*)$')
+    NUMBER_PATTERN = re.compile(r'([-\d.]+)')
+    PARTICLE_COUNT_PATTERN = re.compile(r"Number of molecules for (\w+): (\d+)")
 
     def __init__(self, data_reader: DataReaderInterface):
         self.data_reader = data_reader
+        self._is_indexed = False
+        self._variables = {}
+        self._printed_values = {}
+        self._labelled_lines = {}
+        self._particles_info = []
+
+    def _iter_lines(self):
+        # Stream the log line by line, so its lines are never all held in memory (the data reader caches read()).
+        if hasattr(self.data_reader, 'iter_lines'):
+            return self.data_reader.iter_lines()
+        return iter(self.data_reader.read())
+
+    def _build_index(self):
+        if self._is_indexed:
+            return
+
+        # A single pass over the log collects everything the queries below ask for.
+        labelled_lines = {label: [] for label in self.INDEXED_LABELS}
+        for line in self._iter_lines():
+            for label in self.INDEXED_LABELS:
+                if label in line:
+                    labelled_lines[label].append(line.split())
+
+            if 'variable' in line:
+                match = self.VARIABLE_PATTERN.match(line)
+                if match and match.group(1) not in self._variables:
+                    value = self._parse_number(match.group(2))
+                    if value is not None:
+                        self._variables[match.group(1)] = value
+                    continue
+
+            if 'Number of molecules for' in line:
+                match = self.PARTICLE_COUNT_PATTERN.search(line)
+                if match:
+                    self._particles_info.append((match.group(1), int(match.group(2))))
+                    continue
+
+            if ':' in line:
+                match = self.PRINTED_VALUE_PATTERN.match(line)
+                if match and match.group(1).strip() not in self._printed_values:
+                    value = self._parse_number(match.group(2))
+                    if value is not None:
+                        self._printed_values[match.group(1).strip()] = value
+
+        self._labelled_lines.update(labelled_lines)
+        self._is_indexed = True
+
+    @classmethod
+    def _parse_number(cls, text):
+        match = cls.NUMBER_PATTERN.search(text)
+        if match:
+            try:
+                return float(match.group(1))
+            except ValueError:
+                return None
+        return None
+
+    def _scan_for_value(self, searching_sentence):
+        # Fallback for printed texts that are not of the "label: value" form.
+        for line in self._iter_lines():
+            if searching_sentence in line:
+                value = self._parse_number(line)
+                if value is not None:
+                    return value
 
     def get_value_of_variable(self, searching_text, type_of_command):
+        self._build_index()
         if type_of_command == "v":
-            searching_sentence = f"variable {searching_text} equal"
+            return self._variables.get(searching_text)
         elif type_of_command == "p":
-            searching_sentence = searching_text
-
-        for line in self.data_reader.read():
-            if searching_sentence in line:
-                match = re.search(r'([-\d.]+)', line)
-                if match:
-                    return float(match.group(1))
+            if searching_text not in self._printed_values:
+                self._printed_values[searching_text] = self._scan_for_value(searching_text)
+            return self._printed_values[searching_text]
 
     def get_text_using_label(self, label, output_text_pos, instance_match_num):
-        found_instances = []
-        for line in self.data_reader.read():
-            if label in line:
-                found_instances.append(line.split())
+        self._build_index()
+        if label not in self._labelled_lines:
+            self._labelled_lines[label] = [line.split() for line in self._iter_lines() if label in line]
 
-        return found_instances[instance_match_num - 1][output_text_pos]
+        return self._labelled_lines[label][instance_match_num - 1][output_text_pos]
 
     def get_number_of_particles(self):
+        self._build_index()
+        return list(self._particles_info)
+
+    def iter_thermo_data(self, columns=None):
+        # The thermo tables are streamed straight from the log file instead of the cached lines of the data reader,
+        # one run segment at a time (see LammpsThermoExtractor.iter_segments()).
+        return LammpsThermoExtractor(self.data_reader.input_file_path, columns).iter_segments()
+
+    def get_thermo_data(self, columns=None):
+        # Loads the thermo tables of all the run segments at once; use iter_thermo_data() for very large logs.
+        return list(self.iter_thermo_data(columns))
+
+
+class LammpsThermoExtractor:
+    """
+    Streams the thermo_style output tables of a LAMMPS log into NumPy column arrays, one run segment at a time.
+    """
+    # Lines printed by LAMMPS right before the header line of a thermo table.
+    THERMO_PRELUDE_LABELS = ('Per MPI rank memory allocation', 'Memory usage per processor')
+    THERMO_END_LABEL = 'Loop time of'
+    STEP_COLUMN_NAME = 'Step'
+    CHUNK_ROWS = 65536
+
+    def __init__(self, log_file_path, columns=None, chunk_rows=CHUNK_ROWS):
+        self._log_file_path = log_file_path
+        self._columns = columns
+        self._chunk_rows = chunk_rows
+
+    @property
+    def log_file_path(self):
+        return self._log_file_path
+
+    def iter_segments(self):
+        """
+        Yield the thermo table of every run segment in the log.
+
+        Only one chunk of raw rows is held at a time, so the memory footprint is set by the (column-projected)
+        segment arrays rather than by the size of the log. A run that was cut short (e.g. a killed job that is
+        restarted) ends its segment at the next header line or at the end of the file.
+
+        :return: Generator of dicts with keys 'run_index', 'columns' and 'data' (column name -> NumPy array)
+        """
+        run_index = 0
+        segment = None
+        expect_header = False
+        with open_file(self.log_file_path, 'r') as log_file:
+            for line in log_file:
+                if expect_header:
+                    if line.strip():
+                        segment = self._start_segment(run_index, line.split())
+                        expect_header = False
+                    continue
+
+                if line.startswith(self.THERMO_PRELUDE_LABELS):
+                    if segment is not None:
+                        yield self._finish_segment(segment)
+                        run_index += 1
+                        segment = None
+                    expect_header = True
+                    continue
+
+                if segment is None:
+                    continue
+
+                if line.startswith(self.THERMO_END_LABEL):
+                    yield self._finish_segment(segment)
+                    run_index += 1
+                    segment = None
+                    continue
+
+                tokens = line.split()
+                # Warnings and other messages interleaved with the table do not have the shape of a thermo row.
+                if len(tokens) != segment['num_header_columns'] or not self._is_numeric_token(tokens[0]):
+                    continue
+                segment['raw_rows'].extend([tokens[i] for i in segment['column_indices']])
+                segment['num_raw_rows'] += 1
+                if segment['num_raw_rows'] == self._chunk_rows:
+                    self._flush_raw_rows(segment)
+
+        if segment is not None:
+            yield self._finish_segment(segment)
+
+    def _start_segment(self, run_index, header_columns):
+        if self._columns is None:
+            column_indices = list(range(len(header_columns)))
+        else:
+            column_indices = [header_columns.index(column) for column in self._columns if column in header_columns]
+
+        return {'run_index': run_index, 'num_header_columns': len(header_columns),
+                'columns': [header_columns[i] for i in column_indices], 'column_indices': column_indices,
+                'raw_rows': [], 'num_raw_rows': 0, 'chunks': []}
+
+    @staticmethod
+    def _is_numeric_token(token):
+        return token[0].isdigit() or token[0] in '-+.'
+
+    @staticmethod
+    def _flush_raw_rows(segment):
+        if segment['num_raw_rows'] == 0:
+            return
+
+        num_columns = len(segment['columns'])
+        if num_columns == 0:
+            segment['num_raw_rows'] = 0
+            return
+
         try:
-            # Pattern to match the desired lines
-            pattern = r"Number of molecules for (\w+): (\d+)"
+            chunk = np.array(segment['raw_rows'], dtype=np.float64).reshape(-1, num_columns)
+        except ValueError:
+            # Convert row by row and drop the rows that are not fully numeric.
+            rows = []
+            for start in range(0, len(segment['raw_rows']), num_columns):
+                try:
+                    rows.append([float(token) for token in segment['raw_rows'][start:start + num_columns]])
+                except ValueError:
+                    continue
+            chunk = np.array(rows, dtype=np.float64).reshape(-1, num_columns)
 
-            # List to store the extracted information
-            particles_info = []
+        segment['chunks'].append(chunk)
+        segment['raw_rows'] = []
+        segment['num_raw_rows'] = 0
 
-            # Extracting information from each line
-            for line in self.data_reader.read():
-                match = re.search(pattern, line)
-                if match:
-                    particle_name = match.group(1)
-                    particle_count = int(match.group(2))
-                    particles_info.append((particle_name, particle_count))
-
-            return particles_info
-        except Exception as e:
-            raise e
-            return str(e)
+    def _finish_segment(self, segment):
+        self._flush_raw_rows(segment)
+        num_columns = len(segment['columns'])
+        table = np.concatenate(segment['chunks']) if segment['chunks'] else np.empty((0, num_columns))
+        data = {}
+        for column_num, column in enumerate(segment['columns']):
+            data[column] = table[:, column_num].astype(np.int64) if column == self.STEP_COLUMN_NAME \
+                else np.ascontiguousarray(table[:, column_num])
+
+        return {'run_index': segment['run_index'], 'columns': segment['columns'], 'data': data}
 
 
 if __name__ == '__main__':
@@ -1,8 +1,10 @@
 import scipy.constants as sc
 import math
+import numpy as np
 from abc import ABC, abstractmethod
 
 from src.modules.simulation.component.particle.particle import Particle
+from src.modules.simulation.component.particle.particles import Particles
 from src.modules.simulation.component.substance.substance import ReactionSubstanceInterface
 from src.modules.simulation.sim_case.sim_case_interface import SimCaseInterface
 
@@ -26,49 +28,75 @@ class ParticlePropertyCalculator:
     def __init__(self):
         pass
 
-    def calculate_omega_from_k(self, particle: Particle):
+    def calculate_omega_from_k(self, particle):
         """
         Calculate the angular frequency (omega) of a particle based on its spring constant (k).
 
         Parameters:
-        particle (Particle): The Particle instance for which omega is to be calculated.
+        particle (Particle or Particles): The Particle instance for which omega is to be calculated, or a Particles
+        collection to calculate omega of all its particles at once.
 
         Returns:
         float: The calculated angular frequency (omega) if successful, None otherwise.
 
         Raises:
-        TypeError: If the input is not an instance of Particle.
+        TypeError: If the input is not an instance of Particle or Particles.
         """
+        if isinstance(particle, Particles):
+            self._calculate_all_omega_from_k(particle)
+            return
+
         if not isinstance(particle, Particle):
-            raise TypeError("The input must be a Particle instance.")
+            raise TypeError("The input must be a Particle or Particles instance.")
 
         if particle.mass != 0 and particle.k is not None:
             particle.omega = math.sqrt(particle.k * eV / (particle.mass * mu_const))  # [1/s]
         else:
             raise ValueError(f"Could not calculate omega for particle: {particle.name}.")
 
-    def calculate_mu(self, particle: Particle, total_mass):
+    def calculate_mu(self, particle, total_mass):
         """
         Calculate the reduced mass (mu) of a particle.
 
         Parameters:
-        particle (Particle): The Particle instance for which mu is to be calculated.
+        particle (Particle or Particles): The Particle instance for which mu is to be calculated, or a Particles
+        collection to calculate mu of all its particles at once.
         total_mass (float): The total mass against which the reduced mass is to be calculated.
 
         Returns:
         float: The calculated reduced mass (mu) if successful, None otherwise.
 
         Raises:
-        TypeError: If the input is not an instance of Particle.
+        TypeError: If the input is not an instance of Particle or Particles.
         """
+        if isinstance(particle, Particles):
+            self._calculate_all_mu(particle, total_mass)
+            return
+
         if not isinstance(particle, Particle):
-            raise TypeError("The input must be a Particle instance.")
+            raise TypeError("The input must be a Particle or Particles instance.")
 
         if total_mass != 0:
             particle.mu = particle.mass / total_mass
         else:
             raise ValueError(f"Could not calculate mu for particle: {particle.name}.")
 
+    @staticmethod
+    def _calculate_all_omega_from_k(particles: Particles):
+        masses = particles.masses
+        k = particles.get_values('k')
+        invalid = (masses == 0) | np.isnan(masses) | np.isnan(k)
+        if invalid.any():
+            invalid_names = [particles.particles[i].name for i in np.flatnonzero(invalid)]
+            raise ValueError(f"Could not calculate omega for particles: {', '.join(invalid_names)}.")
+        particles.set_values('omega', np.sqrt(k * eV / (masses * mu_const)))  # [1/s]
+
+    @staticmethod
+    def _calculate_all_mu(particles: Particles, total_mass):
+        if total_mass == 0:
+            raise ValueError("Could not calculate mu for particles: the total mass is zero.")
+        particles.set_values('mu', particles.masses / total_mass)
+
 
 class SubstancePropertyCalculator:
     def __init__(self):
@@ -76,6 +104,6 @@ class SubstancePropertyCalculator:
 
     def calculate_enthalpy(self, substance, sim_case: SimCaseInterface, prop_file_key, time_step_key, enthalpy_key,
                            time_step0):
-        sim_case.read_output_data([prop_file_key])
+        sim_case.read_output_data({prop_file_key: {"time_step0": time_step0, "columns": [enthalpy_key]}})
         global_props_df = sim_case.sim_out_data.data[prop_file_key]
         substance.enthalpy = global_props_df[global_props_df[time_step_key] > time_step0][enthalpy_key].mean()
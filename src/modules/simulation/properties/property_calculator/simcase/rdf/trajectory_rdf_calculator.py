@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from src.modules.parsers.molecular_trajectory_parsers.mol_traj_parser_interface import MolTrajParserInterface
+from src.modules.simulation.properties.property_calculator.property_calculator_interface import PropertyCalculatorInterface
+
+
+class TrajectoryRDFCalculator(PropertyCalculatorInterface):
+    """
+    Radial distribution function g(r) and cumulative coordination number n(r) of a pair of atom selections, computed
+    from the frames of a LAMMPS trajectory instead of the output of a LAMMPS compute rdf.
+
+    The pairs within the cutoff are found with a periodic KD-tree (minimum image through its boxsize), so the cost per
+    frame grows linearly with the number of atoms. The pair distances are binned with np.bincount and accumulated over
+    the frames of a block. Every block gives one entry in the layout of the LAMMPS rdf output read by
+    HydrationNumberCalculator: {'time_step': last time-step of the block, 'data': DataFrame of the columns Row, r (bin
+    center), g(r) and n(r)}.
+
+    Only orthogonal boxes are supported; non-periodic dimensions are padded so their images never come within the
+    cutoff.
+    """
+    COORDINATE_COLUMNS = (('x', 'y', 'z'), ('xu', 'yu', 'zu'), ('xs', 'ys', 'zs'), ('xsu', 'ysu', 'zsu'))
+    COLUMN_NAMES = ['Row', 'r', 'g(r)', 'n(r)']
+    # Expected number of pairs returned by one KD-tree query; the central atoms are queried in chunks below it.
+    MAX_PAIRS_PER_QUERY = 10 ** 7
+
+    def __init__(self, lmp_trj_parser: MolTrajParserInterface, types_a, types_b, num_bins=100, r_max=None,
+                 frames_per_block=None, start=None, stop=None, stride=None, timestep_range=None):
+        """
+        :param lmp_trj_parser: Parser of the trajectory
+        :param types_a: Atom type or list of atom types of the central atoms
+        :param types_b: Atom type or list of atom types of the neighbour atoms
+        :param num_bins: Number of bins between 0 and r_max
+        :param r_max: Cutoff distance, at most half the shortest periodic box length of every frame (default: half of
+        it in the first frame)
+        :param frames_per_block: Frames averaged into each returned g(r) (default: all frames in one block)
+        :param start: First frame number (slice semantics, see LAMMPSTrajParser.iter_frames())
+        :param stop: Frame number to stop before
+        :param stride: Step between the used frame numbers
+        :param timestep_range: Optional (min, max) time-steps of the used frames
+        """
+        self._lmp_trj_parser = lmp_trj_parser
+        self._types_a = np.atleast_1d(types_a)
+        self._types_b = np.atleast_1d(types_b)
+        self._num_bins = num_bins
+        self._r_max = r_max
+        self._frames_per_block = frames_per_block
+        self._frame_selection = {'start': start, 'stop': stop, 'stride': stride, 'timestep_range': timestep_range}
+        self._rdf_list = []
+
+    @property
+    def input_file_path(self):
+        return self._lmp_trj_parser.general_file_reader.input_file_path
+
+    @property
+    def rdf_list(self):
+        return self._rdf_list
+
+    def read(self):
+        # Lets the calculator stand in for the reader of a LAMMPS rdf file (e.g. in HydrationNumberCalculator).
+        return self.calculate()
+
+    def calculate(self):
+        if self.rdf_list:
+            return self.rdf_list
+
+        histogram = np.zeros(self._num_bins, dtype=np.int64)
+        # Sum over the frames of N_a * density of b, the normalization of the pair counts.
+        pair_normalization = 0.0
+        num_central_atoms = 0
+        num_block_frames = 0
+        r_max = self._r_max
+        time_step = None
+        for frame in self._lmp_trj_parser.iter_frames(**self._frame_selection):
+            box_lengths, periodic = self._get_box(frame)
+            max_r_max = 0.5 * box_lengths[periodic].min() if periodic.any() else None
+            if r_max is None:
+                if max_r_max is None:
+                    raise ValueError(f'r_max must be given for the non-periodic box of {self.input_file_path}')
+                r_max = max_r_max
+            # The KD-tree only returns minimum-image distances, so the shells beyond half the box would be undercounted.
+            if max_r_max is not None and r_max > max_r_max:
+                raise ValueError(f'r_max ({r_max}) exceeds half the shortest periodic box length ({max_r_max}) in '
+                                 f'frame {frame["time-step"]} of {self.input_file_path}')
+
+            positions, box_sizes = self._get_positions(frame, box_lengths, periodic, r_max)
+            indices_a, indices_b = self._get_selections(frame)
+            histogram += self._bin_pair_distances(positions, indices_a, indices_b, box_sizes, r_max)
+            # An atom in both selections is not its own neighbour, so it has one neighbour less than N_b.
+            num_shared_atoms = len(np.intersect1d(indices_a, indices_b, assume_unique=True))
+            pair_normalization += (len(indices_a) * len(indices_b) - num_shared_atoms) / np.prod(box_lengths)
+            num_central_atoms += len(indices_a)
+            num_block_frames += 1
+            time_step = frame['time-step']
+
+            if num_block_frames == self._frames_per_block:
+                self.rdf_list.append(self._get_rdf_entry(time_step, histogram, pair_normalization, num_central_atoms,
+                                                         r_max))
+                histogram = np.zeros(self._num_bins, dtype=np.int64)
+                pair_normalization = 0.0
+                num_central_atoms = 0
+                num_block_frames = 0
+
+        if num_block_frames > 0:
+            self.rdf_list.append(self._get_rdf_entry(time_step, histogram, pair_normalization, num_central_atoms,
+                                                     r_max))
+        return self.rdf_list
+
+    def _get_box(self, frame):
+        box = frame['box']
+        if box is None:
+            raise ValueError(f'Frame {frame["time-step"]} of {self.input_file_path} has no box')
+        if box['tilt'] is not None:
+            raise ValueError(f'Triclinic boxes are not supported by the periodic KD-tree ({self.input_file_path})')
+
+        box_lengths = box['bounds'][:, 1] - box['bounds'][:, 0]
+        # The boundary flags are 'pp' for periodic dimensions (f, s or m otherwise), or just 'p' in older dumps.
+        boundary = box['boundary'] if box['boundary'] else ['pp', 'pp', 'pp']
+        periodic = np.array([flag.startswith('p') for flag in boundary[:3]])
+        return box_lengths, periodic
+
+    def _get_positions(self, frame, box_lengths, periodic, r_max):
+        atoms = frame['atoms']
+        coordinate_columns = next((columns for columns in self.COORDINATE_COLUMNS
+                                   if all(column in atoms.dtype.names for column in columns)), None)
+        if coordinate_columns is None:
+            raise ValueError(f'No coordinate columns found in {self.input_file_path} (columns: {atoms.dtype.names})')
+
+        positions = np.column_stack([atoms[column] for column in coordinate_columns]).astype(np.float64)
+        if coordinate_columns[0].startswith('xs'):
+            positions *= box_lengths
+        else:
+            positions -= frame['box']['bounds'][:, 0]
+
+        # The KD-tree needs every coordinate in [0, box size). Periodic dimensions are wrapped into the box,
+        # non-periodic ones are shifted and given a box larger than their extent plus the cutoff.
+        box_sizes = box_lengths.copy()
+        positions[:, periodic] = np.mod(positions[:, periodic], box_lengths[periodic])
+        positions[:, periodic] = np.where(positions[:, periodic] >= box_lengths[periodic], 0.0,
+                                          positions[:, periodic])
+        if not periodic.all():
+            lowest = positions[:, ~periodic].min(axis=0)
+            positions[:, ~periodic] -= lowest
+            box_sizes[~periodic] = positions[:, ~periodic].max(axis=0) + r_max + 1.0
+
+        return positions, box_sizes
+
+    def _get_selections(self, frame):
+        # The atoms are identified by their row in the frame, so the selections can overlap (e.g. types 1 2 and 2).
+        atoms = frame['atoms']
+        atom_types = atoms['type'] if 'type' in atoms.dtype.names else np.ones(len(atoms), dtype=np.int32)
+        return np.flatnonzero(np.isin(atom_types, self._types_a)), np.flatnonzero(np.isin(atom_types, self._types_b))
+
+    def _bin_pair_distances(self, positions, indices_a, indices_b, box_sizes, r_max):
+        if len(indices_a) == 0 or len(indices_b) == 0:
+            return np.zeros(self._num_bins, dtype=np.int64)
+
+        positions_a = positions[indices_a]
+        positions_b = positions[indices_b]
+        is_same_selection = np.array_equal(indices_a, indices_b)
+        has_shared_atoms = is_same_selection or np.isin(indices_a, indices_b, assume_unique=True).any()
+        tree_b = cKDTree(positions_b, boxsize=box_sizes)
+        expected_neighbours = len(positions_b) * 4.0 / 3.0 * np.pi * r_max ** 3 / np.prod(box_sizes)
+        chunk_size = max(1, int(self.MAX_PAIRS_PER_QUERY / max(expected_neighbours, 1.0)))
+        histogram = np.zeros(self._num_bins, dtype=np.int64)
+        for chunk_start in range(0, len(positions_a), chunk_size):
+            chunk = positions_a[chunk_start:chunk_start + chunk_size]
+            tree_a = tree_b if is_same_selection and len(chunk) == len(positions_a) else \
+                cKDTree(chunk, boxsize=box_sizes)
+            pairs = tree_a.sparse_distance_matrix(tree_b, r_max, output_type='ndarray')
+            distances = pairs['v']
+            if has_shared_atoms:
+                # An atom is not its own neighbour; every other pair is counted from both of its atoms.
+                distances = distances[indices_a[pairs['i'] + chunk_start] != indices_b[pairs['j']]]
+
+            bin_numbers = (distances * (self._num_bins / r_max)).astype(np.int64)
+            histogram += np.bincount(bin_numbers[bin_numbers < self._num_bins], minlength=self._num_bins)
+        return histogram
+
+    def _get_rdf_entry(self, time_step, histogram, pair_normalization, num_central_atoms, r_max):
+        bin_width = r_max / self._num_bins
+        bin_edges = np.arange(self._num_bins + 1) * bin_width
+        shell_volumes = 4.0 / 3.0 * np.pi * (bin_edges[1:] ** 3 - bin_edges[:-1] ** 3)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rdf = histogram / (pair_normalization * shell_volumes)
+            coordination_numbers = np.cumsum(histogram) / num_central_atoms
+
+        rdf_df = pd.DataFrame({'Row': np.arange(1, self._num_bins + 1), 'r': bin_edges[:-1] + 0.5 * bin_width,
+                               'g(r)': rdf, 'n(r)': coordination_numbers}, columns=self.COLUMN_NAMES)
+        return {'time_step': time_step, 'data': rdf_df}
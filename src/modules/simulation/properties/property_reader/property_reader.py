@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 import json
 import os
+import threading
+import time
 
 from src.modules.simulation.component.particle.particle import Particle
 from src.modules.thermodynamics.reactions.reaction_interface import ReactionInterface
@@ -30,6 +32,92 @@ class JSONReader(PropertyReaderInterface):
             raise e
 
 
+class JSONDatabase:
+    """
+    Process-wide view of a JSON database file holding a list of records with a 'name' (particles, reactions, ...).
+
+    Every file is loaded once per process and indexed by the lowercase record names, so lookups are O(1). The file is
+    reloaded when its size or modification time changes; the check is done at most once per RELOAD_CHECK_INTERVAL
+    seconds to keep lookups free of filesystem calls.
+    """
+    RELOAD_CHECK_INTERVAL = 2.0
+    _databases = {}
+    _databases_lock = threading.Lock()
+
+    def __init__(self, json_file_path):
+        self._json_file_path = json_file_path
+        self._records = []
+        self._name_index = {}
+        self._file_signature = None
+        self._last_check_time = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_database(cls, json_file_path):
+        abs_json_file_path = os.path.abspath(json_file_path)
+        with cls._databases_lock:
+            if abs_json_file_path not in cls._databases:
+                cls._databases[abs_json_file_path] = cls(abs_json_file_path)
+            return cls._databases[abs_json_file_path]
+
+    @property
+    def json_file_path(self):
+        return self._json_file_path
+
+    @property
+    def records(self):
+        self._reload_if_changed()
+        return self._records
+
+    def find(self, name):
+        """
+        Find a record by name (case-insensitive).
+        :param name: Name of the record
+        :return: The record dict, or None if there is no record with that name
+        """
+        self._reload_if_changed()
+        return self._name_index.get(name.lower())
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if self._last_check_time is not None and now - self._last_check_time < self.RELOAD_CHECK_INTERVAL:
+            return
+
+        with self._lock:
+            self._last_check_time = now
+            try:
+                file_stat = os.stat(self.json_file_path)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Could not find the JSON file at {self.json_file_path}")
+
+            file_signature = (file_stat.st_size, file_stat.st_mtime_ns)
+            if file_signature != self._file_signature:
+                self._load(file_signature)
+
+    def _load(self, file_signature):
+        try:
+            with open(self.json_file_path, 'r') as file:
+                records = json.load(file)
+            if not isinstance(records, list):
+                raise ValueError(f"Error decoding the JSON database at {self.json_file_path}")
+        except ValueError:
+            # Keep serving the last good version if the file is caught in the middle of an edit.
+            if self._file_signature is not None:
+                print(f"Warning: could not reload the JSON database at {self.json_file_path}; keeping the loaded one.")
+                self._last_check_time = None
+                return
+            raise
+
+        # The first record wins for a repeated name, as in a linear search.
+        name_index = {}
+        for record in records:
+            name_index.setdefault(record['name'].lower(), record)
+
+        self._records = records
+        self._name_index = name_index
+        self._file_signature = file_signature
+
+
 class JSONParticlePropertyReader(JSONReader):
     REL_PATH_TO_PARTICLE_DATABASE = '../../../../../assets/particles_database/particles_prop.json'
     CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -39,12 +127,11 @@ class JSONParticlePropertyReader(JSONReader):
         super().__init__(self.ABS_PATH_TO_PARTICLE_DATABASE)
 
     def read_properties(self, particle: Particle):
-        db_particles = self.read_json()
-        for db_particle in db_particles:
-            if db_particle['name'].lower() == particle.name.lower():
-                particle.mass = db_particle["mass"]
-                particle.charge = db_particle["charge"]
-                return f"Successfully read the {particle.name} properties from the database."
+        db_particle = JSONDatabase.get_database(self.json_file_path).find(particle.name)
+        if db_particle is not None:
+            particle.mass = db_particle["mass"]
+            particle.charge = db_particle["charge"]
+            return f"Successfully read the {particle.name} properties from the database."
 
         return "Particle not found."
 
@@ -58,22 +145,21 @@ class JSONReactionPropertyReader(JSONReader):
         super().__init__(self.ABS_PATH_TO_REACTION_DATABASE)
 
     def read_properties(self, reaction: ReactionInterface):
-        db_reactions = self.read_json()
-        for db_reaction in db_reactions:
-            if db_reaction['name'].lower() == reaction.name.lower():
-                # Add reactants.
-                for db_reactant in db_reaction['reactants']:
-                    reactant_to_add = LAMMPSPhysicalReactionSubstance(db_reactant["name"], db_reactant["mass"],
-                                                                      db_reactant["stoch_coeff"], None,
-                                                                      db_reactant["sim_foldername_relpath"])
-                    reaction.add_reactant(reactant_to_add)
-                # Add products.
-                for db_product in db_reaction['products']:
-                    product_to_add = LAMMPSPhysicalReactionSubstance(db_product["name"], db_product["mass"],
-                                                                     db_product["stoch_coeff"], None,
-                                                                     db_product["sim_foldername_relpath"])
-                    reaction.add_product(product_to_add)
-                return f"Successfully read the {reaction.name} properties from the database."
+        db_reaction = JSONDatabase.get_database(self.json_file_path).find(reaction.name)
+        if db_reaction is not None:
+            # Add reactants.
+            for db_reactant in db_reaction['reactants']:
+                reactant_to_add = LAMMPSPhysicalReactionSubstance(db_reactant["name"], db_reactant["mass"],
+                                                                  db_reactant["stoch_coeff"], None,
+                                                                  db_reactant["sim_foldername_relpath"])
+                reaction.add_reactant(reactant_to_add)
+            # Add products.
+            for db_product in db_reaction['products']:
+                product_to_add = LAMMPSPhysicalReactionSubstance(db_product["name"], db_product["mass"],
+                                                                 db_product["stoch_coeff"], None,
+                                                                 db_product["sim_foldername_relpath"])
+                reaction.add_product(product_to_add)
+            return f"Successfully read the {reaction.name} properties from the database."
 
         return "Reaction not found."
 
@@ -3,49 +3,59 @@ import numpy as np
 
 from modules.simulation.lammps_parser import LammpsLogParser
 from src.modules.simulation.sim_case.sim_case_interface import SimCaseInterface
-from src.modules.simulation.sim_data.data_interface import OutputSimData
+from src.modules.simulation.sim_data.data_interface import OutputSimData, SimDataMemoryBudget
 from src.modules.simulation.sim_data.data_interface import ThermoData
 
 from utilities.files.file_reader import GeneralFileReader
 from src.modules.simulation.sim_file_reader.global_timeavg_property_reader import GlobalTimeAvgPropertyReader
 from src.modules.simulation.forcefield.forcefield import ForceFieldInterface
 from modules.config_loaders.config_loader import ConfigLoader
+from src.modules.config_loaders.config_loader import SimCaseConfigResolver
 from src.modules.simulation.sim_case.sim_case_interface import SimCaseFileFolderManager
 
 from src.modules.simulation.component.particle.particle import Particle
 from src.modules.simulation.component.particle.particles import Particles
 from src.modules.simulation.sim_file_reader.prop_profile_data_reader import PropProfileReader
 from src.utilities.manage_file_folder import filter_files_by_word
-from src.utilities.manage_file_folder import get_file_names_and_paths
-from src.utilities.manage_file_folder import find_files_with_extension
 from src.modules.simulation.sim_file_reader.print_property_reader import PrintPropertyReader
+from src.utilities.files.compression import open_file
+from src.utilities.files.parsed_data_cache import ParsedDataCache
 
 
 class LAMMPSSimCase(SimCaseInterface):
 
     def __init__(self, sim_case_file_folder: SimCaseFileFolderManager, lmp_log_parser: LammpsLogParser, particles: Particles,
                  forcefield: ForceFieldInterface, config_loader: ConfigLoader,
-                 thermo_data: ThermoData):
+                 thermo_data: ThermoData, parsed_data_cache: ParsedDataCache = None,
+                 memory_budget: SimDataMemoryBudget = None):
         self._sim_case_file_folder = sim_case_file_folder
         self._lmp_log_parser = lmp_log_parser
         self._forcefield = forcefield
         self._particles = particles
         self._thermo_data = thermo_data
-        self._sim_out_data = OutputSimData()
+        # The output data is read lazily, on first access, and released when the sim case is exited.
+        self._sim_out_data = OutputSimData(memory_budget)
+        self._parsed_data_cache = parsed_data_cache
         self._global_props = None
         self.num_atom_types = 0
         self.Natoms = 0
-        self.configs = config_loader.load_configs()
+        # Shared by all sim cases: the configs are read, merged and validated once per process.
+        self.configs = SimCaseConfigResolver.resolve(config_loader)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
         return False
 
+    def release(self):
+        self._sim_out_data.release()
+        self._global_props = None
+
     def _update_particles_number(self):
-        self.Natoms = sum([particle._count for particle in self._particles.particles])
-        self.num_atom_types = len(self._particles.particles)
+        self.Natoms = self._particles.total_count
+        self.num_atom_types = len(self._particles)
 
     @property
     def sim_case_file_folder(self) -> SimCaseFileFolderManager:
@@ -55,6 +65,10 @@ class LAMMPSSimCase(SimCaseInterface):
     def sim_case_file_folder(self, value: SimCaseFileFolderManager):
         self._sim_case_file_folder = value
 
+    @property
+    def file_catalog(self):
+        return self.sim_case_file_folder.file_catalog
+
     @property
     def sim_out_data(self):
         return self._sim_out_data
@@ -103,10 +117,18 @@ class LAMMPSSimCase(SimCaseInterface):
         self._read_irwork_data() if "fe" in data_to_read_dict else ...
         self._read_msd_data() if "msd" in data_to_read_dict else ...
         self._read_rdf_data() if "rdf" in data_to_read_dict else ...
-        self._read_global_props(header_line_number=1) if "global_props" in data_to_read_dict else ...
+        self._read_global_props(header_line_number=1, inputs=self._get_output_data_inputs(data_to_read_dict, "global_props")) if "global_props" in data_to_read_dict else ...
+        self._read_global_props_stats(header_line_number=1, inputs=self._get_output_data_inputs(data_to_read_dict, "global_props_stats")) if "global_props_stats" in data_to_read_dict else ...
         self._read_print_props() if "print_props" in data_to_read_dict else ...
         self._read_density_profiles(data_to_read_dict["density_profiles"]) if "density_profiles" in data_to_read_dict else ...
 
+    @staticmethod
+    def _get_output_data_inputs(data_to_read_dict, data_type):
+        # The data types to read are given either as a list/string or as a dict with the reading inputs of each type.
+        if isinstance(data_to_read_dict, dict) and isinstance(data_to_read_dict[data_type], dict):
+            return data_to_read_dict[data_type]
+        return {}
+
     def _read_ff_params(self):
         # Get the path to the force field file from the simulation output log
         ff_file_path = self._lmp_log_parser.get_text_using_label(label='pair_coeff', output_text_pos=3, instance_match_num=2)
@@ -126,40 +148,51 @@ class LAMMPSSimCase(SimCaseInterface):
         self.thermo_data.Vol = self._lmp_log_parser.get_value_of_variable("Volume after nph:", "p")
 
     def _read_print_props(self):
-        path_to_print_prop_file = find_files_with_extension(self.sim_case_file_folder.sim_case_path,
-                                                            self.configs["FileExtensions"]["PRINT_PROPS"])
+        path_to_print_prop_file = self.file_catalog.find_files_with_extension(self.sim_case_file_folder.sim_case_path,
+                                                                              self.configs["FileExtensions"]["PRINT_PROPS"])
         if len(path_to_print_prop_file) == 1:
-            general_file_reader = GeneralFileReader(path_to_print_prop_file[0])
-            print_props = PrintPropertyReader(general_file_reader).read()
-            self.sim_out_data.add('print_props', print_props)
+            # The readers keep what they parse, so every load uses a new one and an evicted payload is really freed.
+            self.sim_out_data.add_lazy('print_props', lambda: PrintPropertyReader(
+                GeneralFileReader(path_to_print_prop_file[0]), self._parsed_data_cache).read())
         else:
             raise Exception(
                 f"Error: more than one {self.configs['FileExtensions']['PRINT_PROPS']} file found in {self.sim_case_file_folder.sim_case_path}.")
 
     def _read_density_profiles(self, inputs):
-        density_profiles = []
+        density_profile_file_paths = []
         density_profile_fns = inputs["file_names"]
         for filename in density_profile_fns:
-            file_path = os.path.join(self.sim_case_file_folder.sim_case_path, filename)
-            if file_path:
-                try:
-                    # Read the contents of the density profile.
-                    general_file_reader = GeneralFileReader(file_path)
-                    density_profile_reader = PropProfileReader(general_file_reader, inputs["starting_tstep"],
-                                                               inputs["final_tstep"],
-                                                               inputs["skipping_rows"])
-                    density_profile = density_profile_reader.read(num_args_per_tstep_line=3)
-                    density_profiles.append({"file_path": file_path, "profile": density_profile})
-                except Exception as e:
-                    print(f"Encountered following exception while reading the density profile:{e}")
-
-            else:
+            file_path = self.file_catalog.resolve_compressed_path(os.path.join(self.sim_case_file_folder.sim_case_path, filename))
+            if not file_path:
                 raise ValueError(f'No file path for the file: {filename}')
+            if self.file_catalog.exists(file_path):
+                density_profile_file_paths.append(file_path)
+            else:
+                print(f"Encountered following exception while reading the density profile:File {file_path} not found")
 
-        self.sim_out_data.add('density_profiles', density_profiles) if density_profiles else ...
+        # As when the profiles were read eagerly, there is no entry without profiles.
+        if density_profile_file_paths:
+            self.sim_out_data.add_lazy('density_profiles',
+                                       lambda: self._load_density_profiles(density_profile_file_paths, inputs))
 
-    def _read_global_props(self, header_line_number):
-        found_path_to_global_props_file = find_files_with_extension(self.sim_case_file_folder.sim_case_path, self.configs["FileExtensions"][
+    def _load_density_profiles(self, density_profile_file_paths, inputs):
+        density_profiles = []
+        for file_path in density_profile_file_paths:
+            try:
+                # Read the contents of the density profile.
+                general_file_reader = GeneralFileReader(file_path)
+                density_profile_reader = PropProfileReader(general_file_reader, inputs["starting_tstep"],
+                                                           inputs["final_tstep"],
+                                                           inputs["skipping_rows"], self._parsed_data_cache)
+                density_profile = density_profile_reader.read(num_args_per_tstep_line=3)
+                density_profiles.append({"file_path": file_path, "profile": density_profile})
+            except Exception as e:
+                print(f"Encountered following exception while reading the density profile:{e}")
+
+        return density_profiles
+
+    def _find_global_props_file(self):
+        found_path_to_global_props_file = self.file_catalog.find_files_with_extension(self.sim_case_file_folder.sim_case_path, self.configs["FileExtensions"][
             "GLOBAL_PROPS_TIME_AVERAGE"])
 
         if len(found_path_to_global_props_file) == 1:
@@ -167,23 +200,35 @@ class LAMMPSSimCase(SimCaseInterface):
         else:
             print(
                 f"Warning: more than one {self.configs['FileExtensions']['GLOBAL_PROPS_TIME_AVERAGE']} file found in {self.sim_case_file_folder.sim_case_path}.")
-            path_to_global_props_file = os.path.join(self.sim_case_file_folder.sim_case_path,
-                                                     self.configs["FileNames"]["GLOBAL_PROPS_TIME_AVERAGED"])
+            path_to_global_props_file = self.file_catalog.resolve_compressed_path(
+                os.path.join(self.sim_case_file_folder.sim_case_path, self.configs["FileNames"]["GLOBAL_PROPS_TIME_AVERAGED"]))
 
-        if path_to_global_props_file:
-            general_file_reader = GeneralFileReader(path_to_global_props_file)
-            global_props = GlobalTimeAvgPropertyReader(general_file_reader).read(header_line_number)
-            self.sim_out_data.add('global_props', global_props)
-        else:
+        if not path_to_global_props_file:
             raise Exception(
                 f"No file found for the global properties of the following simulation case:{self.sim_case_file_folder.sim_case_path} ")
+        return path_to_global_props_file
+
+    def _read_global_props(self, header_line_number, inputs=None):
+        path_to_global_props_file = self._find_global_props_file()
+        inputs = inputs if inputs is not None else {}
+        self.sim_out_data.add_lazy('global_props', lambda: GlobalTimeAvgPropertyReader(
+            GeneralFileReader(path_to_global_props_file), self._parsed_data_cache).read(
+            header_line_number, inputs.get("time_step0"), inputs.get("columns"),
+            inputs.get("float_dtype", np.float64)))
+
+    def _read_global_props_stats(self, header_line_number, inputs=None):
+        # Only the running statistics of the properties after t0 are kept, not the series.
+        path_to_global_props_file = self._find_global_props_file()
+        inputs = inputs if inputs is not None else {}
+        self.sim_out_data.add_lazy('global_props_stats', lambda: GlobalTimeAvgPropertyReader(
+            GeneralFileReader(path_to_global_props_file), self._parsed_data_cache).reduce(
+            header_line_number, inputs.get("time_step0"), inputs.get("columns"), inputs.get("block_size")))
 
     def _read_rdf_data(self):
-        rdf_filename = find_files_with_extension(self.sim_case_file_folder.sim_case_path,
-                                                 self.configs["FileExtensions"]["RDF_DATA"])
+        rdf_filename = self.file_catalog.find_files_with_extension(self.sim_case_file_folder.sim_case_path,
+                                                                   self.configs["FileExtensions"]["RDF_DATA"])
         if len(rdf_filename) == 1:
-            rdf_lines = GeneralFileReader(rdf_filename[0]).read()
-            self.sim_out_data.add('rdf', rdf_lines)
+            self.sim_out_data.add_lazy('rdf', lambda: GeneralFileReader(rdf_filename[0]).read())
         else:
             raise Exception(f'Error: more than one RDF files found in {self.sim_case_file_folder.sim_case_path}.')
 
@@ -191,7 +236,7 @@ class LAMMPSSimCase(SimCaseInterface):
         fe_irwork = OutputSimData()
         fe_data_path = os.path.join(self.sim_case_file_folder.sim_case_path,
                                     self.configs["DirectoryPaths"]["REL_PATH_FE_DATA"])
-        [filenames, file_paths] = get_file_names_and_paths(fe_data_path)
+        [filenames, file_paths] = self.file_catalog.get_file_names_and_paths(fe_data_path)
         # Check for "backward" and "forward" in filenames
         # Backward irreversible work.
         [_, filtered_file_paths] = filter_files_by_word(filenames, file_paths, 'backward')
@@ -199,11 +244,13 @@ class LAMMPSSimCase(SimCaseInterface):
             fe_backward_filepath = filtered_file_paths[0]
         else:
             # Now we should search for the filename in the config file.
-            fe_backward_filename = self.configs["FileNames"]["NEFE_IRWORK_BACKWARD_FILENAME"]
-            fe_backward_filepath = os.path.join(fe_data_path, fe_backward_filename)
+            fe_backward_filename = SimCaseConfigResolver.require(
+                self.configs, ['FileNames.NEFE_IRWORK_BACKWARD_FILENAME'])["FileNames"]["NEFE_IRWORK_BACKWARD_FILENAME"]
+            fe_backward_filepath = self.file_catalog.resolve_compressed_path(os.path.join(fe_data_path, fe_backward_filename))
 
         if fe_backward_filepath:
-            dE, lam = np.loadtxt(fe_backward_filepath, unpack=True)
+            with open_file(fe_backward_filepath, 'r') as fe_backward_file:
+                dE, lam = np.loadtxt(fe_backward_file, unpack=True)
             backward = OutputSimData().add('dE', dE).add('lam', lam)
             fe_irwork.add('backward', backward)
         else:
@@ -215,11 +262,13 @@ class LAMMPSSimCase(SimCaseInterface):
             fe_forward_filepath = filtered_file_paths[0]
         else:
             # Now we should search for the filename in the config file.
-            fe_forward_filename = self.configs["FileNames"]["NEFE_IRWORK_FORWARD_FILENAME"]
-            fe_forward_filepath = os.path.join(fe_data_path, fe_forward_filename)
+            fe_forward_filename = SimCaseConfigResolver.require(
+                self.configs, ['FileNames.NEFE_IRWORK_FORWARD_FILENAME'])["FileNames"]["NEFE_IRWORK_FORWARD_FILENAME"]
+            fe_forward_filepath = self.file_catalog.resolve_compressed_path(os.path.join(fe_data_path, fe_forward_filename))
 
         if fe_forward_filepath:
-            dE, lam = np.loadtxt(filtered_file_paths[0], unpack=True)
+            with open_file(fe_forward_filepath, 'r') as fe_forward_file:
+                dE, lam = np.loadtxt(fe_forward_file, unpack=True)
             forward = OutputSimData().add('dE', dE).add('lam', lam)
             fe_irwork.add('forward', forward)
         else:
@@ -235,11 +284,12 @@ class LAMMPSSimCase(SimCaseInterface):
         msd_data = OutputSimData()
         msd_data_path = os.path.join(self.sim_case_file_folder.sim_case_path,
                                      self.configs["DirectoryPaths"]["REL_PATH_MSD_DATA"])
-        [filenames, file_paths] = get_file_names_and_paths(msd_data_path)
+        [filenames, file_paths] = self.file_catalog.get_file_names_and_paths(msd_data_path)
         # Check for "msd" in filenames
         [filtered_file_names, filtered_file_paths] = filter_files_by_word(filenames, file_paths, 'msd')
         for index, msd_file_path in enumerate(filtered_file_paths):
-            time_steps, msd = np.loadtxt(msd_file_path, unpack=True, skiprows=rows2skip)
+            with open_file(msd_file_path, 'r') as msd_file:
+                time_steps, msd = np.loadtxt(msd_file, unpack=True, skiprows=rows2skip)
             current_msd_file_name = filtered_file_names[index].split('.')[0]
             tmp_msd_data = OutputSimData().add('time_steps', time_steps).add('msd', msd)
             msd_data.add(current_msd_file_name, tmp_msd_data)
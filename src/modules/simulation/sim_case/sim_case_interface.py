@@ -5,30 +5,47 @@ from abc import ABC, abstractmethod
 from src.modules.simulation.sim_data.data_interface import ThermoData
 from src.modules.simulation.component.particle.particles import Particles
 from src.modules.simulation.forcefield.forcefield import ForceFieldInterface
-from src.modules.config_loaders.config_loader import SimCaseConfigs
+from src.modules.config_loaders.config_loader import ConfigLoader, FrozenConfigs, SimCaseConfigResolver
+from src.utilities.files.compression import COMPRESSED_FILE_EXTENSIONS
+from src.utilities.files.file_catalog import ProjectFileCatalog
 
 class SimCaseFileFolderManager:
-    configs = SimCaseConfigs
+    DEFAULT_CONFIGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'simcase_configs.json')
 
-    def __init__(self, sim_case_path, path_to_folder_of_log_file):
+    def __init__(self, sim_case_path, path_to_folder_of_log_file, file_catalog: ProjectFileCatalog = None,
+                 log_file_path=None, configs: FrozenConfigs = None):
         self._sim_case_path = sim_case_path
+        # The configs resolved by the project; the default config file of the sim cases otherwise.
+        self._configs = configs if configs is not None else \
+            SimCaseConfigResolver.resolve(ConfigLoader(self.DEFAULT_CONFIGS_PATH))
         self.path_to_folder_of_log_file = path_to_folder_of_log_file
-        self.log_file_path = self._get_log_file_path()
+        # A catalog shared by the sim cases of a project; otherwise the folders of this sim case are scanned on use.
+        self._file_catalog = file_catalog if file_catalog is not None else ProjectFileCatalog()
+        # A log file path resolved beforehand (e.g. by the parent of a worker process) skips the lookup.
+        self.log_file_path = log_file_path if log_file_path is not None else self._get_log_file_path()
 
     @property
     def sim_case_path(self):
         return self._sim_case_path
 
+    @property
+    def file_catalog(self) -> ProjectFileCatalog:
+        return self._file_catalog
+
+    @property
+    def configs(self) -> FrozenConfigs:
+        return self._configs
+
     def _get_log_file_path(self):
         sim_number = re.findall(r'\d+$', self.sim_case_path)
         sim_number = sim_number[0] if sim_number else None
         if self._sim_case_path != self.path_to_folder_of_log_file:
-            log_file_name = self.configs.LAMMPS_LOG_FILE_TEMPLATE_NAME + "." + str(sim_number)
+            log_file_name = self.configs["FileNames"]["LAMMPS_LOG_FILE_TEMPLATE_NAME"] + "." + str(sim_number)
         else:
-            log_file_name = self.configs.FileNames.LAMMPS_LOG_FILE_TEMPLATE_NAME
-        for root, dirs, files in os.walk(self.path_to_folder_of_log_file):
-            if log_file_name in files:
-                return os.path.join(root, log_file_name)
+            log_file_name = self.configs["FileNames"]["LAMMPS_LOG_FILE_TEMPLATE_NAME"]
+        # The log may also be stored compressed.
+        log_file_names = [log_file_name] + [log_file_name + extension for extension in COMPRESSED_FILE_EXTENSIONS]
+        return self.file_catalog.find_file_in_tree(self.path_to_folder_of_log_file, log_file_names)
 
 
 class SimCaseInterface(ABC):
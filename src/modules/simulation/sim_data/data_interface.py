@@ -1,6 +1,16 @@
+import os
+import pickle
+import sys
+import tempfile
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import MutableMapping
 from typing import Dict
 
+import numpy as np
+import pandas as pd
+
 
 class SimDataInterface(ABC):
     @abstractmethod
@@ -19,9 +29,246 @@ class SimDataInterface(ABC):
 
 
 
+def estimate_size_bytes(value):
+    """
+    Estimate the memory held by a sim-data payload (arrays, DataFrames and the lists/dicts holding them).
+    :param value: The payload
+    :return: Estimated size in bytes
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, OutputSimData):
+        return value.loaded_size_bytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size_bytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class SimDataMemoryBudget:
+    """
+    Memory budget shared by the sim-data entries of all the sim cases of a run.
+
+    Loaded entries are tracked in least-recently-used order. Once their total estimated size exceeds max_size_bytes,
+    the least recently used entries are released: lazy entries drop their payload and reload it from the simulation
+    files on the next access; entries added as spillable are spilled to spill_dir_path (if given) and read back on
+    access. Other entries (e.g. derived results) are never released by the budget.
+    """
+
+    def __init__(self, max_size_bytes, spill_dir_path=None):
+        self._max_size_bytes = max_size_bytes
+        self._spill_dir_path = spill_dir_path
+        self._entries = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # A copy sent to another process starts empty; the entries and the lock stay with this process.
+        state = self.__dict__.copy()
+        state['_entries'] = OrderedDict()
+        state['_size_bytes'] = 0
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_mb(cls, max_size_mb, spill_dir_path=None):
+        return cls(int(max_size_mb * 1024 ** 2), spill_dir_path)
+
+    @property
+    def max_size_bytes(self):
+        return self._max_size_bytes
+
+    @property
+    def spill_dir_path(self):
+        return self._spill_dir_path
+
+    @property
+    def size_bytes(self):
+        return self._size_bytes
+
+    def touch(self, entry):
+        """
+        Record the use of a loaded entry, then release least recently used entries while over the budget.
+        """
+        with self._lock:
+            previous_size_bytes = self._entries.pop(entry, None)
+            if previous_size_bytes is None:
+                previous_size_bytes = entry.size_bytes
+                self._size_bytes += previous_size_bytes
+            self._entries[entry] = previous_size_bytes
+            entries_to_evict = self._get_entries_to_evict(entry)
+
+        for evicted_entry in entries_to_evict:
+            evicted_entry.evict()
+
+    def _get_entries_to_evict(self, used_entry):
+        entries_to_evict = []
+        size_bytes = self._size_bytes
+        for entry, size in self._entries.items():
+            if size_bytes <= self._max_size_bytes:
+                break
+            if entry is not used_entry and entry.is_evictable(self._spill_dir_path is not None):
+                entries_to_evict.append(entry)
+                size_bytes -= size
+        return entries_to_evict
+
+    def forget(self, entry):
+        with self._lock:
+            size_bytes = self._entries.pop(entry, None)
+            if size_bytes is not None:
+                self._size_bytes -= size_bytes
+
+
+class SimDataEntry:
+    """
+    One entry of an OutputSimData: a payload that is either given or loaded on first access by a loader.
+    """
+
+    def __init__(self, value=None, loader=None, memory_budget: SimDataMemoryBudget = None, spillable=False):
+        self._value = value
+        self._is_loaded = loader is None
+        self._loader = loader
+        self._memory_budget = memory_budget
+        self._spillable = spillable
+        self._spill_file_path = None
+        self._size_bytes = None
+        if self._is_loaded and memory_budget is not None:
+            memory_budget.touch(self)
+
+    @property
+    def is_lazy(self):
+        return self._loader is not None
+
+    @property
+    def is_loaded(self):
+        return self._is_loaded
+
+    @property
+    def spillable(self):
+        return self._spillable
+
+    @property
+    def size_bytes(self):
+        if self._size_bytes is None:
+            self._size_bytes = estimate_size_bytes(self._value) if self._is_loaded else 0
+        return self._size_bytes
+
+    def get(self):
+        if not self._is_loaded:
+            if self._spill_file_path is not None:
+                with open(self._spill_file_path, 'rb') as spill_file:
+                    self._value = pickle.load(spill_file)
+                self._remove_spill_file()
+            else:
+                self._value = self._loader()
+            self._is_loaded = True
+            self._size_bytes = None
+
+        if self._memory_budget is not None:
+            self._memory_budget.touch(self)
+        return self._value
+
+    def is_evictable(self, can_spill):
+        return self._is_loaded and (self.is_lazy or (self._spillable and can_spill))
+
+    def evict(self):
+        if not self._is_loaded:
+            return
+
+        if not self.is_lazy:
+            # Spill the payload; it cannot be recreated from the simulation files.
+            spill_file_descriptor, spill_file_path = tempfile.mkstemp(suffix='.pkl',
+                                                                      dir=self._memory_budget.spill_dir_path)
+            try:
+                with os.fdopen(spill_file_descriptor, 'wb') as spill_file:
+                    pickle.dump(self._value, spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+            except (OSError, pickle.PicklingError) as e:
+                print(f"Warning: could not spill the sim data to {spill_file_path}: {e}")
+                os.remove(spill_file_path)
+                return
+            self._spill_file_path = spill_file_path
+
+        self._value = None
+        self._is_loaded = False
+        self._size_bytes = None
+        self._memory_budget.forget(self)
+
+    def release(self):
+        # Drop the payload for good; a lazy entry would reload it on the next access.
+        self._value = None
+        self._is_loaded = not self.is_lazy
+        self._size_bytes = None
+        self._remove_spill_file()
+        if self._memory_budget is not None:
+            self._memory_budget.forget(self)
+
+    def _remove_spill_file(self):
+        if self._spill_file_path is not None:
+            try:
+                os.remove(self._spill_file_path)
+            except OSError:
+                pass
+            self._spill_file_path = None
+
+
+class SimDataDict(MutableMapping):
+    """
+    Dict of sim-data entries whose lazy payloads are loaded when their key is first read.
+    """
+
+    def __init__(self, memory_budget: SimDataMemoryBudget = None):
+        self._entries = {}
+        self._memory_budget = memory_budget
+
+    def __getitem__(self, key):
+        return self._entries[key].get()
+
+    def __setitem__(self, key, value):
+        self.set_entry(key, SimDataEntry(value, memory_budget=self._memory_budget))
+
+    def set_entry(self, key, entry: SimDataEntry):
+        if key in self._entries:
+            self._entries[key].release()
+        self._entries[key] = entry
+
+    def get_entry(self, key) -> SimDataEntry:
+        return self._entries[key]
+
+    def __delitem__(self, key):
+        self._entries.pop(key).release()
+
+    def __contains__(self, key):
+        # Membership must not load a lazy payload.
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self._entries)!r})"
+
+
 class OutputSimData(SimDataInterface):
-    def __init__(self):
-        self._data = dict()
+    """
+    Output data of a sim case. Entries added with add_lazy() are only read from the simulation files when first
+    accessed; with a memory budget, least recently used payloads are released (lazy ones) or spilled to disk.
+    """
+
+    def __init__(self, memory_budget: SimDataMemoryBudget = None):
+        self._memory_budget = memory_budget
+        self._data = SimDataDict(memory_budget)
 
     @property
     def data(self) -> Dict:
@@ -29,12 +276,50 @@ class OutputSimData(SimDataInterface):
 
     @data.setter
     def data(self, value: Dict):
-        self._data = value
+        self.release()
+        self._data = SimDataDict(self._memory_budget)
+        self._data.update(value)
 
-    def add(self, key, data):
-        self.data[key] = data
+    @property
+    def memory_budget(self):
+        return self._memory_budget
+
+    @property
+    def loaded_size_bytes(self):
+        return sum(self._data.get_entry(key).size_bytes for key in self._data)
+
+    def add(self, key, data, spillable=False):
+        """
+        Add an entry with a given payload.
+        :param spillable: Whether the memory budget may spill the payload to disk (derived results are not spillable)
+        """
+        self._data.set_entry(key, SimDataEntry(data, memory_budget=self._memory_budget, spillable=spillable))
         return self
 
+    def add_lazy(self, key, loader):
+        """
+        Add an entry whose payload is loaded by calling loader() when the entry is first accessed.
+        """
+        self._data.set_entry(key, SimDataEntry(loader=loader, memory_budget=self._memory_budget))
+        return self
+
+    def is_loaded(self, key):
+        return self._data.get_entry(key).is_loaded
+
+    def release(self, keys=None):
+        """
+        Release the payloads of some entries (all by default). Lazy entries are kept and reload their payload on the
+        next access; the other entries are removed.
+        :param keys: Key or list of keys to release
+        """
+        keys = list(self._data) if keys is None else [keys] if isinstance(keys, str) else keys
+        for key in keys:
+            entry = self._data.get_entry(key)
+            if entry.is_lazy:
+                entry.release()
+            else:
+                del self._data[key]
+
 
 class ThermoData:
     def __init__(self, T=None, p=None, vol=None):
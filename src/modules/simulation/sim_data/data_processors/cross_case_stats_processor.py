@@ -0,0 +1,139 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from src.modules.simulation.sim_data.data_processors.sim_data_processor_interface import SimDataProcessorInterface
+
+
+class CrossCaseStatsProcessor(SimDataProcessorInterface):
+    """
+    Statistics of the global properties (.prop series) of all the sim cases of a campaign, computed in one pass.
+
+    The series of the cases are stacked into one 2D float array (rows of all cases one after the other, one column per
+    property; properties missing in a case are NaN). The t0 cut of every case is found with searchsorted on its
+    time-steps, so the cut never copies the data, and the statistics of every property of every case are reduced at
+    once with ufunc.reduceat over the row segments of the cases.
+    """
+    STATISTICS = ('count', 'mean', 'std', 'sem', 'min', 'max')
+
+    def __init__(self, case_dfs: Dict = None):
+        self._sim_data = {}
+        self._stacked = None
+        for case_key, case_df in (case_dfs or {}).items():
+            self.add_case(case_key, case_df)
+
+    @property
+    def sim_data(self) -> Dict:
+        return self._sim_data
+
+    @sim_data.setter
+    def sim_data(self, value: Dict):
+        self._sim_data = dict(value)
+        self._stacked = None
+
+    def add_case(self, case_key, case_df: pd.DataFrame):
+        self._sim_data[case_key] = case_df
+        self._stacked = None
+        return self
+
+    def _stack(self, time_step_col_name):
+        if self._stacked is not None and self._stacked['time_step_col_name'] == time_step_col_name:
+            return self._stacked
+
+        column_names = []
+        for case_df in self.sim_data.values():
+            column_names.extend(column for column in case_df.columns
+                                if column != time_step_col_name and column not in column_names)
+        column_positions = {column: position for position, column in enumerate(column_names)}
+
+        case_lengths = np.array([len(case_df) for case_df in self.sim_data.values()], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(case_lengths)))
+        num_rows = int(offsets[-1])
+        # One extra row of zeros, so that reduceat can be given the end of the last case as an index.
+        values = np.full((num_rows + 1, len(column_names)), np.nan)
+        values[num_rows] = 0.0
+        time_steps = np.empty(num_rows, dtype=np.int64)
+        # Whether a case has a column at all, as opposed to a column with NaN values.
+        column_presence = np.zeros((len(self.sim_data), len(column_names)), dtype=bool)
+        for case_num, case_df in enumerate(self.sim_data.values()):
+            start, end = offsets[case_num], offsets[case_num + 1]
+            case_time_steps = case_df[time_step_col_name].to_numpy()
+            # The statistics do not depend on the order of the rows; restarted runs are sorted by time-step.
+            row_order = None if np.all(np.diff(case_time_steps) >= 0) else np.argsort(case_time_steps, kind='stable')
+            time_steps[start:end] = case_time_steps if row_order is None else case_time_steps[row_order]
+            for column in case_df.columns:
+                if column != time_step_col_name:
+                    column_presence[case_num, column_positions[column]] = True
+                    column_values = case_df[column].to_numpy(dtype=np.float64)
+                    values[start:end, column_positions[column]] = \
+                        column_values if row_order is None else column_values[row_order]
+
+        self._stacked = {'time_step_col_name': time_step_col_name, 'column_names': column_names,
+                         'offsets': offsets, 'time_steps': time_steps, 'values': values,
+                         'column_presence': column_presence}
+        return self._stacked
+
+    def _get_case_starts(self, stacked, time_step0):
+        # First row after t0 of every case, from a binary search in its sorted time-steps.
+        offsets = stacked['offsets']
+        time_steps = stacked['time_steps']
+        return np.array([start + np.searchsorted(time_steps[start:end], time_step0, side='right')
+                         for start, end in zip(offsets[:-1], offsets[1:])], dtype=np.int64)
+
+    def process(self, time_step0: int, time_step_col_name: str, processing_col_names=None):
+        """
+        Calculate the statistics of the rows after t0 of every property of every case.
+        :param time_step0: Only the rows with a time-step greater than time_step0 are used
+        :param time_step_col_name: Name of the time-step column
+        :param processing_col_names: Properties to return (default: all)
+        :return: DataFrame indexed by (case, column) with the columns of STATISTICS; std is the sample standard
+        deviation and sem the standard error of the mean
+        """
+        stacked = self._stack(time_step_col_name)
+        column_names = stacked['column_names']
+        values = stacked['values']
+        num_rows = len(stacked['time_steps'])
+        num_cases = len(self.sim_data)
+        index = pd.MultiIndex.from_product([list(self.sim_data), column_names], names=['case', 'column'])
+        if num_cases == 0 or not column_names:
+            return pd.DataFrame(columns=list(self.STATISTICS), index=index)
+
+        # The rows used of case i are [starts[i], ends[i]); reduceat over the alternating starts and ends yields the
+        # reductions of the used segments at the even positions (the odd ones are the cut rows of the next case).
+        starts = self._get_case_starts(stacked, time_step0)
+        ends = stacked['offsets'][1:]
+        segment_indices = np.column_stack((starts, ends)).ravel()
+        segment_lengths = np.diff(np.append(segment_indices, num_rows))
+
+        is_valid = ~np.isnan(values)
+        has_nan = not is_valid[:num_rows].all()
+        filled_values = np.where(is_valid, values, 0.0) if has_nan else values
+        # reduceat of an empty segment returns the row at its index instead of 0, hence the masks on the counts.
+        num_used_rows = np.repeat((ends - starts)[:, None], len(column_names), axis=1)
+        counts = np.where(num_used_rows == 0, 0, np.add.reduceat(is_valid.astype(np.int64), segment_indices,
+                                                                 axis=0)[::2]) if has_nan else num_used_rows
+        is_empty = counts == 0
+        sums = np.where(is_empty, 0.0, np.add.reduceat(filled_values, segment_indices, axis=0)[::2])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+            # Two-pass variance: the squared deviations of the rows from the mean of their case (the rows before the
+            # first segment and the padding row keep a zero mean; they are never summed).
+            row_means = np.zeros_like(values)
+            row_means[segment_indices[0]:num_rows] = np.repeat(np.where(is_empty, 0.0, means).repeat(2, axis=0),
+                                                                segment_lengths, axis=0)
+            squared_deviations = np.subtract(filled_values, row_means, out=row_means) ** 2
+            if has_nan:
+                squared_deviations[~is_valid] = 0.0
+            sums_of_squares = np.add.reduceat(squared_deviations, segment_indices, axis=0)[::2]
+            stds = np.sqrt(np.where(counts > 1, sums_of_squares, np.nan) / (counts - 1))
+            sems = stds / np.sqrt(counts)
+        mins = np.where(is_empty, np.nan, np.fmin.reduceat(values, segment_indices, axis=0)[::2])
+        maxs = np.where(is_empty, np.nan, np.fmax.reduceat(values, segment_indices, axis=0)[::2])
+
+        statistics = {'count': counts, 'mean': means, 'std': stds, 'sem': sems, 'min': mins, 'max': maxs}
+        stats_df = pd.DataFrame({name: statistics[name].reshape(num_cases * len(column_names))
+                                 for name in self.STATISTICS}, index=index)
+        if processing_col_names is not None:
+            stats_df = stats_df.loc[(slice(None), list(processing_col_names)), :]
+        return stats_df
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from scipy import fft
+
+from src.modules.simulation.sim_data.data_processors.cross_case_stats_processor import CrossCaseStatsProcessor
+
+
+def autocorrelation_fft(series, lengths):
+    """
+    Normalized autocorrelation functions of a batch of series, computed with FFT in O(n log n).
+    :param series: 2D array (n_max x number of series); series s holds its values in its first lengths[s] rows
+    :param lengths: Length of every series
+    :return: 2D array of C(t) for the lags t = 0..n_max-1 (NaN for lags beyond a series and for constant series)
+    """
+    n_max = series.shape[0]
+    row_numbers = np.arange(n_max)[:, None]
+    is_used = row_numbers < lengths
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(is_used, series, 0.0).sum(axis=0) / lengths
+    centered = np.where(is_used, series - means, 0.0)
+
+    # Zero-padding to at least 2n turns the circular correlation of the FFT into the linear one.
+    n_fft = fft.next_fast_len(2 * n_max, real=True)
+    spectrum = fft.rfft(centered, n=n_fft, axis=0)
+    autocovariance = fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft, axis=0)[:n_max]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Unbiased estimate at every lag: the sum of the n - t products divided by n - t.
+        autocovariance = autocovariance / (lengths - row_numbers)
+        autocorrelation = autocovariance / autocovariance[0]
+    autocorrelation[~is_used] = np.nan
+    return autocorrelation
+
+
+def statistical_inefficiency(autocorrelation, lengths):
+    """
+    Statistical inefficiency g = 1 + 2 sum_t (1 - t/n) C(t) of a batch of series, the sum being truncated at the first
+    lag where C(t) is no longer positive. N/g is the number of effectively uncorrelated samples of a series of N values.
+    :param autocorrelation: Output of autocorrelation_fft()
+    :param lengths: Length of every series
+    :return: Array of g (at least 1; 1 for constant series)
+    """
+    autocorrelation = autocorrelation[1:]
+    lags = np.arange(1, autocorrelation.shape[0] + 1)[:, None]
+    is_positive = np.cumprod(autocorrelation > 0, axis=0, dtype=bool)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        terms = np.where(is_positive, (1.0 - lags / lengths) * autocorrelation, 0.0)
+    return np.maximum(1.0 + 2.0 * terms.sum(axis=0), 1.0)
+
+
+def detect_equilibration(series, lengths, num_candidates=20, max_discarded_fraction=0.5):
+    """
+    Detect the end of the equilibration of a batch of series: of num_candidates evenly spaced starting points in the
+    first max_discarded_fraction of every series, the one that leaves the most effectively uncorrelated samples.
+    :param series: 2D array (n_max x number of series); series s holds its values in its first lengths[s] rows
+    :param lengths: Length of every series
+    :param num_candidates: Number of tested starting points
+    :param max_discarded_fraction: Largest fraction of a series that may be discarded as equilibration
+    :return: Dict of arrays, one entry per series: 'start' (row number of the detected start), 'count', 'mean',
+    'std', 'g' (statistical inefficiency), 'n_eff' (effective number of samples) and 'sem' (standard error of the mean
+    corrected for the time correlation)
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    n_max, num_series = series.shape
+    row_numbers = np.arange(n_max)[:, None]
+    column_numbers = np.arange(num_series)[None, :]
+    best = {'start': np.zeros(num_series, dtype=np.int64), 'n_eff': np.full(num_series, -np.inf),
+            'g': np.full(num_series, np.nan), 'mean': np.full(num_series, np.nan),
+            'std': np.full(num_series, np.nan)}
+    for candidate_num in range(num_candidates):
+        starts = (candidate_num * max_discarded_fraction * lengths // num_candidates).astype(np.int64)
+        candidate_lengths = lengths - starts
+        # The candidate series, shifted to start at row 0 (rows past the end are ignored).
+        shifted = series[np.minimum(row_numbers + starts, n_max - 1), column_numbers]
+        is_used = row_numbers < candidate_lengths
+        g = statistical_inefficiency(autocorrelation_fft(shifted, candidate_lengths), candidate_lengths)
+        n_eff = np.where(candidate_lengths > 1, candidate_lengths / g, 0.0)
+
+        is_better = n_eff > best['n_eff']
+        if is_better.any():
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = np.where(is_used, shifted, 0.0).sum(axis=0) / candidate_lengths
+                stds = np.sqrt(np.where(is_used, (shifted - means) ** 2, 0.0).sum(axis=0) / (candidate_lengths - 1))
+            stds[candidate_lengths < 2] = np.nan
+            for name, values in (('start', starts), ('n_eff', n_eff), ('g', g), ('mean', means), ('std', stds)):
+                best[name] = np.where(is_better, values, best[name])
+
+    best['count'] = lengths - best['start']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        best['sem'] = best['std'] * np.sqrt(best['g'] / best['count'])
+    return best
+
+
+class EquilibrationProcessor(CrossCaseStatsProcessor):
+    """
+    Automatic t0: detects the end of the equilibration of every property of every sim case (see
+    detect_equilibration()) and reports the statistics after it, with the standard error of the mean corrected for the
+    time correlation through the statistical inefficiency. All the series are processed as one batch per candidate
+    starting point.
+    """
+    STATISTICS = ('t0', 'count', 'mean', 'std', 'g', 'n_eff', 'sem')
+
+    def __init__(self, case_dfs=None, num_candidates=20, max_discarded_fraction=0.5):
+        super().__init__(case_dfs)
+        self._num_candidates = num_candidates
+        self._max_discarded_fraction = max_discarded_fraction
+
+    def process(self, time_step0, time_step_col_name: str, processing_col_names=None):
+        """
+        Detect the equilibration and calculate the statistics of every property of every case.
+        :param time_step0: Optional time-step before which the rows are always discarded (None: search from the start)
+        :param time_step_col_name: Name of the time-step column
+        :param processing_col_names: Properties to process (default: all)
+        :return: DataFrame indexed by (case, column) with the columns of STATISTICS; t0 is the detected time-step
+        """
+        stacked = self._stack(time_step_col_name)
+        column_names = stacked['column_names'] if processing_col_names is None else list(processing_col_names)
+        column_positions = [stacked['column_names'].index(column) for column in column_names]
+        values = stacked['values']
+        time_steps = stacked['time_steps']
+        offsets = stacked['offsets']
+        num_cases = len(self.sim_data)
+        index = pd.MultiIndex.from_product([list(self.sim_data), column_names], names=['case', 'column'])
+        if num_cases == 0 or not column_names:
+            return pd.DataFrame(columns=list(self.STATISTICS), index=index)
+
+        starts = self._get_case_starts(stacked, time_step0) if time_step0 is not None else offsets[:-1]
+        case_lengths = offsets[1:] - starts
+        # One series per (case, column), left-aligned in a 2D batch.
+        n_max = max(int(case_lengths.max()), 1)
+        row_numbers = np.arange(n_max)[:, None]
+        series_starts = np.repeat(starts, len(column_names))
+        series_columns = np.tile(column_positions, num_cases)
+        series = values[np.minimum(row_numbers + series_starts, len(values) - 1), series_columns]
+        # A property missing in a case is processed as an empty series.
+        is_present = stacked['column_presence'][:, column_positions].ravel()
+        series_lengths = np.where(is_present, np.repeat(case_lengths, len(column_names)), 0)
+
+        # NaN rows would turn the autocorrelation into NaN; they are dropped by moving the valid rows of every series
+        # to its front (in their order), and the detected start is mapped back to the row of the original series.
+        is_valid = (row_numbers < series_lengths) & ~np.isnan(series)
+        row_order = np.argsort(~is_valid, axis=0, kind='stable')
+        series = np.take_along_axis(series, row_order, axis=0)
+        valid_lengths = is_valid.sum(axis=0)
+
+        statistics = detect_equilibration(series, valid_lengths, self._num_candidates, self._max_discarded_fraction)
+        detected_rows = series_starts + row_order[np.minimum(statistics['start'], n_max - 1),
+                                                  np.arange(len(valid_lengths))]
+        statistics['t0'] = np.where(valid_lengths > 0, time_steps[np.minimum(detected_rows, len(time_steps) - 1)],
+                                    np.nan) if len(time_steps) > 0 else np.full(len(series_lengths), np.nan)
+        return pd.DataFrame({name: statistics[name] for name in self.STATISTICS}, index=index)
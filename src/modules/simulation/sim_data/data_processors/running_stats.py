@@ -0,0 +1,146 @@
+import numpy as np
+
+
+class RunningStats:
+    """
+    One-pass statistics of the columns of a stream of rows, with memory O(columns) regardless of the stream length.
+
+    Every chunk of rows is reduced to its count, mean and sum of squared deviations (M2), which are merged into the
+    running values with the pairwise update of Chan et al. (Welford's update for chunks of one row), so the variance
+    is numerically stable. NaN values are ignored per column.
+    """
+
+    def __init__(self, num_columns):
+        self._count = np.zeros(num_columns, dtype=np.int64)
+        self._mean = np.zeros(num_columns)
+        self._m2 = np.zeros(num_columns)
+        self._min = np.full(num_columns, np.nan)
+        self._max = np.full(num_columns, np.nan)
+
+    @property
+    def count(self) -> np.ndarray:
+        return self._count
+
+    @property
+    def mean(self) -> np.ndarray:
+        return np.where(self._count > 0, self._mean, np.nan)
+
+    def variance(self, ddof=1):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self._count > ddof, self._m2 / (self._count - ddof), np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance(ddof=1))
+
+    @property
+    def sem(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.std / np.sqrt(self._count)
+
+    @property
+    def min(self) -> np.ndarray:
+        return self._min
+
+    @property
+    def max(self) -> np.ndarray:
+        return self._max
+
+    def update(self, rows):
+        """
+        Add a chunk of rows.
+        :param rows: 2D array (rows x columns), or 1D for a single row
+        """
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+        if rows.shape[0] == 0:
+            return self
+
+        is_valid = ~np.isnan(rows)
+        if is_valid.all():
+            chunk_count = np.full(rows.shape[1], rows.shape[0], dtype=np.int64)
+            chunk_mean = rows.mean(axis=0)
+            chunk_m2 = ((rows - chunk_mean) ** 2).sum(axis=0)
+        else:
+            chunk_count = is_valid.sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                chunk_mean = np.where(chunk_count > 0, np.nansum(rows, axis=0) / chunk_count, 0.0)
+            chunk_m2 = np.nansum((rows - chunk_mean) ** 2, axis=0)
+
+        with np.errstate(invalid='ignore'):
+            self._min = np.fmin(self._min, np.nanmin(rows, axis=0, initial=np.inf, where=is_valid))
+            self._max = np.fmax(self._max, np.nanmax(rows, axis=0, initial=-np.inf, where=is_valid))
+        self._min[self._count + chunk_count == 0] = np.nan
+        self._max[self._count + chunk_count == 0] = np.nan
+        self._merge(chunk_count, chunk_mean, chunk_m2)
+        return self
+
+    def merge(self, other):
+        """
+        Merge the statistics of another stream of the same columns, e.g. of another file or worker.
+        """
+        self._min = np.fmin(self._min, other._min)
+        self._max = np.fmax(self._max, other._max)
+        self._merge(other._count, other._mean, other._m2)
+        return self
+
+    def _merge(self, count, mean, m2):
+        total_count = self._count + count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean - self._mean
+            weight = np.where(total_count > 0, count / total_count, 0.0)
+            self._mean = self._mean + delta * weight
+            self._m2 = self._m2 + m2 + delta ** 2 * self._count * weight
+        self._count = total_count
+
+
+class BlockAverageAccumulator:
+    """
+    One-pass block averaging: the rows are grouped into consecutive blocks of block_size rows, and the running
+    statistics of the block means give the standard error of the mean of correlated data (the blocks being long enough
+    to be uncorrelated). Only the partial sum of the current block is kept, so the memory is O(columns).
+    """
+
+    def __init__(self, num_columns, block_size):
+        if block_size < 1:
+            raise ValueError(f'The block size must be positive, got {block_size}')
+
+        self._block_size = block_size
+        self._block_sum = np.zeros(num_columns)
+        self._block_count = 0
+        self._block_means = RunningStats(num_columns)
+
+    @property
+    def block_size(self):
+        return self._block_size
+
+    @property
+    def num_blocks(self):
+        return int(self._block_means.count.max(initial=0))
+
+    @property
+    def sem(self) -> np.ndarray:
+        """Standard error of the mean from the completed blocks (the rows of an incomplete last block are unused)."""
+        return self._block_means.sem
+
+    def update(self, rows):
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+        position = 0
+        while position < rows.shape[0]:
+            # Complete the current block, then reduce every full block of the chunk at once.
+            if self._block_count > 0 or rows.shape[0] - position < self._block_size:
+                num_taken = min(self._block_size - self._block_count, rows.shape[0] - position)
+                self._block_sum += rows[position:position + num_taken].sum(axis=0)
+                self._block_count += num_taken
+                position += num_taken
+                if self._block_count == self._block_size:
+                    self._block_means.update(self._block_sum / self._block_size)
+                    self._block_sum[:] = 0.0
+                    self._block_count = 0
+            else:
+                num_full_blocks = (rows.shape[0] - position) // self._block_size
+                full_blocks_end = position + num_full_blocks * self._block_size
+                blocks = rows[position:full_blocks_end].reshape(num_full_blocks, self._block_size, -1)
+                self._block_means.update(blocks.mean(axis=1))
+                position = full_blocks_end
+
+        return self
@@ -1,13 +1,24 @@
+import numpy as np
 import pandas as pd
 
 from utilities.files.file_reader import GeneralFileReader, GeneralFileReaderInterface
+from src.utilities.files.compression import open_file
+from src.utilities.files.parsed_data_cache import ParsedDataCache
+from src.modules.simulation.sim_file_reader.timestep_offset_index import TimeStepOffsetIndex
+from src.modules.simulation.sim_data.data_processors.running_stats import RunningStats, BlockAverageAccumulator
 
 
 class GlobalTimeAvgPropertyReader:
-    def __init__(self, general_file_reader: GeneralFileReaderInterface):
+    # Rows parsed at a time, so the rows before time_step0 never pile up in memory.
+    CHUNK_ROWS = 100000
+
+    def __init__(self, general_file_reader: GeneralFileReaderInterface, parsed_data_cache: ParsedDataCache = None):
         self._file_lines = None
         self._data_df = None
+        # Parameters of the read that gave data_df.
+        self._read_params = None
         self._general_file_reader = general_file_reader
+        self._parsed_data_cache = parsed_data_cache
 
     @property
     def data_df(self):
@@ -21,35 +32,140 @@ class GlobalTimeAvgPropertyReader:
     def general_file_reader(self) -> GeneralFileReaderInterface:
         return self._general_file_reader
 
+    def read(self, header_line_number, time_step0=None, columns=None, float_dtype=np.float64):
+        """
+        Read the time-averaged properties in one pass over the file.
+        :param header_line_number: Number of the (commented) line holding the column names
+        :param time_step0: Optional time-step; only the rows with a greater time-step are kept (as in the processors),
+        the earlier ones are skipped while reading
+        :param columns: Optional names of the property columns to parse; the time-step column is always included
+        :param float_dtype: Data type of the property columns (e.g. np.float32 to halve the memory)
+        :return: DataFrame of the time-step and property columns
+        """
+        read_params = {'header_line_number': header_line_number, 'time_step0': time_step0, 'columns': columns,
+                       'float_dtype': np.dtype(float_dtype).name}
+        if self.data_df is not None and self._read_params == read_params:
+            return self.data_df
 
+        if self._parsed_data_cache is None:
+            self.data_df = self._parse(header_line_number, time_step0, columns, float_dtype)
+        else:
+            # Keyed on time_step0 too, so a miss still seeks past the earlier rows instead of parsing the whole file.
+            self.data_df = self._parsed_data_cache.get_or_compute(
+                self.general_file_reader.input_file_path, self.__class__.__name__, read_params,
+                lambda: self._parse(header_line_number, time_step0, columns, float_dtype))
+        self._read_params = read_params
 
-    def read(self, header_line_number):
-        if self.data_df is not None:
-            return self.data_df
+        return self.data_df
 
-        lines = self.general_file_reader.read()
+    def _parse(self, header_line_number, time_step0, columns, float_dtype):
+        used_columns = None
+        data_chunks = []
+        for used_columns, dtype_dict, chunk in self._iter_chunks(header_line_number, time_step0, columns, float_dtype):
+            if len(chunk) > 0:
+                data_chunks.append(chunk[chunk[used_columns[0]] > time_step0] if time_step0 is not None else chunk)
+
+        if not data_chunks:
+            return pd.DataFrame({column: pd.Series(dtype=dtype_dict[column]) for column in used_columns})
+        return pd.concat(data_chunks, ignore_index=True)[used_columns]
+
+    def _iter_chunks(self, header_line_number, time_step0, columns, float_dtype):
+        # Yield (used columns, dtypes, chunk of rows); a file without data rows yields one empty chunk.
+        file_path = self.general_file_reader.input_file_path
+        with open_file(file_path, 'rb') as global_props_file:
+            # The header is taken from the first lines; the data is parsed by pandas from the same handle.
+            lines = [global_props_file.readline().decode() for _ in range(header_line_number + 1)]
+
+            # Get the name of the columns and the data-type dictionary.
+            column_names, dtype_dict = self.preprocess_header(lines, header_line_number, float_dtype)
+            used_columns = self._get_used_columns(column_names, columns)
+
+            if time_step0 is not None and TimeStepOffsetIndex.is_indexable(file_path):
+                # Seek close to time_step0 instead of parsing (and then discarding) the rows before it.
+                start, _ = TimeStepOffsetIndex(file_path).get_byte_range(initial_tstep=time_step0)
+                global_props_file.seek(max(start, global_props_file.tell()))
+
+            chunks = pd.read_csv(global_props_file, sep=r'\s+', header=None, names=column_names, usecols=used_columns,
+                                 dtype={column: dtype_dict[column] for column in used_columns}, comment='#',
+                                 chunksize=self.CHUNK_ROWS)
+            is_empty = True
+            for chunk in chunks:
+                is_empty = False
+                yield used_columns, dtype_dict, chunk
+            if is_empty:
+                yield used_columns, dtype_dict, pd.DataFrame(columns=used_columns)
+
+    def reduce(self, header_line_number, time_step0=None, columns=None, block_size=None):
+        """
+        Streaming alternative to read() for when only the statistics of the properties are needed: the file is read
+        chunk by chunk into running statistics, so the memory does not grow with the length of the file.
+        :param header_line_number: Number of the (commented) line holding the column names
+        :param time_step0: Optional time-step; only the rows with a greater time-step are used (as in the processors)
+        :param columns: Optional names of the property columns to reduce (default: all)
+        :param block_size: Optional number of rows per block of the block-averaged standard error of the mean
+        :return: Dict property name -> dict of 'count', 'mean', 'std', 'sem', 'min', 'max' (and 'block_sem')
+        """
+        if self._parsed_data_cache is None:
+            return self._reduce(header_line_number, time_step0, columns, block_size)
+
+        cache_params = {'header_line_number': header_line_number, 'time_step0': time_step0, 'columns': columns,
+                        'block_size': block_size}
+        return self._parsed_data_cache.get_or_compute(
+            self.general_file_reader.input_file_path, self.__class__.__name__ + '.reduce', cache_params,
+            lambda: self._reduce(header_line_number, time_step0, columns, block_size))
+
+    def _reduce(self, header_line_number, time_step0, columns, block_size):
+        running_stats = None
+        block_averages = None
+        for used_columns, _, chunk in self._iter_chunks(header_line_number, time_step0, columns, np.float64):
+            if running_stats is None:
+                running_stats = RunningStats(len(used_columns) - 1)
+                block_averages = BlockAverageAccumulator(len(used_columns) - 1, block_size) \
+                    if block_size is not None else None
+
+            time_steps = chunk[used_columns[0]].to_numpy()
+            rows = chunk[used_columns[1:]].to_numpy(dtype=np.float64)
+            if time_step0 is not None:
+                rows = rows[time_steps > time_step0]
+            running_stats.update(rows)
+            if block_averages is not None:
+                block_averages.update(rows)
+
+        stats = {}
+        for column_num, column in enumerate(used_columns[1:]):
+            stats[column] = {'count': int(running_stats.count[column_num]),
+                             'mean': float(running_stats.mean[column_num]),
+                             'std': float(running_stats.std[column_num]),
+                             'sem': float(running_stats.sem[column_num]),
+                             'min': float(running_stats.min[column_num]),
+                             'max': float(running_stats.max[column_num])}
+            if block_averages is not None:
+                stats[column]['block_sem'] = float(block_averages.sem[column_num])
+
+        return stats
 
-        # Get the name of the columns and the data-type dictionary.
-        column_names, dtype_dict = self.preprocess_header(lines, header_line_number)
+    @staticmethod
+    def _get_used_columns(column_names, columns):
+        if columns is None:
+            return column_names
 
-        # Read the file into a DataFrame using the modified header line
-        self.data_df = pd.read_csv(self.general_file_reader.input_file_path, delim_whitespace=True, skiprows=2, header=None,
-                                   names=column_names, dtype=dtype_dict)
+        missing_columns = [column for column in columns if column not in column_names]
+        if missing_columns:
+            raise KeyError(f'Columns {missing_columns} not found in the header: {column_names}')
 
-        return self.data_df
+        return [column_names[0]] + [column for column in column_names[1:] if column in columns]
 
     @staticmethod
-    def preprocess_header(file_lines, header_line_number):
+    def preprocess_header(file_lines, header_line_number, float_dtype=float):
         # Remove the '#' character from the header line
         header_line = file_lines[header_line_number].lstrip('#').strip()
         column_names = header_line.split()
         # The time-step column is of type integer
-        dtype_dict = {column: float for column in column_names}
+        dtype_dict = {column: float_dtype for column in column_names}
         dtype_dict[column_names[0]] = int
 
         return column_names, dtype_dict
 
-
 if __name__ == "__main__":
     # file_path = "/Users/unconvrs/Documents/GitHub/co2hydrates/nefe_calc/data/simulations/water_co2_hydrate_sw_1/GlobalPropsTimeAvg.prop"
     # file_path_macbook = "/Users/unconvrs/Documents/GitHub/co2hydrates/nefe_calc/data/rdf_simulations/water_co2_hydrate3/GlobalPropsTimeAvg.prop"
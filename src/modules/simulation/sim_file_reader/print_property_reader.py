@@ -1,16 +1,18 @@
+import re
+
+import numpy as np
 import pandas as pd
 
 from utilities.files.file_reader import GeneralFileReaderInterface
+from src.utilities.files.parsed_data_cache import ParsedDataCache
 
 
 class PrintPropertyReader():
-    def __init__(self, general_file_reader: GeneralFileReaderInterface):
+    def __init__(self, general_file_reader: GeneralFileReaderInterface, parsed_data_cache: ParsedDataCache = None):
         self._general_file_reader = general_file_reader
-        self._file_lines = None
+        self._parsed_data_cache = parsed_data_cache
         self._data_df = None
 
-
-
     @property
     def data_df(self):
         return self._data_df
@@ -23,24 +25,65 @@ class PrintPropertyReader():
         if self._data_df is not None:
             return self._data_df
 
-        self._file_lines = self._general_file_reader.read()
+        if self._parsed_data_cache is None:
+            self._data_df = self._parse()
+        else:
+            self._data_df = self._parsed_data_cache.get_or_compute(self._general_file_reader.input_file_path,
+                                                                   self.__class__.__name__, None, self._parse)
 
-        # Get the header and the column names.
-        header_line = self._file_lines[0].lstrip('#').strip()
-        column_names = [item.split(':')[0] for item in self._file_lines[1].strip().split(', ')]
+        return self._data_df
 
-        # Process each line to extract data
-        data = []
-        for line in self._file_lines[1:]:
-            # Splitting each line by ', ' and further splitting by ':' to separate keys and values
-            record = {kv.split(':')[0]: float(kv.split(':')[1]) for kv in line.strip().split(', ')}
-            data.append(record)
+    def _parse(self):
+        # The key layout is learnt from the first record. Lines with that layout are matched by one compiled pattern
+        # and their values are converted to floats in bulk; only lines with another layout are split key by key.
+        line_pattern = None
+        column_names = None
+        fast_rows, fast_row_nums = [], []
+        slow_records, slow_row_nums = [], []
+        row_num = 0
+        for line in self._general_file_reader.iter_lines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
 
-        # Creating a DataFrame from the extracted data
-        self._data_df = pd.DataFrame(data)
+            if line_pattern is None:
+                column_names = [item.split(':')[0] for item in line.split(', ')]
+                line_pattern = self._compile_line_pattern(column_names)
 
-        return self._data_df
+            match = line_pattern.fullmatch(line)
+            if match:
+                fast_rows.append(match.groups())
+                fast_row_nums.append(row_num)
+            else:
+                slow_records.append(self._parse_record(line))
+                slow_row_nums.append(row_num)
+            row_num += 1
+
+        if column_names is None:
+            return pd.DataFrame()
+
+        fast_data_df = pd.DataFrame(np.array(fast_rows, dtype=np.float64).reshape(-1, len(column_names)),
+                                    columns=column_names)
+        if not slow_records:
+            return fast_data_df
+
+        # Put the lines that changed layout back in their place in the file.
+        fast_data_df.index = fast_row_nums
+        slow_data_df = pd.DataFrame(slow_records, index=slow_row_nums)
+        return pd.concat([fast_data_df, slow_data_df]).sort_index().reset_index(drop=True)
+
+    @staticmethod
+    def _compile_line_pattern(column_names):
+        return re.compile(', '.join(re.escape(column_name) + ':([^,]*)' for column_name in column_names))
 
+    @staticmethod
+    def _parse_record(line):
+        # Splitting each line by ', ' and further splitting by ':' to separate keys and values
+        record = {}
+        for key_value in line.split(', '):
+            key, value = key_value.split(':', 1)
+            record[key] = float(value)
+        return record
 
 if __name__ == "__main__":
     prop_file_path = "/Users/unconvrs/Documents/GitHub/co2hydrates/nefe_calc/data/epm2/rest00/GlobalPropCalculated.prop"
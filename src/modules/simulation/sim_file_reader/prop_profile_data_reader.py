@@ -1,18 +1,26 @@
+from itertools import islice
+
+import numpy as np
 import pandas as pd
-from io import StringIO
 
 from utilities.files.file_reader import GeneralFileReader, GeneralFileReaderInterface
+from src.modules.simulation.sim_file_reader.timestep_offset_index import TimeStepOffsetIndex
+from src.utilities.files.parsed_data_cache import ParsedDataCache
 
 
 class PropProfileReader:
 
-    def __init__(self, general_file_reader: GeneralFileReaderInterface, initial_tstep, final_tstep, skipped_tsteps=1):
+    def __init__(self, general_file_reader: GeneralFileReaderInterface, initial_tstep, final_tstep, skipped_tsteps=1,
+                 parsed_data_cache: ParsedDataCache = None):
         self._general_file_reader = general_file_reader
+        self._parsed_data_cache = parsed_data_cache
         self._initial_tstep = initial_tstep
         self._final_tstep = final_tstep
         self._skipped_tsteps = skipped_tsteps
-        self._prop_lines = None
         self._prop_list = []
+        self._time_steps = None
+        self._column_names = None
+        self._data_array = None
 
     @property
     def initial_tstep(self):
@@ -38,66 +46,100 @@ class PropProfileReader:
     def prop_list(self, value):
         self._prop_list = value
 
-    def _get_starting_final_index(self, num_args):
-        # find index of the line where time-step >=initial_time_step
-        found_ti = False
-        found_tf = False
-        for index, line in enumerate(self._prop_lines):
-            if found_ti and found_tf:
-                break
-            else:
-                if not line.startswith('#') and len(line.split()) == num_args:
-                    if self.initial_tstep <= int(line.split()[0]) and not found_ti:
-                        starting_index = index
-                        found_ti = True
-                    elif self.final_tstep <= int(line.split()[0]) and not found_tf:
-                        final_index = index
-                        found_tf = True
-
-        return starting_index, final_index
-
-    def _generate_dict_data_for_timestep(self, time_step, time_step_data_str, col_names, data_keys):
-        current_df_data = pd.read_csv(StringIO(time_step_data_str), sep=" ", header=None,
-                                      names=col_names, dtype=float)
-        current_rdf_dict = dict.fromkeys(data_keys)
-        current_rdf_dict["time_step"] = time_step
-        current_rdf_dict["data"] = current_df_data
-
-        return current_rdf_dict
+    @property
+    def time_steps(self) -> np.ndarray:
+        return self._time_steps
+
+    @property
+    def column_names(self):
+        return self._column_names
+
+    @property
+    def data_array(self) -> np.ndarray:
+        """Dense (n_timesteps, n_bins, n_columns) array of the read blocks; rows of shorter blocks are NaN-padded."""
+        return self._data_array
 
     def read(self, num_args_per_tstep_line):
         if len(self.prop_list) != 0:
             return self.prop_list
-        self._prop_lines = self._general_file_reader.read()
-        rdf_keys = ["time_step", "data"]  # List of keys
-        rdf_column_names = self._prop_lines[2].strip().split()[1:]  # Skips the '#' and splits the rest
-
-        starting_index, final_index = self._get_starting_final_index(num_args_per_tstep_line)
-        self.prop_list = []
-        current_data = []
-        current_data_str = ""
-        if starting_index is not None and final_index is not None:
-            for index, line in enumerate(self._prop_lines[starting_index:final_index]):
-                if len(line.split()) == num_args_per_tstep_line:
-                    if current_data_str:
-                        current_rdf_dict = self._generate_dict_data_for_timestep(current_time_step, current_data_str,
-                                                                                 rdf_column_names, rdf_keys)
-                        self.prop_list.append(current_rdf_dict)
-
-                    current_time_step = int(line.split()[0])
-                else:
-                    current_data_str += line.strip() + "\n"
-        else:
-            raise ("Starting index is None.")
 
-        # Handle the last block of data after the loop
-        if current_data_str:
-            current_rdf_dict = self._generate_dict_data_for_timestep(current_time_step, current_data_str,
-                                                                     rdf_column_names, rdf_keys)
-            self.prop_list.append(current_rdf_dict)
+        if self._parsed_data_cache is None:
+            parsed_profile = self._parse(num_args_per_tstep_line)
+        else:
+            cache_params = {'num_args_per_tstep_line': num_args_per_tstep_line, 'initial_tstep': self.initial_tstep,
+                            'final_tstep': self.final_tstep, 'skipped_tsteps': self.skipped_tsteps}
+            parsed_profile = self._parsed_data_cache.get_or_compute(
+                self._general_file_reader.input_file_path, self.__class__.__name__, cache_params,
+                lambda: self._parse(num_args_per_tstep_line))
+
+        self._column_names = parsed_profile['column_names']
+        self._time_steps = parsed_profile['time_steps']
+        self._data_array = parsed_profile['data_array']
+
+        # Each DataFrame is a view on its slice of the dense array.
+        self.prop_list = [{"time_step": int(time_step),
+                           "data": pd.DataFrame(self._data_array[block_num, :num_rows], columns=self._column_names,
+                                                copy=False)}
+                          for block_num, (time_step, num_rows) in enumerate(zip(self._time_steps,
+                                                                                parsed_profile['block_lengths']))]
 
         return self.prop_list
 
+    def _parse(self, num_args_per_tstep_line):
+        comment_lines = []
+        time_steps = []
+        blocks = []
+        num_blocks_in_range = 0
+        lines = self._iter_lines(num_args_per_tstep_line)
+        for line in lines:
+            if line.startswith('#'):
+                comment_lines.append(line)
+                continue
+
+            tokens = line.split()
+            if len(tokens) != num_args_per_tstep_line:
+                continue
+
+            # The time-step line gives the number of rows of its block, so the block is consumed in one go.
+            time_step, num_rows = int(tokens[0]), int(tokens[1])
+            block_lines = list(islice(lines, num_rows))
+            if time_step < self.initial_tstep:
+                continue
+            if time_step > self.final_tstep:
+                break
+
+            if num_blocks_in_range % self.skipped_tsteps == 0:
+                time_steps.append(time_step)
+                blocks.append(np.array(''.join(block_lines).split(), dtype=np.float64).reshape(num_rows, -1))
+            num_blocks_in_range += 1
+
+        if not blocks:
+            raise ValueError(f'No data found between the time-steps {self.initial_tstep} and {self.final_tstep} in '
+                             f'{self._general_file_reader.input_file_path}')
+
+        column_names = comment_lines[2].strip().split()[1:]  # Skips the '#' and splits the rest
+        data_array = np.full((len(blocks), max(len(block) for block in blocks), len(column_names)), np.nan)
+        for block_num, block in enumerate(blocks):
+            data_array[block_num, :len(block)] = block
+
+        return {'column_names': column_names, 'time_steps': np.array(time_steps, dtype=np.int64),
+                'data_array': data_array, 'block_lengths': [len(block) for block in blocks]}
+
+    def _iter_lines(self, num_args_per_tstep_line):
+        file_path = self._general_file_reader.input_file_path
+        if self._general_file_reader.file_lines or not TimeStepOffsetIndex.is_indexable(file_path):
+            yield from self._general_file_reader.iter_lines()
+            return
+
+        # Yield the comment header, then seek close to the initial time-step instead of reading all blocks before it.
+        timestep_index = TimeStepOffsetIndex(file_path, num_args_per_tstep_line)
+        start, _ = timestep_index.get_byte_range(self.initial_tstep, self.final_tstep)
+        with open(file_path, 'rb') as profile_file:
+            yield from profile_file.read(timestep_index.data_offset).decode().splitlines(keepends=True)
+            profile_file.seek(start)
+            for line in profile_file:
+                yield line.decode()
+
 
 if __name__ == "__main__":
     density_file_path = "/Users/meisam/Documents/GitHub/co2hydrates/nefe_calc/data/exp_match/solubility/simulations/water_co2_hydrate1/MassDensityFine_guest.mden"
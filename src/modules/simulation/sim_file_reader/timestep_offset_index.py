@@ -0,0 +1,175 @@
+import os
+
+import numpy as np
+
+from src.utilities.files.compression import is_compressed
+
+
+class TimeStepOffsetIndex:
+    """
+    Sparse index of the time-step records of a LAMMPS fix ave/time (.prop) or ave/chunk (.mden, .rdf) output file.
+
+    Every RECORD_STRIDE-th record is mapped to the byte offset of its first line, so a reader can seek close to a
+    time-step window instead of reading the file from the start. For ave/time files every data line is a record; for
+    ave/chunk files a record is a time-step line (num_args_per_tstep_line tokens) followed by its block of rows.
+
+    The index is persisted next to the file and is only reused while the size and the modification time of the file
+    are unchanged. Compressed files cannot be seeked into cheaply and are not indexed.
+    """
+    INDEX_FILE_SUFFIX = '.tsidx.npz'
+    RECORD_STRIDE = 256
+
+    def __init__(self, file_path, num_args_per_tstep_line=None, record_stride=RECORD_STRIDE):
+        self._file_path = file_path
+        self._num_args_per_tstep_line = num_args_per_tstep_line
+        self._record_stride = record_stride
+        self._time_steps = None
+        self._offsets = None
+        self._data_offset = None
+        self._is_sorted = None
+
+    @property
+    def file_path(self):
+        return self._file_path
+
+    @property
+    def index_file_path(self):
+        return self._file_path + self.INDEX_FILE_SUFFIX
+
+    @property
+    def time_steps(self) -> np.ndarray:
+        self.load()
+        return self._time_steps
+
+    @property
+    def offsets(self) -> np.ndarray:
+        self.load()
+        return self._offsets
+
+    @property
+    def data_offset(self):
+        """Byte offset of the first record, i.e. the end of the comment header."""
+        self.load()
+        return self._data_offset
+
+    @staticmethod
+    def is_indexable(file_path):
+        return not is_compressed(file_path)
+
+    def load(self):
+        if self._offsets is not None:
+            return self
+
+        file_stat = os.stat(self.file_path)
+        if not self._read_persisted_index(file_stat):
+            self._build()
+            self._persist_index(file_stat)
+
+        return self
+
+    def get_byte_range(self, initial_tstep=None, final_tstep=None):
+        """
+        Get the part of the file that holds the records of a time-step window. The range may start and end a few
+        records outside the window, so the records read from it still have to be filtered.
+        :param initial_tstep: First time-step of the window (None: from the first record)
+        :param final_tstep: Last time-step of the window (None: up to the end of the file)
+        :return: (start offset, end offset or None for the end of the file)
+        """
+        self.load()
+        # Restarted runs can repeat time-steps; seeking is only safe in a file whose time-steps never decrease.
+        if not self._is_sorted:
+            return self._data_offset, None
+
+        start = self._data_offset
+        if initial_tstep is not None:
+            # The last indexed record at or before the initial time-step.
+            record_num = np.searchsorted(self._time_steps, initial_tstep, side='right') - 1
+            if record_num >= 0:
+                start = int(self._offsets[record_num])
+
+        end = None
+        if final_tstep is not None:
+            # The first indexed record after the final time-step.
+            record_num = np.searchsorted(self._time_steps, final_tstep, side='right')
+            if record_num < len(self._time_steps):
+                end = int(self._offsets[record_num])
+
+        return start, end
+
+    def _build(self):
+        time_steps = []
+        offsets = []
+        data_offset = None
+        num_records = 0
+        offset = 0
+        # Checked on every record, not only the indexed ones: a restart can step back within one stride.
+        is_sorted = True
+        previous_time_step = None
+        with open(self.file_path, 'rb') as indexed_file:
+            lines = iter(indexed_file)
+            for line in lines:
+                line_offset = offset
+                offset += len(line)
+                if line.startswith(b'#') or not line.strip():
+                    continue
+
+                tokens = line.split()
+                if self._num_args_per_tstep_line is not None:
+                    if len(tokens) != self._num_args_per_tstep_line:
+                        continue
+                    # Skip the rows of the block, whose count is given on the time-step line.
+                    for _ in range(int(tokens[1])):
+                        offset += len(next(lines, b''))
+
+                time_step = int(tokens[0])
+                if previous_time_step is not None and time_step < previous_time_step:
+                    is_sorted = False
+                previous_time_step = time_step
+                if data_offset is None:
+                    data_offset = line_offset
+                if num_records % self._record_stride == 0:
+                    time_steps.append(time_step)
+                    offsets.append(line_offset)
+                num_records += 1
+
+        self._time_steps = np.array(time_steps, dtype=np.int64)
+        self._offsets = np.array(offsets, dtype=np.int64)
+        self._data_offset = data_offset if data_offset is not None else offset
+        self._is_sorted = is_sorted
+
+    def _read_persisted_index(self, file_stat):
+        if not os.path.isfile(self.index_file_path):
+            return False
+
+        try:
+            with np.load(self.index_file_path) as persisted_index:
+                if int(persisted_index['source_size']) != file_stat.st_size or \
+                        int(persisted_index['source_mtime_ns']) != file_stat.st_mtime_ns or \
+                        int(persisted_index['record_stride']) != self._record_stride or \
+                        int(persisted_index['num_args_per_tstep_line']) != (self._num_args_per_tstep_line or 0):
+                    return False
+                self._time_steps = persisted_index['time_steps']
+                self._offsets = persisted_index['offsets']
+                self._data_offset = int(persisted_index['data_offset'])
+                self._is_sorted = bool(persisted_index['is_sorted'])
+        except (OSError, ValueError, KeyError):
+            # An unreadable index, or one missing a field such as is_sorted, is stale and rebuilt.
+            return False
+
+        return True
+
+    def _persist_index(self, file_stat):
+        # Write to a temporary file first so concurrent readers never see a partial index.
+        tmp_index_file_path = f'{self.index_file_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_index_file_path, 'wb') as index_file:
+                np.savez(index_file, time_steps=self._time_steps, offsets=self._offsets,
+                         data_offset=np.int64(self._data_offset), is_sorted=np.bool_(self._is_sorted),
+                         record_stride=np.int64(self._record_stride),
+                         num_args_per_tstep_line=np.int64(self._num_args_per_tstep_line or 0),
+                         source_size=np.int64(file_stat.st_size), source_mtime_ns=np.int64(file_stat.st_mtime_ns))
+            os.replace(tmp_index_file_path, self.index_file_path)
+        except OSError as e:
+            print(f"Warning: could not persist the time-step index of {self.file_path}: {e}")
+            if os.path.exists(tmp_index_file_path):
+                os.remove(tmp_index_file_path)
@@ -0,0 +1,64 @@
+import bz2
+import gzip
+import lzma
+import os
+
+# Openers of the supported compressed formats, keyed by file extension.
+COMPRESSED_FILE_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+COMPRESSED_FILE_EXTENSIONS = tuple(COMPRESSED_FILE_OPENERS)
+
+
+def get_compression_extension(file_path):
+    """
+    Get the compression extension of a file.
+    :param file_path: Path (or name) of the file
+    :return: One of COMPRESSED_FILE_EXTENSIONS, or None for uncompressed files
+    """
+    for extension in COMPRESSED_FILE_EXTENSIONS:
+        if str(file_path).endswith(extension):
+            return extension
+    return None
+
+
+def is_compressed(file_path):
+    return get_compression_extension(file_path) is not None
+
+
+def strip_compression_extension(file_path):
+    """
+    Remove the compression extension from a file path, e.g. 'GlobalProps.prop.gz' -> 'GlobalProps.prop'.
+    """
+    extension = get_compression_extension(file_path)
+    return file_path[:-len(extension)] if extension else file_path
+
+
+def open_file(file_path, mode='r'):
+    """
+    Open a plain or a compressed (.gz, .bz2, .xz) file. Compressed files are decompressed on the fly while reading,
+    so they are never inflated in memory or on disk.
+    :param file_path: Path to the file
+    :param mode: 'r' (text) or 'rb' (binary)
+    :return: File object
+    """
+    extension = get_compression_extension(file_path)
+    if extension is None:
+        return open(file_path, mode)
+
+    # The compression modules open in binary mode unless text mode is requested explicitly.
+    compressed_mode = mode if 'b' in mode else mode.replace('t', '') + 't'
+    return COMPRESSED_FILE_OPENERS[extension](file_path, compressed_mode)
+
+
+def resolve_compressed_path(file_path):
+    """
+    Find a file either as given or in one of its compressed forms.
+    :param file_path: Path to the uncompressed file
+    :return: The first existing path among file_path and file_path + compression extension, or file_path itself if
+    none of them exist
+    """
+    if os.path.exists(file_path):
+        return file_path
+    for extension in COMPRESSED_FILE_EXTENSIONS:
+        if os.path.exists(file_path + extension):
+            return file_path + extension
+    return file_path
@@ -0,0 +1,160 @@
+import os
+
+from src.utilities.files.compression import COMPRESSED_FILE_EXTENSIONS, strip_compression_extension
+
+
+class ProjectFileCatalog:
+    """
+    In-memory listing of the directories of a project tree (sim cases, their output sub-folders and the logs folder).
+
+    The tree is scanned once with os.scandir; afterwards the file lookups of the sim cases (logs, .prop, .printprop,
+    .rdf, .mden, msd and fe files) are answered from the catalog instead of the filesystem, which matters on network
+    filesystems where every metadata call is expensive. Directories outside the scanned trees are scanned on first
+    use. The catalog is a snapshot: files created after a directory was scanned are not seen.
+    """
+
+    def __init__(self):
+        # Directory path -> {'files': {file name: size in bytes}, 'dirs': [sub-folder names]}, or None if missing.
+        self._directories = {}
+        # Root path -> {file name: (position in the walk, path)} for the lookups of files anywhere below a root.
+        self._tree_file_indexes = {}
+
+    @staticmethod
+    def _normalize(path):
+        return os.path.normpath(path)
+
+    def scan(self, root_path):
+        """
+        Scan a directory tree into the catalog.
+        :param root_path: Path to the root of the tree
+        :return: The catalog itself
+        """
+        directories_to_scan = [root_path]
+        while directories_to_scan:
+            directory = directories_to_scan.pop()
+            listing = self._scan_directory(directory)
+            if listing is not None:
+                directories_to_scan.extend(os.path.join(directory, dir_name) for dir_name in listing['dirs'])
+        return self
+
+    def _scan_directory(self, directory):
+        files = {}
+        dirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        dirs.append(entry.name)
+                    elif entry.is_file():
+                        files[entry.name] = entry.stat().st_size
+            listing = {'files': files, 'dirs': sorted(dirs)}
+        except (FileNotFoundError, NotADirectoryError):
+            listing = None
+
+        self._directories[self._normalize(directory)] = listing
+        return listing
+
+    def _get_listing(self, directory):
+        normalized_directory = self._normalize(directory)
+        if normalized_directory not in self._directories:
+            return self._scan_directory(directory)
+        return self._directories[normalized_directory]
+
+    def is_dir(self, directory):
+        return self._get_listing(directory) is not None
+
+    def exists(self, file_path):
+        listing = self._get_listing(os.path.dirname(file_path) or '.')
+        return listing is not None and os.path.basename(file_path) in listing['files']
+
+    def get_file_names(self, directory):
+        listing = self._get_listing(directory)
+        return list(listing['files']) if listing is not None else []
+
+    def get_file_names_and_paths(self, directory):
+        """
+        Catalog counterpart of manage_file_folder.get_file_names_and_paths (files only, names and paths aligned).
+        """
+        listing = self._get_listing(directory)
+        if listing is None:
+            raise FileNotFoundError(f'Directory {directory} not found')
+
+        file_names = list(listing['files'])
+        return file_names, [os.path.join(directory, file_name) for file_name in file_names]
+
+    def find_files_with_extension(self, directory_path, file_extension):
+        """
+        Catalog counterpart of manage_file_folder.find_files_with_extension (one path per file, plain preferred).
+        """
+        matching_extensions = (file_extension,) + tuple(file_extension + ext for ext in COMPRESSED_FILE_EXTENSIONS)
+        if not self.is_dir(directory_path):
+            print("Directory does not exist.")
+            return []
+
+        uncompressed_paths = dict.fromkeys(strip_compression_extension(os.path.join(directory_path, file_name))
+                                           for file_name in self.get_file_names(directory_path)
+                                           if file_name.endswith(matching_extensions))
+        return [self.resolve_compressed_path(uncompressed_path) for uncompressed_path in uncompressed_paths]
+
+    def get_folder_size(self, directory):
+        listing = self._get_listing(directory)
+        return sum(listing['files'].values()) if listing is not None else 0
+
+    def resolve_compressed_path(self, file_path):
+        """
+        Catalog counterpart of compression.resolve_compressed_path.
+        """
+        for candidate_path in [file_path] + [file_path + extension for extension in COMPRESSED_FILE_EXTENSIONS]:
+            if self.exists(candidate_path):
+                return candidate_path
+        return file_path
+
+    def get_subcatalog(self, root_paths):
+        """
+        Get a catalog holding only the trees below some roots, e.g. to send just the files of one sim case to a worker
+        process instead of the whole project. Files outside the roots (such as the log file in a logs folder shared by
+        all sim cases) should be resolved beforehand, or the subcatalog grows with the project.
+        :param root_paths: Paths to the roots of the trees to keep
+        :return: New ProjectFileCatalog
+        """
+        normalized_root_paths = [self._normalize(root_path) for root_path in root_paths]
+        root_prefixes = tuple(root_path.rstrip(os.sep) + os.sep for root_path in normalized_root_paths)
+        subcatalog = ProjectFileCatalog()
+        subcatalog._directories = {directory: listing for directory, listing in self._directories.items()
+                                   if directory in normalized_root_paths or directory.startswith(root_prefixes)}
+        subcatalog._tree_file_indexes = {root_path: tree_file_index
+                                         for root_path, tree_file_index in self._tree_file_indexes.items()
+                                         if root_path in normalized_root_paths}
+        return subcatalog
+
+    def find_file_in_tree(self, root_path, file_names):
+        """
+        Find the first of several file names below a root, in the order os.walk would visit the directories.
+        :param root_path: Path to the root directory
+        :param file_names: Candidate file names; within one directory the earlier names win
+        :return: Path to the file, or None if none of the names is found
+        """
+        tree_file_index = self._get_tree_file_index(root_path)
+        found_files = [(tree_file_index[file_name][0], name_position, tree_file_index[file_name][1])
+                       for name_position, file_name in enumerate(file_names) if file_name in tree_file_index]
+        return min(found_files)[2] if found_files else None
+
+    def _get_tree_file_index(self, root_path):
+        normalized_root_path = self._normalize(root_path)
+        if normalized_root_path not in self._tree_file_indexes:
+            # Built once per root, so a logs folder shared by all sim cases is walked only once.
+            tree_file_index = {}
+            directories_to_walk = [root_path]
+            walk_position = 0
+            while directories_to_walk:
+                directory = directories_to_walk.pop()
+                listing = self._get_listing(directory)
+                if listing is None:
+                    continue
+                for file_name in listing['files']:
+                    tree_file_index.setdefault(file_name, (walk_position, os.path.join(directory, file_name)))
+                walk_position += 1
+                directories_to_walk.extend(os.path.join(directory, dir_name) for dir_name in reversed(listing['dirs']))
+            self._tree_file_indexes[normalized_root_path] = tree_file_index
+
+        return self._tree_file_indexes[normalized_root_path]
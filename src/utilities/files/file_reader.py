@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
+
+from src.utilities.files.compression import open_file
 
 
 class DataReaderInterface(ABC):
@@ -25,6 +27,10 @@ class GeneralFileReaderInterface(DataReaderInterface):
     def file_lines(self):
         pass
 
+    @abstractmethod
+    def iter_lines(self) -> Iterator[str]:
+        pass
+
 
 class GeneralFileReader(GeneralFileReaderInterface):
     def __init__(self, file_path):
@@ -48,7 +54,7 @@ class GeneralFileReader(GeneralFileReaderInterface):
             return self._file_lines
         else:
             try:
-                with open(self.input_file_path, 'r') as file:
+                with open_file(self.input_file_path, 'r') as file:
                     self._file_lines = file.readlines()
             except FileNotFoundError:
                 raise FileNotFoundError(f'File {self.input_file_path} not found')
@@ -56,3 +62,15 @@ class GeneralFileReader(GeneralFileReaderInterface):
                 raise e
 
         return self._file_lines
+
+    def iter_lines(self) -> Iterator[str]:
+        # Stream the lines without keeping them, unless they have already been read.
+        if len(self._file_lines) != 0:
+            yield from self._file_lines
+            return
+
+        try:
+            with open_file(self.input_file_path, 'r') as file:
+                yield from file
+        except FileNotFoundError:
+            raise FileNotFoundError(f'File {self.input_file_path} not found')
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import pickle
+
+from src.utilities.files.compression import open_file
+
+
+class ParsedDataCache:
+    """
+    On-disk cache of the data parsed from simulation output files (global/print properties, profiles, force fields).
+
+    An entry is keyed by the path, size and modification time of the source file (optionally also a hash of its
+    contents) together with the name and the parameters of the reader, so a changed file or a different read is a
+    miss. Entries are pickled into the cache directory; once the directory grows beyond max_size_bytes the least
+    recently used entries are evicted.
+    """
+    ENTRY_SUFFIX = '.pkl'
+    # Name of the cache directory created under a project directory.
+    PROJECT_CACHE_DIR_NAME = '.parsed_data_cache'
+    DEFAULT_MAX_SIZE_BYTES = 1024 ** 3
+
+    def __init__(self, cache_dir_path, max_size_bytes=DEFAULT_MAX_SIZE_BYTES, hash_contents=False):
+        self._cache_dir_path = cache_dir_path
+        self._max_size_bytes = max_size_bytes
+        self._hash_contents = hash_contents
+        self._size_bytes = None
+
+    @classmethod
+    def for_project(cls, path_to_proj_dir, max_size_mb):
+        return cls(os.path.join(path_to_proj_dir, cls.PROJECT_CACHE_DIR_NAME), int(max_size_mb * 1024 ** 2))
+
+    def __getstate__(self):
+        # Worker processes re-measure the cache directory themselves.
+        state = self.__dict__.copy()
+        state['_size_bytes'] = None
+        return state
+
+    @property
+    def cache_dir_path(self):
+        return self._cache_dir_path
+
+    @property
+    def max_size_bytes(self):
+        return self._max_size_bytes
+
+    def make_key(self, file_path, reader_name, params=None):
+        """
+        Build the key of an entry.
+        :param file_path: Path to the parsed file
+        :param reader_name: Name of the reader (entries of different readers of the same file never collide)
+        :param params: JSON-serializable parameters of the read
+        :return: Hex digest identifying the entry
+        """
+        file_stat = os.stat(file_path)
+        key_items = [os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns, reader_name, params]
+        if self._hash_contents:
+            key_items.append(self._hash_file(file_path))
+        return hashlib.sha1(json.dumps(key_items, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def _hash_file(file_path):
+        file_hash = hashlib.blake2b()
+        with open_file(file_path, 'rb') as hashed_file:
+            for block in iter(lambda: hashed_file.read(1 << 20), b''):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
+    def _get_entry_path(self, key):
+        return os.path.join(self.cache_dir_path, key + self.ENTRY_SUFFIX)
+
+    def get(self, key):
+        entry_path = self._get_entry_path(key)
+        try:
+            with open(entry_path, 'rb') as entry_file:
+                value = pickle.load(entry_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # A corrupt or outdated entry is dropped and treated as a miss.
+            self._remove_entry(entry_path)
+            return None
+
+        # The modification time of an entry records its last use for the LRU eviction.
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        size_bytes = self._get_size_bytes()
+        os.makedirs(self.cache_dir_path, exist_ok=True)
+        entry_path = self._get_entry_path(key)
+        # Write to a temporary file first so concurrent readers never see a partial entry.
+        tmp_entry_path = f'{entry_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_entry_path, 'wb') as entry_file:
+                pickle.dump(value, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_entry_path, entry_path)
+        except (OSError, pickle.PicklingError) as e:
+            print(f"Warning: could not cache the parsed data in {entry_path}: {e}")
+            self._remove_entry(tmp_entry_path)
+            return
+
+        self._size_bytes = size_bytes + os.path.getsize(entry_path)
+        if self._size_bytes > self.max_size_bytes:
+            self._evict()
+
+    def get_or_compute(self, file_path, reader_name, params, compute):
+        """
+        Get the cached data of a read, or compute and cache it on a miss.
+        :param file_path: Path to the parsed file
+        :param reader_name: Name of the reader
+        :param params: JSON-serializable parameters of the read
+        :param compute: Callable without arguments returning the parsed data
+        :return: The parsed data
+        """
+        key = self.make_key(file_path, reader_name, params)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _list_entries(self):
+        if not os.path.isdir(self.cache_dir_path):
+            return []
+
+        with os.scandir(self.cache_dir_path) as entries:
+            return [(entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in entries
+                    if entry.is_file() and entry.name.endswith(self.ENTRY_SUFFIX)]
+
+    def _get_size_bytes(self):
+        if self._size_bytes is None:
+            self._size_bytes = sum(size for _, size, _ in self._list_entries())
+        return self._size_bytes
+
+    def _evict(self):
+        # Remove the least recently used entries until the cache is back under its size cap.
+        entries = sorted(self._list_entries())
+        size_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_path in entries:
+            if size_bytes <= self.max_size_bytes:
+                break
+            self._remove_entry(entry_path)
+            size_bytes -= size
+        self._size_bytes = size_bytes
+
+    @staticmethod
+    def _remove_entry(entry_path):
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+
+    def clear(self):
+        for _, _, entry_path in self._list_entries():
+            self._remove_entry(entry_path)
+        self._size_bytes = 0
@@ -3,6 +3,9 @@ import os
 import shutil
 import sys
 
+from src.utilities.files.compression import COMPRESSED_FILE_EXTENSIONS, resolve_compressed_path, \
+    strip_compression_extension
+
 
 class SourceCodeFileFinder:
     def __init__(self):
@@ -45,11 +48,13 @@ def find_file(file_name, search_paths):
 
 def find_files_with_extension(directory_path, file_extension):
     """
-    Find all files within a directory with a specific extension.
+    Find all files within a directory with a specific extension, including their compressed (.gz, .bz2, .xz) forms.
+    A file stored both plain and compressed is returned once, preferably as the plain file.
     :param directory_path: Path to the directory
     :param file_extension: Extension of the files to find
     :return: List of file paths with the specified extension
     """
+    matching_extensions = (file_extension,) + tuple(file_extension + ext for ext in COMPRESSED_FILE_EXTENSIONS)
     matching_files = []
 
     # Check if the directory exists
@@ -57,15 +62,29 @@ def find_files_with_extension(directory_path, file_extension):
         print("Directory does not exist.")
         return matching_files
 
-    # Iterate through all files in the directory
-    for filename in os.listdir(directory_path):
-        if filename.endswith(file_extension):
-            # Append the full path of the file
-            matching_files.append(os.path.join(directory_path, filename))
+    # Iterate through all files in the directory; dict.fromkeys drops the repeated uncompressed paths.
+    uncompressed_paths = dict.fromkeys(strip_compression_extension(os.path.join(directory_path, filename))
+                                       for filename in os.listdir(directory_path)
+                                       if filename.endswith(matching_extensions))
+    for uncompressed_path in uncompressed_paths:
+        matching_files.append(resolve_compressed_path(uncompressed_path))
 
     return matching_files
 
 
+def get_folder_size(directory):
+    """
+    Sum the sizes of the files directly inside a directory (sub-folders are not visited).
+    :param directory: Path to the directory
+    :return: Total size of the files in bytes, 0 if the directory does not exist
+    """
+    if not os.path.isdir(directory):
+        return 0
+
+    with os.scandir(directory) as entries:
+        return sum(entry.stat().st_size for entry in entries if entry.is_file())
+
+
 def filter_files_by_word(file_names, file_paths, word):
     # Filter the files that contain the specific word in their names
     filtered_file_names = [name for name in file_names if word in name]
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The sources are imported both as src.<package> and as top-level packages (e.g. utilities.files.file_reader).
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (REPO_ROOT, os.path.join(REPO_ROOT, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,79 @@
+import json
+import pickle
+
+import pytest
+
+from src.modules.config_loaders.config_loader import ConfigLoader, FrozenConfigs, MultipleConfigLoader, \
+    SimCaseConfigResolver
+from src.modules.simulation.sim_case.sim_case_interface import SimCaseFileFolderManager
+
+NEFE_KEYS = ['FileNames.NEFE_IRWORK_BACKWARD_FILENAME', 'FileNames.NEFE_IRWORK_FORWARD_FILENAME']
+
+
+def write_configs(file_path, configs_dict):
+    with open(file_path, 'w') as configs_file:
+        json.dump(configs_dict, configs_file)
+    return str(file_path)
+
+
+def test_file_configs_override_defaults(tmp_path):
+    configs_path = write_configs(tmp_path / 'configs.json', {'FileExtensions': {'RDF_DATA': '.gofr'},
+                                                             'Extra': {'KEY': 1}})
+    configs = SimCaseConfigResolver.resolve(ConfigLoader(configs_path))
+
+    assert configs['FileExtensions']['RDF_DATA'] == '.gofr'
+    assert configs['FileExtensions']['GLOBAL_PROPS_TIME_AVERAGE'] == '.prop'
+    assert configs['Extra']['KEY'] == 1
+    # Resolved once per config file and shared.
+    assert SimCaseConfigResolver.resolve(ConfigLoader(configs_path)) is configs
+
+
+def test_resolved_configs_are_read_only_and_picklable(tmp_path):
+    configs = SimCaseConfigResolver.resolve(ConfigLoader(write_configs(tmp_path / 'configs.json', {})))
+
+    assert isinstance(configs['FileNames'], FrozenConfigs)
+    with pytest.raises(TypeError):
+        configs['FileNames']['LAMMPS_LOG_FILE_TEMPLATE_NAME'] = 'log.other'
+    assert pickle.loads(pickle.dumps(configs)).to_dict() == configs.to_dict()
+
+
+def test_defaulted_key_set_to_null_is_missing(tmp_path):
+    configs_path = write_configs(tmp_path / 'configs.json', {'FileNames': {'LAMMPS_LOG_FILE_TEMPLATE_NAME': None}})
+    with pytest.raises(KeyError, match='FileNames.LAMMPS_LOG_FILE_TEMPLATE_NAME'):
+        SimCaseConfigResolver.resolve(ConfigLoader(configs_path))
+
+
+def test_optional_keys_are_only_required_on_request(tmp_path):
+    configs_path = write_configs(tmp_path / 'configs.json', {'FileNames': {'NEFE_IRWORK_FORWARD_FILENAME': 'f.dat'}})
+    configs = SimCaseConfigResolver.resolve(ConfigLoader(configs_path))
+    assert configs['FileNames']['NEFE_IRWORK_BACKWARD_FILENAME'] is None
+
+    assert SimCaseConfigResolver.require(configs, NEFE_KEYS[1:]) is configs
+    with pytest.raises(KeyError, match='NEFE_IRWORK_BACKWARD_FILENAME'):
+        SimCaseConfigResolver.resolve(ConfigLoader(configs_path), required_keys=NEFE_KEYS)
+
+
+def test_multiple_config_files_are_merged(tmp_path):
+    configs_paths = [write_configs(tmp_path / 'base.json', {'FileNames': {'NEFE_IRWORK_FORWARD_FILENAME': 'f.dat'}}),
+                     write_configs(tmp_path / 'fe.json', {'FileNames': {'NEFE_IRWORK_BACKWARD_FILENAME': 'b.dat'}})]
+    configs = SimCaseConfigResolver.resolve(MultipleConfigLoader(configs_paths), required_keys=NEFE_KEYS)
+
+    assert configs['FileNames']['NEFE_IRWORK_FORWARD_FILENAME'] == 'f.dat'
+    assert configs['FileNames']['NEFE_IRWORK_BACKWARD_FILENAME'] == 'b.dat'
+
+
+def test_folder_manager_uses_the_given_configs(tmp_path):
+    sim_case_path = tmp_path / 'sim_case_3'
+    logs_path = tmp_path / 'logs'
+    sim_case_path.mkdir()
+    logs_path.mkdir()
+    (logs_path / 'run.log.3').write_text('')
+    (logs_path / 'log.lammps.3').write_text('')
+    configs = SimCaseConfigResolver.resolve(ConfigLoader(write_configs(
+        tmp_path / 'configs.json', {'FileNames': {'LAMMPS_LOG_FILE_TEMPLATE_NAME': 'run.log'}})))
+
+    sim_case_file_folder = SimCaseFileFolderManager(str(sim_case_path), str(logs_path), configs=configs)
+    assert sim_case_file_folder.configs is configs
+    assert sim_case_file_folder.log_file_path == str(logs_path / 'run.log.3')
+    # Without configs, those of the default config file of the sim cases are used.
+    assert SimCaseFileFolderManager(str(sim_case_path), str(logs_path)).log_file_path == str(logs_path / 'log.lammps.3')
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modules.simulation.sim_data.data_processors.cross_case_stats_processor import CrossCaseStatsProcessor
+
+
+def expected_stats(case_df, time_step0, column):
+    values = case_df.loc[case_df['TimeStep'] > time_step0, column].dropna()
+    return {'count': len(values), 'mean': values.mean(), 'std': values.std(), 'sem': values.sem(),
+            'min': values.min(), 'max': values.max()}
+
+
+@pytest.fixture
+def case_dfs():
+    rng = np.random.default_rng(7)
+    case_dfs = {}
+    for case_num in range(5):
+        num_rows = 50 + 37 * case_num
+        case_dfs[f'case_{case_num}'] = pd.DataFrame({'TimeStep': np.arange(num_rows) * 10,
+                                                     'a': rng.normal(case_num, 1.0 + case_num, num_rows),
+                                                     'b': rng.uniform(-5, 5, num_rows)})
+    # A restarted case (unsorted time-steps), a case with NaN values and a case without the column b.
+    restarted_df = case_dfs['case_1']
+    case_dfs['case_1'] = pd.concat([restarted_df, restarted_df.iloc[30:60].assign(a=lambda df: df['a'] + 1.0)],
+                                   ignore_index=True)
+    case_dfs['case_2'].loc[[3, 40, 41], 'a'] = np.nan
+    case_dfs['case_3'] = case_dfs['case_3'].drop(columns='b')
+    return case_dfs
+
+
+@pytest.mark.parametrize('time_step0', [0, 250, 10 ** 6])
+def test_matches_pandas(case_dfs, time_step0):
+    stats_df = CrossCaseStatsProcessor(case_dfs).process(time_step0, 'TimeStep')
+
+    for case_key, case_df in case_dfs.items():
+        for column in ('a', 'b'):
+            case_stats = stats_df.loc[(case_key, column)]
+            if column not in case_df:
+                assert case_stats['count'] == 0 and np.isnan(case_stats['mean'])
+                continue
+
+            expected = expected_stats(case_df, time_step0, column)
+            assert case_stats['count'] == expected['count']
+            for statistic in ('mean', 'std', 'sem', 'min', 'max'):
+                np.testing.assert_allclose(case_stats[statistic], expected[statistic], rtol=1e-12, atol=0,
+                                           err_msg=f'{case_key} {column} {statistic}')
+
+
+def test_processing_columns_and_groups(case_dfs):
+    stats_df = CrossCaseStatsProcessor(case_dfs).process(100, 'TimeStep', ['a'])
+    assert list(stats_df.index.get_level_values('column').unique()) == ['a']
+
+    # Processing the cases in groups gives the statistics of the single pass.
+    processor = CrossCaseStatsProcessor()
+    group_dfs = []
+    for case_keys in (list(case_dfs)[:2], list(case_dfs)[2:]):
+        processor.sim_data = {case_key: case_dfs[case_key] for case_key in case_keys}
+        group_dfs.append(processor.process(100, 'TimeStep', ['a']))
+    pd.testing.assert_frame_equal(pd.concat(group_dfs), stats_df)
+
+
+def test_no_cases():
+    stats_df = CrossCaseStatsProcessor().process(0, 'TimeStep')
+    assert stats_df.empty
+    assert list(stats_df.columns) == list(CrossCaseStatsProcessor.STATISTICS)
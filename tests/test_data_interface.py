@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+
+from src.modules.simulation.sim_data.data_interface import OutputSimData, SimDataMemoryBudget, estimate_size_bytes
+
+ARRAY_SIZE = 1000
+
+
+def make_loader(value, load_counts, key):
+    def load():
+        load_counts[key] = load_counts.get(key, 0) + 1
+        return np.full(ARRAY_SIZE, value, dtype=np.float64)
+    return load
+
+
+def test_lazy_entries_are_loaded_on_first_access():
+    load_counts = {}
+    sim_out_data = OutputSimData().add_lazy('a', make_loader(1.0, load_counts, 'a'))
+
+    assert 'a' in sim_out_data.data and not sim_out_data.is_loaded('a') and load_counts == {}
+    assert sim_out_data.data['a'][0] == 1.0
+    assert sim_out_data.data['a'][0] == 1.0
+    assert load_counts == {'a': 1} and sim_out_data.loaded_size_bytes == ARRAY_SIZE * 8
+
+    # A released lazy entry is kept and reloaded on the next access.
+    sim_out_data.release()
+    assert not sim_out_data.is_loaded('a')
+    assert sim_out_data.data['a'][0] == 1.0 and load_counts == {'a': 2}
+
+
+def test_budget_evicts_least_recently_used_lazy_entries():
+    load_counts = {}
+    memory_budget = SimDataMemoryBudget(int(2.5 * ARRAY_SIZE * 8))
+    sim_out_data = OutputSimData(memory_budget)
+    for value, key in enumerate(('a', 'b', 'c')):
+        sim_out_data.add_lazy(key, make_loader(float(value), load_counts, key))
+
+    sim_out_data.data['a']
+    sim_out_data.data['b']
+    sim_out_data.data['a']
+    sim_out_data.data['c']
+    # 'b' was the least recently used entry when 'c' went over the budget.
+    assert [sim_out_data.is_loaded(key) for key in ('a', 'b', 'c')] == [True, False, True]
+    assert memory_budget.size_bytes <= memory_budget.max_size_bytes
+
+    assert sim_out_data.data['b'][0] == 1.0 and load_counts['b'] == 2
+
+
+def test_derived_entries_are_never_evicted(tmp_path):
+    memory_budget = SimDataMemoryBudget(ARRAY_SIZE * 8, str(tmp_path))
+    sim_out_data = OutputSimData(memory_budget)
+    sim_out_data.add('derived', np.ones(ARRAY_SIZE))
+    sim_out_data.add_lazy('a', make_loader(1.0, {}, 'a'))
+
+    sim_out_data.data['a']
+    assert sim_out_data.is_loaded('derived') and os.listdir(tmp_path) == []
+
+
+def test_spillable_entries_are_spilled_and_read_back(tmp_path):
+    memory_budget = SimDataMemoryBudget(ARRAY_SIZE * 8, str(tmp_path))
+    sim_out_data = OutputSimData(memory_budget)
+    sim_out_data.add('spillable', np.arange(ARRAY_SIZE, dtype=np.float64), spillable=True)
+    sim_out_data.add('other', np.zeros(ARRAY_SIZE), spillable=True)
+
+    assert not sim_out_data.is_loaded('spillable') and len(os.listdir(tmp_path)) == 1
+    np.testing.assert_array_equal(sim_out_data.data['spillable'], np.arange(ARRAY_SIZE))
+    # Reading it back spills the other entry; the spill file of the first one is removed.
+    assert not sim_out_data.is_loaded('other') and len(os.listdir(tmp_path)) == 1
+
+    sim_out_data.release()
+    assert len(sim_out_data.data) == 0 and os.listdir(tmp_path) == [] and memory_budget.size_bytes == 0
+
+
+def test_spillable_entries_stay_loaded_without_spill_dir():
+    memory_budget = SimDataMemoryBudget(ARRAY_SIZE * 8)
+    sim_out_data = OutputSimData(memory_budget)
+    sim_out_data.add('spillable', np.ones(ARRAY_SIZE), spillable=True)
+    sim_out_data.add('other', np.ones(ARRAY_SIZE), spillable=True)
+
+    assert sim_out_data.is_loaded('spillable') and sim_out_data.is_loaded('other')
+
+
+def test_nested_sim_data_size():
+    nested_sim_data = OutputSimData().add('a', np.ones(ARRAY_SIZE)).add('b', np.ones(ARRAY_SIZE))
+    assert estimate_size_bytes(nested_sim_data) == 2 * ARRAY_SIZE * 8
+    assert estimate_size_bytes([np.ones(ARRAY_SIZE)]) > ARRAY_SIZE * 8
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modules.simulation.sim_data.data_processors.equilibration_processor import EquilibrationProcessor, \
+    autocorrelation_fft, statistical_inefficiency
+
+
+def ar1_series(rng, num_rows, phi, mean=0.0):
+    noise = rng.normal(size=num_rows)
+    series = np.empty(num_rows)
+    series[0] = noise[0]
+    for row_num in range(1, num_rows):
+        series[row_num] = phi * series[row_num - 1] + noise[row_num]
+    return series + mean
+
+
+def direct_autocorrelation(series):
+    centered = series - series.mean()
+    num_rows = len(series)
+    autocovariance = np.array([np.dot(centered[:num_rows - lag], centered[lag:]) / (num_rows - lag)
+                               for lag in range(num_rows)])
+    return autocovariance / autocovariance[0]
+
+
+def test_autocorrelation_matches_direct_sum():
+    rng = np.random.default_rng(11)
+    lengths = np.array([300, 217, 1])
+    series = np.full((300, 3), np.nan)
+    series[:, 0] = ar1_series(rng, 300, 0.8)
+    series[:217, 1] = rng.normal(size=217)
+    series[:1, 2] = 4.0
+
+    autocorrelation = autocorrelation_fft(series, lengths)
+    np.testing.assert_allclose(autocorrelation[:, 0], direct_autocorrelation(series[:, 0]), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(autocorrelation[:217, 1], direct_autocorrelation(series[:217, 1]), rtol=1e-9,
+                               atol=1e-12)
+    # Lags beyond a series and constant series are NaN.
+    assert np.isnan(autocorrelation[217:, 1]).all()
+    assert np.isnan(autocorrelation[:, 2]).all()
+
+
+def test_statistical_inefficiency_of_ar1():
+    rng = np.random.default_rng(5)
+    phi = 0.8
+    lengths = np.array([100000])
+    g = statistical_inefficiency(autocorrelation_fft(ar1_series(rng, lengths[0], phi)[:, None], lengths), lengths)
+    assert g[0] == pytest.approx((1 + phi) / (1 - phi), rel=0.1)
+
+
+def make_case_df(rng, num_rows, num_equilibration_rows):
+    values = ar1_series(rng, num_rows, 0.5, mean=-100.0)
+    values[:num_equilibration_rows] += np.linspace(30.0, 0.0, num_equilibration_rows)
+    return pd.DataFrame({'TimeStep': np.arange(num_rows) * 10, 'a': values})
+
+
+def test_detects_equilibration():
+    rng = np.random.default_rng(2)
+    case_dfs = {case_num: make_case_df(rng, 4000, 600) for case_num in range(3)}
+    stats_df = EquilibrationProcessor(case_dfs).process(None, 'TimeStep')
+
+    for case_num, case_df in case_dfs.items():
+        case_stats = stats_df.loc[(case_num, 'a')]
+        assert 6000 <= case_stats['t0'] <= 10000
+        equilibrated = case_df.loc[case_df['TimeStep'] >= case_stats['t0'], 'a']
+        assert case_stats['count'] == len(equilibrated)
+        assert case_stats['mean'] == pytest.approx(equilibrated.mean(), rel=1e-12)
+        assert case_stats['std'] == pytest.approx(equilibrated.std(), rel=1e-9)
+        assert case_stats['sem'] == pytest.approx(case_stats['std'] * np.sqrt(case_stats['g'] / case_stats['count']))
+
+
+def test_nan_rows_and_missing_columns():
+    rng = np.random.default_rng(4)
+    clean_df = make_case_df(rng, 3000, 500)
+    nan_df = clean_df.copy()
+    nan_df.loc[[0, 1700, 2500], 'a'] = np.nan
+    other_df = clean_df.rename(columns={'a': 'b'})
+
+    stats_df = EquilibrationProcessor({'clean': clean_df, 'nan': nan_df, 'other': other_df}).process(None, 'TimeStep')
+    nan_stats = stats_df.loc[('nan', 'a')]
+    assert np.isfinite(nan_stats[['t0', 'mean', 'std', 'g', 'sem']].astype(float)).all()
+    assert nan_stats['count'] == nan_df.loc[nan_df['TimeStep'] >= nan_stats['t0'], 'a'].count()
+    assert nan_stats['mean'] == pytest.approx(stats_df.loc[('clean', 'a'), 'mean'], abs=0.05)
+
+    # Columns a case does not have are empty series.
+    for case_key, column in (('other', 'a'), ('clean', 'b'), ('nan', 'b')):
+        assert stats_df.loc[(case_key, column), 'count'] == 0
+        assert np.isnan(stats_df.loc[(case_key, column), 'mean'])
+        assert np.isnan(stats_df.loc[(case_key, column), 't0'])
+
+
+def test_time_step0_is_a_lower_bound():
+    rng = np.random.default_rng(8)
+    stats_df = EquilibrationProcessor({0: make_case_df(rng, 3000, 100)}).process(15000, 'TimeStep')
+    assert stats_df.loc[(0, 'a'), 't0'] > 15000
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.modules.simulation.forcefield.forcefield import SWFF
+from src.utilities.files.parsed_data_cache import ParsedDataCache
+
+PARAM_NAMES = ["eps", "sigma", "a", "lambda", "gamma", "cos(theta0)", "A", "B", "p", "q", "tol"]
+
+
+def write_ff_file(file_path, triplet_values):
+    with open(file_path, 'w') as ff_file:
+        ff_file.write('# Stillinger-Weber parameters\n# p1 p2 p3 eps sigma a lambda gamma cos(theta0) A B p q tol\n\n')
+        for triplet, value in triplet_values:
+            ff_file.write(' '.join(triplet) + ' ' + ' '.join(str(value + i) for i in range(len(PARAM_NAMES))) + '\n')
+        ff_file.write('WO WO too few values\n')
+    return str(file_path)
+
+
+def test_triplet_and_pair_lookups(tmp_path):
+    long_name = 'WaterOxygenWithALongName'
+    ff_file_path = write_ff_file(tmp_path / 'ff.sw', [(('WO', 'WO', 'WO'), 1.0), (('WO', 'CO2', 'CO2'), 2.0),
+                                                     (('WO', 'CO2', 'WO'), 3.0), ((long_name, 'WO', 'WO'), 4.0)])
+    forcefield = SWFF()
+    params = forcefield.read_params(ff_file_path)
+
+    # The malformed line is skipped and no particle name is truncated.
+    assert len(params) == 4 and params.dtype.names == tuple(["p1", "p2", "p3"] + PARAM_NAMES)
+    assert forcefield.param_names == PARAM_NAMES
+    triplet_params = forcefield.get_triplet_params('WO', 'CO2', 'WO')
+    assert triplet_params['p3'] == 'WO' and triplet_params['eps'] == 3.0 and triplet_params['tol'] == 13.0
+    assert forcefield.get_triplet_params(long_name, 'WO', 'WO')['p1'] == long_name
+    # The first triplet starting with the pair wins.
+    assert forcefield.get_pair_params('WO', 'CO2')['eps'] == 2.0
+    with pytest.raises(KeyError):
+        forcefield.get_triplet_params('CO2', 'CO2', 'CO2')
+    with pytest.raises(KeyError):
+        forcefield.get_pair_params('CO2', 'WO')
+
+
+def test_params_setter_rebuilds_index(tmp_path):
+    forcefield = SWFF()
+    forcefield.read_params(write_ff_file(tmp_path / 'ff.sw', [(('WO', 'WO', 'WO'), 1.0)]))
+    params = forcefield.params.copy()
+    params['eps'] = 5.0
+    forcefield.params = params
+    assert forcefield.get_triplet_params('WO', 'WO', 'WO')['eps'] == 5.0
+
+    with pytest.raises(ValueError):
+        forcefield.params = np.zeros(1, dtype=[('p1', 'U2'), ('eps', np.float64)])
+
+
+def test_cached_params(tmp_path):
+    ff_file_path = write_ff_file(tmp_path / 'ff.sw', [(('WO', 'WO', 'WO'), 1.0)])
+    cache = ParsedDataCache(str(tmp_path / 'cache'))
+    parsed_params = SWFF(cache).read_params(ff_file_path)
+    cached_params = SWFF(cache).read_params(ff_file_path)
+    np.testing.assert_array_equal(cached_params, parsed_params)
+
+
+def test_read_params_batch(tmp_path):
+    ff_file_paths = [write_ff_file(tmp_path / 'ff_1.sw', [(('WO', 'WO', 'WO'), 1.0), (('WO', 'CO2', 'CO2'), 2.0)]),
+                     write_ff_file(tmp_path / 'ff_2.sw', [(('WO', 'CO2', 'CO2'), 20.0), (('CO2', 'CO2', 'CO2'), 30.0)])]
+    triplets, param_names, params = SWFF.read_params_batch(ff_file_paths)
+
+    # The triplets of all the files, in the order they first appear.
+    assert triplets == [('WO', 'WO', 'WO'), ('WO', 'CO2', 'CO2'), ('CO2', 'CO2', 'CO2')]
+    assert param_names == PARAM_NAMES
+    assert params.shape == (2, 3, len(PARAM_NAMES))
+    np.testing.assert_array_equal(params[:, :, 0], [[1.0, 2.0, np.nan], [np.nan, 20.0, 30.0]])
+
+    with pytest.raises(ValueError):
+        SWFF.read_params_batch([])
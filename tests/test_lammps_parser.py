@@ -0,0 +1,76 @@
+import gzip
+
+import numpy as np
+import pytest
+
+from utilities.files.file_reader import GeneralFileReader
+from src.modules.simulation.lammps_parser import LammpsLogParser, LammpsThermoExtractor
+
+LOG_TEXT = '''LAMMPS (2 Aug 2023)
+variable        Temp equal 250.0
+variable        Press equal 1.0
+variable        Temp equal 300.0
+pair_coeff      * * ff_1.sw WO CO2
+Number of molecules for h2o: 368
+Number of molecules for co2: 64
+Volume after nph: 27000.5
+Per MPI rank memory allocation (min/avg/max) = 5.1 | 5.1 | 5.1 Mbytes
+   Step          Temp          PotEng
+         0   250            -1000.5
+        10   251.5          -1001.5
+WARNING: Angle atoms missing (src/angle.cpp:248)
+        20   249            -1002
+Loop time of 1.5 on 1 procs for 20 steps with 1200 atoms
+pair_coeff      * * ff_2.sw WO CO2
+Per MPI rank memory allocation (min/avg/max) = 5.1 | 5.1 | 5.1 Mbytes
+   Step          Temp          PotEng         Press
+        20   249            -1002         1.5
+        30   250            -1003         2.5
+'''
+
+
+@pytest.fixture(params=['log.lammps', 'log.lammps.gz'])
+def log_file_path(tmp_path, request):
+    file_path = tmp_path / request.param
+    with (gzip.open(file_path, 'wt') if request.param.endswith('.gz') else open(file_path, 'w')) as log_file:
+        log_file.write(LOG_TEXT)
+    return str(file_path)
+
+
+def test_log_queries_come_from_one_streamed_pass(log_file_path):
+    data_reader = GeneralFileReader(log_file_path)
+    lmp_log_parser = LammpsLogParser(data_reader)
+
+    # The first definition of a variable wins.
+    assert lmp_log_parser.get_value_of_variable('Temp', 'v') == 250.0
+    assert lmp_log_parser.get_value_of_variable('Press', 'v') == 1.0
+    assert lmp_log_parser.get_value_of_variable('Missing', 'v') is None
+    assert lmp_log_parser.get_value_of_variable('Volume after nph:', 'p') == 27000.5
+    assert lmp_log_parser.get_number_of_particles() == [('h2o', 368), ('co2', 64)]
+    assert lmp_log_parser.get_text_using_label('pair_coeff', 3, 1) == 'ff_1.sw'
+    assert lmp_log_parser.get_text_using_label('pair_coeff', 3, 2) == 'ff_2.sw'
+    # Labels outside the index are scanned for on first use.
+    assert lmp_log_parser.get_text_using_label('Loop time of', 3, 1) == '1.5'
+    assert data_reader.file_lines == []
+
+
+def test_thermo_segments(log_file_path):
+    segments = LammpsLogParser(GeneralFileReader(log_file_path)).get_thermo_data()
+
+    assert [segment['run_index'] for segment in segments] == [0, 1]
+    assert segments[0]['columns'] == ['Step', 'Temp', 'PotEng']
+    np.testing.assert_array_equal(segments[0]['data']['Step'], [0, 10, 20])
+    assert segments[0]['data']['Step'].dtype == np.int64
+    np.testing.assert_allclose(segments[0]['data']['PotEng'], [-1000.5, -1001.5, -1002.0])
+    # The second run was cut short: its segment ends at the end of the file.
+    assert segments[1]['columns'] == ['Step', 'Temp', 'PotEng', 'Press']
+    np.testing.assert_allclose(segments[1]['data']['Press'], [1.5, 2.5])
+
+
+def test_thermo_columns_and_chunks(log_file_path):
+    segments = list(LammpsThermoExtractor(log_file_path, columns=['Press', 'Step'], chunk_rows=1).iter_segments())
+
+    # The columns keep the requested order; a segment without a requested column just lacks it.
+    assert [segment['columns'] for segment in segments] == [['Step'], ['Press', 'Step']]
+    np.testing.assert_array_equal(segments[0]['data']['Step'], [0, 10, 20])
+    np.testing.assert_allclose(segments[1]['data']['Press'], [1.5, 2.5])
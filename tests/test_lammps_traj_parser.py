@@ -0,0 +1,127 @@
+import gzip
+import os
+
+import numpy as np
+import pytest
+
+from utilities.files.file_reader import GeneralFileReader
+from src.modules.parsers.molecular_trajectory_parsers.lmp_trj_parser import LAMMPSTrajParser
+from src.modules.parsers.molecular_trajectory_parsers.lmp_trj_frame_index import LAMMPSTrajFrameIndex
+from src.modules.parsers.molecular_trajectory_parsers.lmp_trj_binary_cache import LAMMPSTrajBinaryCache
+from src.utilities.files.file_catalog import ProjectFileCatalog
+from src.utilities.manage_file_folder import find_files_with_extension
+
+TIMESTEPS = [0, 100, 200, 300, 400, 500]
+NUM_ATOMS = 5
+
+
+def get_coordinates(timestep):
+    return np.arange(NUM_ATOMS * 3).reshape(NUM_ATOMS, 3) * 0.1 + timestep * 0.001
+
+
+def write_trajectory(file_path, timesteps=TIMESTEPS):
+    text = ''
+    for timestep in timesteps:
+        text += f'ITEM: TIMESTEP\n{timestep}\nITEM: NUMBER OF ATOMS\n{NUM_ATOMS}\n'
+        text += 'ITEM: BOX BOUNDS pp pp pp\n0.0 10.0\n0.0 11.0\n0.0 12.0\nITEM: ATOMS id type x y z\n'
+        # The atoms are dumped in reverse order of their ids.
+        for atom_num in reversed(range(NUM_ATOMS)):
+            x, y, z = get_coordinates(timestep)[atom_num]
+            text += f'{atom_num + 1} {atom_num % 2 + 1} {x:.6f} {y:.6f} {z:.6f}\n'
+
+    with (gzip.open(file_path, 'wt') if str(file_path).endswith('.gz') else open(file_path, 'w')) as trj_file:
+        trj_file.write(text)
+    return str(file_path)
+
+
+@pytest.fixture(params=['traj.lammpstrj', 'traj.lammpstrj.gz'])
+def trj_file_path(tmp_path, request):
+    return write_trajectory(tmp_path / request.param)
+
+
+def get_timesteps(frames):
+    return [frame['time-step'] for frame in frames]
+
+
+def test_frame_index(trj_file_path):
+    frame_index = LAMMPSTrajFrameIndex(trj_file_path).load()
+    np.testing.assert_array_equal(frame_index.timesteps, TIMESTEPS)
+    assert len(frame_index.offsets) == len(TIMESTEPS) + 1 and frame_index.offsets[0] == 0
+    assert frame_index.get_frame_number(300) == 3
+    with pytest.raises(KeyError):
+        frame_index.get_frame_number(350)
+
+    # The persisted index is reused while the trajectory is unchanged and rebuilt once it changes.
+    assert os.path.isfile(frame_index.index_file_path)
+    np.testing.assert_array_equal(LAMMPSTrajFrameIndex(trj_file_path).load().offsets, frame_index.offsets)
+    write_trajectory(trj_file_path, TIMESTEPS + [600])
+    np.testing.assert_array_equal(LAMMPSTrajFrameIndex(trj_file_path).load().timesteps, TIMESTEPS + [600])
+
+
+def test_decoded_frames(trj_file_path):
+    with LAMMPSTrajParser(GeneralFileReader(trj_file_path)) as lmp_trj_parser:
+        assert lmp_trj_parser.num_frames == len(TIMESTEPS)
+        frame = lmp_trj_parser.get_frame_by_timestep(200)
+        assert lmp_trj_parser.get_frame(-1)['time-step'] == 500
+
+    assert frame['time-step'] == 200
+    np.testing.assert_allclose(frame['box']['bounds'], [[0.0, 10.0], [0.0, 11.0], [0.0, 12.0]])
+    assert frame['box']['tilt'] is None and frame['box']['boundary'] == ['pp', 'pp', 'pp']
+    assert frame['atoms'].dtype['id'] == np.int64 and frame['atoms'].dtype['type'] == np.int32
+    np.testing.assert_array_equal(frame['atoms']['id'], np.arange(NUM_ATOMS, 0, -1))
+    np.testing.assert_allclose(np.column_stack([frame['atoms'][column] for column in 'xyz']),
+                               get_coordinates(200)[::-1], atol=1e-6)
+
+
+@pytest.mark.parametrize('selection, expected_timesteps', [
+    ({}, TIMESTEPS),
+    ({'start': 1, 'stop': 5, 'stride': 2}, [100, 300]),
+    ({'start': -2}, [400, 500]),
+    ({'timestep_range': (100, 300)}, [100, 200, 300]),
+    ({'stride': 2, 'timestep_range': (None, 300)}, [0, 200]),
+    ({'timestep_range': (450, None)}, [500]),
+])
+def test_frame_selection(trj_file_path, selection, expected_timesteps):
+    with LAMMPSTrajParser(GeneralFileReader(trj_file_path)) as lmp_trj_parser:
+        assert get_timesteps(lmp_trj_parser.iter_frames(**selection)) == expected_timesteps
+
+
+def test_backward_access_to_compressed_trajectory(tmp_path):
+    trj_file_path = write_trajectory(tmp_path / 'traj.lammpstrj.gz')
+    with LAMMPSTrajParser(GeneralFileReader(trj_file_path)) as lmp_trj_parser:
+        # Going back restarts the decompression of the stream.
+        assert [lmp_trj_parser.get_frame(frame_number)['time-step'] for frame_number in (4, 1, 5, 0)] == \
+               [400, 100, 500, 0]
+        assert get_timesteps(lmp_trj_parser.parse()) == TIMESTEPS
+
+
+def test_binary_cache(trj_file_path):
+    lmp_trj_parser = LAMMPSTrajParser(GeneralFileReader(trj_file_path))
+    binary_cache = LAMMPSTrajBinaryCache(lmp_trj_parser)
+    cached_data = binary_cache.load()
+    lmp_trj_parser.close()
+
+    assert binary_cache.is_valid()
+    np.testing.assert_array_equal(cached_data['timesteps'], TIMESTEPS)
+    # The atoms are stored sorted by id.
+    np.testing.assert_array_equal(cached_data['ids'], np.arange(1, NUM_ATOMS + 1))
+    np.testing.assert_array_equal(cached_data['types'], np.arange(NUM_ATOMS) % 2 + 1)
+    assert cached_data['coordinates'].dtype == np.float32
+    np.testing.assert_allclose(cached_data['coordinates'][2], get_coordinates(200), atol=1e-5)
+    assert cached_data['coordinate_columns'] == ['x', 'y', 'z']
+
+    write_trajectory(trj_file_path, TIMESTEPS[:2])
+    assert not binary_cache.is_valid()
+    lmp_trj_parser = LAMMPSTrajParser(GeneralFileReader(trj_file_path))
+    np.testing.assert_array_equal(LAMMPSTrajBinaryCache(lmp_trj_parser).load()['timesteps'], TIMESTEPS[:2])
+    lmp_trj_parser.close()
+
+
+def test_files_stored_plain_and_compressed_are_found_once(tmp_path):
+    for file_name in ('a.prop', 'a.prop.gz', 'b.prop.xz', 'b.prop.gz', 'c.rdf'):
+        (tmp_path / file_name).write_text('')
+
+    expected_paths = [str(tmp_path / 'a.prop'), str(tmp_path / 'b.prop.gz')]
+    assert sorted(find_files_with_extension(str(tmp_path), '.prop')) == expected_paths
+    assert sorted(ProjectFileCatalog().scan(str(tmp_path)).find_files_with_extension(str(tmp_path), '.prop')) == \
+           expected_paths
@@ -0,0 +1,113 @@
+import os
+
+import pandas as pd
+
+from utilities.files.file_reader import GeneralFileReader
+from src.utilities.files.parsed_data_cache import ParsedDataCache
+from src.modules.simulation.sim_file_reader.global_timeavg_property_reader import GlobalTimeAvgPropertyReader
+
+
+class CountingCompute:
+    def __init__(self, value):
+        self.value = value
+        self.num_calls = 0
+
+    def __call__(self):
+        self.num_calls += 1
+        return self.value
+
+
+def write_file(file_path, text):
+    with open(file_path, 'w') as written_file:
+        written_file.write(text)
+    return str(file_path)
+
+
+def test_hit_after_miss(tmp_path):
+    source_path = write_file(tmp_path / 'source.prop', '1 2 3\n')
+    cache = ParsedDataCache(str(tmp_path / 'cache'))
+    compute = CountingCompute({'a': [1, 2, 3]})
+
+    assert cache.get_or_compute(source_path, 'Reader', {'p': 1}, compute) == {'a': [1, 2, 3]}
+    assert cache.get_or_compute(source_path, 'Reader', {'p': 1}, compute) == {'a': [1, 2, 3]}
+    assert compute.num_calls == 1
+
+
+def test_changed_file_is_a_miss(tmp_path):
+    source_path = write_file(tmp_path / 'source.prop', '1 2 3\n')
+    cache = ParsedDataCache(str(tmp_path / 'cache'))
+    key = cache.make_key(source_path, 'Reader', None)
+    cache.put(key, 'old')
+
+    write_file(tmp_path / 'source.prop', '1 2 3\n4 5 6\n')
+    assert cache.make_key(source_path, 'Reader', None) != key
+
+    # Same size, later modification time.
+    key = cache.make_key(source_path, 'Reader', None)
+    file_stat = os.stat(source_path)
+    os.utime(source_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10 ** 9))
+    assert cache.make_key(source_path, 'Reader', None) != key
+
+
+def test_reader_name_and_params_are_part_of_the_key(tmp_path):
+    source_path = write_file(tmp_path / 'source.prop', '1 2 3\n')
+    cache = ParsedDataCache(str(tmp_path / 'cache'))
+    keys = {cache.make_key(source_path, 'Reader', {'p': 1}), cache.make_key(source_path, 'Reader', {'p': 2}),
+            cache.make_key(source_path, 'OtherReader', {'p': 1})}
+    assert len(keys) == 3
+
+
+def test_hashed_contents_detect_a_rewrite_with_the_same_stat(tmp_path):
+    source_path = write_file(tmp_path / 'source.prop', 'abc\n')
+    file_stat = os.stat(source_path)
+    cache = ParsedDataCache(str(tmp_path / 'cache'), hash_contents=True)
+    key = cache.make_key(source_path, 'Reader', None)
+
+    write_file(tmp_path / 'source.prop', 'xyz\n')
+    os.utime(source_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+    assert cache.make_key(source_path, 'Reader', None) != key
+
+
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path):
+    cache = ParsedDataCache(str(tmp_path / 'cache'))
+    cache.put('key', 'value')
+    entry_path = os.path.join(cache.cache_dir_path, 'key' + ParsedDataCache.ENTRY_SUFFIX)
+    write_file(entry_path, 'not a pickle')
+
+    assert cache.get('key') is None
+    assert not os.path.exists(entry_path)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    payload = b'x' * 1000
+    cache = ParsedDataCache(str(tmp_path / 'cache'), max_size_bytes=3500)
+    for entry_num in range(3):
+        cache.put(f'key{entry_num}', payload)
+        # Distinct modification times order the entries by use.
+        entry_path = os.path.join(cache.cache_dir_path, f'key{entry_num}' + ParsedDataCache.ENTRY_SUFFIX)
+        os.utime(entry_path, ns=(entry_num * 10 ** 9, entry_num * 10 ** 9))
+    # Using key0 makes key1 the least recently used entry.
+    assert cache.get('key0') == payload
+
+    cache.put('key3', payload)
+    assert cache.get('key1') is None
+    assert all(cache.get(key) == payload for key in ('key0', 'key2', 'key3'))
+
+
+def test_reader_caches_each_time_step0(tmp_path):
+    source_path = write_file(tmp_path / 'props.prop', '# Time-averaged data\n# TimeStep v_a\n' +
+                             ''.join(f'{time_step} {time_step * 0.5}\n' for time_step in range(0, 1000, 10)))
+    cache = ParsedDataCache(str(tmp_path / 'cache'))
+    uncached_df = GlobalTimeAvgPropertyReader(GeneralFileReader(source_path)).read(1, 500)
+
+    cached_df = GlobalTimeAvgPropertyReader(GeneralFileReader(source_path), cache).read(1, 500)
+    assert len(os.listdir(cache.cache_dir_path)) == 1
+    # The entry only holds the rows after time_step0, so another time_step0 is a new entry.
+    other_df = GlobalTimeAvgPropertyReader(GeneralFileReader(source_path), cache).read(1, 200)
+    assert len(os.listdir(cache.cache_dir_path)) == 2
+    rerun_df = GlobalTimeAvgPropertyReader(GeneralFileReader(source_path), cache).read(1, 500)
+    assert len(os.listdir(cache.cache_dir_path)) == 2
+
+    pd.testing.assert_frame_equal(cached_df, uncached_df)
+    pd.testing.assert_frame_equal(rerun_df, uncached_df)
+    assert other_df['TimeStep'].iloc[0] == 210 and len(other_df) == 79
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from src.modules.simulation.component.particle.particle import Particle
+from src.modules.simulation.component.particle.particles import Particles
+
+
+def make_particles(num_particles):
+    particles = Particles(property_reader=None)
+    for particle_num in range(num_particles):
+        name = 'h2o' if particle_num % 2 == 0 else 'co2'
+        particles.add_particle(Particle(name, mass=float(particle_num + 1), charge=0, count=10 * particle_num))
+    return particles
+
+
+def test_particles_read_and_write_the_arrays():
+    # More particles than the initial capacity, so the arrays grow.
+    particles = make_particles(Particles.INITIAL_CAPACITY + 3)
+
+    np.testing.assert_array_equal(particles.masses, np.arange(1, len(particles) + 1))
+    assert particles.total_count == 10 * sum(range(len(particles)))
+    np.testing.assert_array_equal(particles.particle_types[:4], [0, 1, 0, 1])
+    assert particles.type_index == {'h2o': 0, 'co2': 1} and particles.num_particle_types == 2
+
+    particle = particles.particles[3]
+    particle.mass = 44.0
+    assert particles.masses[3] == 44.0
+    particles.set_values('charge', np.arange(len(particles)))
+    assert particle.charge == 3 and isinstance(particle.charge, int)
+    # Unset attributes are NaN in the arrays and None on the particles.
+    assert np.isnan(particles.get_values('mu')).all() and particle.mu is None
+
+
+def test_values_are_read_only_and_particles_have_slots():
+    particles = make_particles(2)
+    with pytest.raises(ValueError):
+        particles.masses[0] = 1.0
+    with pytest.raises(AttributeError):
+        particles.particles[0].extra = 1
@@ -0,0 +1,72 @@
+import gzip
+
+import numpy as np
+import pytest
+
+from utilities.files.file_reader import GeneralFileReader
+from src.modules.simulation.sim_file_reader.prop_profile_data_reader import PropProfileReader
+
+TIME_STEPS = list(range(1000, 11000, 1000))
+
+
+def write_profile_file(file_path, time_steps=TIME_STEPS):
+    text = '# Chunk-averaged data for fix dens\n# Timestep Number-of-chunks Total-count\n# Chunk Coord1 density/mass\n'
+    for time_step in time_steps:
+        # Every other block has one chunk less.
+        num_rows = 3 if time_step % 2000 else 4
+        text += f'{time_step} {num_rows} 100\n'
+        text += ''.join(f'{row_num} {0.5 * row_num} {time_step + row_num}\n' for row_num in range(1, num_rows + 1))
+
+    with (gzip.open(file_path, 'wt') if str(file_path).endswith('.gz') else open(file_path, 'w')) as profile_file:
+        profile_file.write(text)
+    return str(file_path)
+
+
+@pytest.fixture(params=['dens.mden', 'dens.mden.gz'])
+def profile_file_path(tmp_path, request):
+    return write_profile_file(tmp_path / request.param)
+
+
+@pytest.mark.parametrize('initial_tstep, final_tstep, skipped_tsteps, expected_time_steps', [
+    (1000, 10000, 1, TIME_STEPS),
+    # Both ends of the range are included.
+    (3000, 6000, 1, [3000, 4000, 5000, 6000]),
+    # Every skipped_tsteps-th block of the range is kept, starting with its first block.
+    (3000, 10000, 3, [3000, 6000, 9000]),
+    (2500, 9000, 2, [3000, 5000, 7000, 9000]),
+    (7000, 7000, 5, [7000]),
+])
+def test_blocks_in_range(profile_file_path, initial_tstep, final_tstep, skipped_tsteps, expected_time_steps):
+    reader = PropProfileReader(GeneralFileReader(profile_file_path), initial_tstep, final_tstep, skipped_tsteps)
+    prop_list = reader.read(num_args_per_tstep_line=3)
+
+    assert [prop['time_step'] for prop in prop_list] == expected_time_steps
+    np.testing.assert_array_equal(reader.time_steps, expected_time_steps)
+    assert reader.column_names == ['Chunk', 'Coord1', 'density/mass']
+    for prop in prop_list:
+        num_rows = 3 if prop['time_step'] % 2000 else 4
+        assert list(prop['data'].columns) == reader.column_names
+        np.testing.assert_allclose(prop['data']['density/mass'], prop['time_step'] + np.arange(1, num_rows + 1))
+
+
+def test_dense_array_pads_shorter_blocks(profile_file_path):
+    reader = PropProfileReader(GeneralFileReader(profile_file_path), 1000, 2000)
+    reader.read(num_args_per_tstep_line=3)
+
+    assert reader.data_array.shape == (2, 4, 3)
+    assert np.isnan(reader.data_array[0, 3]).all()
+    np.testing.assert_allclose(reader.data_array[1, :, 2], 2000 + np.arange(1, 5))
+
+
+def test_read_lines_give_the_same_blocks(profile_file_path):
+    # File lines read beforehand are iterated instead of seeking with the offset index.
+    general_file_reader = GeneralFileReader(profile_file_path)
+    general_file_reader.read()
+    prop_list = PropProfileReader(general_file_reader, 4000, 8000, 2).read(num_args_per_tstep_line=3)
+
+    assert [prop['time_step'] for prop in prop_list] == [4000, 6000, 8000]
+
+
+def test_empty_range_raises(profile_file_path):
+    with pytest.raises(ValueError, match='No data found'):
+        PropProfileReader(GeneralFileReader(profile_file_path), 20000, 30000).read(num_args_per_tstep_line=3)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src.modules.simulation.sim_data.data_processors.running_stats import RunningStats, BlockAverageAccumulator
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(3)
+    # A large offset checks the numerical stability of the variance.
+    return rng.normal(1e6, 2.0, size=(1003, 3)) * np.array([1.0, -1.0, 1e-3])
+
+
+def test_chunked_updates_match_numpy(rows):
+    running_stats = RunningStats(rows.shape[1])
+    for chunk_start, chunk_end in ((0, 1), (1, 400), (400, 401), (401, 401), (401, 1003)):
+        running_stats.update(rows[chunk_start:chunk_end])
+
+    np.testing.assert_array_equal(running_stats.count, len(rows))
+    np.testing.assert_allclose(running_stats.mean, rows.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(running_stats.std, rows.std(axis=0, ddof=1), rtol=1e-9)
+    np.testing.assert_allclose(running_stats.variance(ddof=0), rows.var(axis=0), rtol=1e-9)
+    np.testing.assert_allclose(running_stats.sem, rows.std(axis=0, ddof=1) / np.sqrt(len(rows)), rtol=1e-9)
+    np.testing.assert_array_equal(running_stats.min, rows.min(axis=0))
+    np.testing.assert_array_equal(running_stats.max, rows.max(axis=0))
+
+
+def test_merge_matches_single_stream(rows):
+    merged_stats = RunningStats(rows.shape[1]).update(rows[:300]).merge(RunningStats(rows.shape[1]).update(rows[300:]))
+    single_stats = RunningStats(rows.shape[1]).update(rows)
+
+    np.testing.assert_allclose(merged_stats.mean, single_stats.mean, rtol=1e-12)
+    np.testing.assert_allclose(merged_stats.std, single_stats.std, rtol=1e-9)
+    np.testing.assert_array_equal(merged_stats.min, single_stats.min)
+
+
+def test_nan_values_are_ignored_per_column(rows):
+    rows = rows.copy()
+    rows[[5, 600], 0] = np.nan
+    rows[:, 2] = np.nan
+    running_stats = RunningStats(rows.shape[1]).update(rows[:500]).update(rows[500:])
+
+    np.testing.assert_array_equal(running_stats.count, [len(rows) - 2, len(rows), 0])
+    np.testing.assert_allclose(running_stats.mean[:2], np.nanmean(rows[:, :2], axis=0), rtol=1e-12)
+    np.testing.assert_allclose(running_stats.std[:2], np.nanstd(rows[:, :2], axis=0, ddof=1), rtol=1e-9)
+    np.testing.assert_array_equal(running_stats.min[:2], np.nanmin(rows[:, :2], axis=0))
+    assert np.isnan(running_stats.mean[2]) and np.isnan(running_stats.std[2]) and np.isnan(running_stats.min[2])
+
+
+def test_empty_stream():
+    running_stats = RunningStats(2).update(np.empty((0, 2)))
+    np.testing.assert_array_equal(running_stats.count, 0)
+    assert np.isnan(running_stats.mean).all() and np.isnan(running_stats.std).all()
+
+
+@pytest.mark.parametrize('block_size', [1, 7, 100])
+def test_block_averages_match_numpy(rows, block_size):
+    block_averages = BlockAverageAccumulator(rows.shape[1], block_size)
+    for chunk_start in range(0, len(rows), 45):
+        block_averages.update(rows[chunk_start:chunk_start + 45])
+
+    # The rows of the incomplete last block are unused.
+    num_blocks = len(rows) // block_size
+    block_means = rows[:num_blocks * block_size].reshape(num_blocks, block_size, -1).mean(axis=1)
+    assert block_averages.num_blocks == num_blocks
+    np.testing.assert_allclose(block_averages.sem, block_means.std(axis=0, ddof=1) / np.sqrt(num_blocks), rtol=1e-7)
+
+
+def test_invalid_block_size():
+    with pytest.raises(ValueError):
+        BlockAverageAccumulator(1, 0)
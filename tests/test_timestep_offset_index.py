@@ -0,0 +1,131 @@
+import gzip
+import os
+
+import numpy as np
+import pandas as pd
+
+from utilities.files.file_reader import GeneralFileReader
+from src.modules.simulation.sim_file_reader.timestep_offset_index import TimeStepOffsetIndex
+from src.modules.simulation.sim_file_reader.global_timeavg_property_reader import GlobalTimeAvgPropertyReader
+from src.modules.simulation.sim_file_reader.prop_profile_data_reader import PropProfileReader
+
+
+def write_prop_file(file_path, time_steps):
+    with open(file_path, 'w') as prop_file:
+        prop_file.write('# Time-averaged data for fix props\n# TimeStep v_a v_b\n')
+        for time_step in time_steps:
+            prop_file.write(f'{time_step} {0.5 * time_step} {-time_step}\n')
+    return str(file_path)
+
+
+def write_chunk_file(file_path, time_steps, num_rows=3):
+    with open(file_path, 'w') as chunk_file:
+        chunk_file.write('# Time-averaged data for fix rdf\n# TimeStep Number-of-rows\n# Row c_rdf[1] c_rdf[2]\n')
+        for time_step in time_steps:
+            chunk_file.write(f'{time_step} {num_rows}\n')
+            for row_num in range(1, num_rows + 1):
+                chunk_file.write(f'{row_num} {0.1 * row_num} {time_step + row_num}\n')
+    return str(file_path)
+
+
+def read_full(file_path, time_step0):
+    data_df = GlobalTimeAvgPropertyReader(GeneralFileReader(file_path)).read(1)
+    return data_df[data_df['TimeStep'] > time_step0].reset_index(drop=True)
+
+
+def test_sorted_file_seeks_and_matches_full_parse(tmp_path):
+    prop_file_path = write_prop_file(tmp_path / 'props.prop', range(0, 20000, 10))
+    timestep_index = TimeStepOffsetIndex(prop_file_path)
+    start, _ = timestep_index.get_byte_range(initial_tstep=15000)
+    assert start > timestep_index.data_offset
+
+    data_df = GlobalTimeAvgPropertyReader(GeneralFileReader(prop_file_path)).read(1, 15000)
+    pd.testing.assert_frame_equal(data_df, read_full(prop_file_path, 15000))
+
+
+def test_restart_within_stride_matches_full_parse(tmp_path):
+    # The restart steps back by 100 records, less than one stride of the index.
+    prop_file_path = write_prop_file(tmp_path / 'restart.prop', list(range(1000)) + list(range(900, 2000)))
+    for _ in range(2):
+        # The second read uses the persisted index.
+        data_df = GlobalTimeAvgPropertyReader(GeneralFileReader(prop_file_path)).read(1, 950)
+        assert len(data_df) == 1098
+        pd.testing.assert_frame_equal(data_df, read_full(prop_file_path, 950))
+
+
+def test_projected_columns_after_seek(tmp_path):
+    prop_file_path = write_prop_file(tmp_path / 'props.prop', range(0, 20000, 10))
+    data_df = GlobalTimeAvgPropertyReader(GeneralFileReader(prop_file_path)).read(1, 15000, ['v_b'], np.float32)
+
+    expected_df = read_full(prop_file_path, 15000)[['TimeStep', 'v_b']].astype({'v_b': np.float32})
+    pd.testing.assert_frame_equal(data_df, expected_df)
+
+
+def test_compressed_file_is_filtered_without_index(tmp_path):
+    time_steps = list(range(0, 5000, 10))
+    prop_file_path = write_prop_file(tmp_path / 'props.prop', time_steps)
+    with open(prop_file_path, 'rb') as prop_file, gzip.open(prop_file_path + '.gz', 'wb') as compressed_file:
+        compressed_file.write(prop_file.read())
+
+    assert not TimeStepOffsetIndex.is_indexable(prop_file_path + '.gz')
+    data_df = GlobalTimeAvgPropertyReader(GeneralFileReader(prop_file_path + '.gz')).read(1, 2500)
+    pd.testing.assert_frame_equal(data_df, read_full(prop_file_path, 2500))
+    assert not os.path.exists(prop_file_path + '.gz' + TimeStepOffsetIndex.INDEX_FILE_SUFFIX)
+
+
+def test_read_and_reduce_use_the_same_rows(tmp_path):
+    prop_file_path = write_prop_file(tmp_path / 'props.prop', range(0, 20000, 10))
+    reader = GlobalTimeAvgPropertyReader(GeneralFileReader(prop_file_path))
+    data_df = reader.read(1, 15000)
+    assert data_df['TimeStep'].iloc[0] == 15010
+
+    stats = reader.reduce(1, 15000)
+    assert stats['v_a']['count'] == len(data_df)
+    assert np.isclose(stats['v_a']['mean'], data_df['v_a'].mean())
+
+
+def test_read_again_with_other_parameters(tmp_path):
+    prop_file_path = write_prop_file(tmp_path / 'props.prop', range(0, 20000, 10))
+    reader = GlobalTimeAvgPropertyReader(GeneralFileReader(prop_file_path))
+    data_df = reader.read(1, 15000)
+    assert reader.read(1, 15000) is data_df
+
+    pd.testing.assert_frame_equal(reader.read(1, 2500), read_full(prop_file_path, 2500))
+    assert list(reader.read(1, 2500, columns=['v_b']).columns) == ['TimeStep', 'v_b']
+    assert reader.read(1, 2500, float_dtype=np.float32)['v_a'].dtype == np.float32
+
+
+def test_persisted_index_keeps_order_of_all_records(tmp_path):
+    prop_file_path = write_prop_file(tmp_path / 'restart.prop', list(range(1000)) + list(range(900, 2000)))
+    timestep_index = TimeStepOffsetIndex(prop_file_path).load()
+    # The sampled records alone are sorted.
+    assert np.all(np.diff(timestep_index.time_steps) >= 0)
+    assert timestep_index.get_byte_range(initial_tstep=950) == (timestep_index.data_offset, None)
+
+    persisted_index = TimeStepOffsetIndex(prop_file_path)
+    assert persisted_index.get_byte_range(initial_tstep=950) == (timestep_index.data_offset, None)
+
+
+def test_changed_file_rebuilds_index(tmp_path):
+    prop_file_path = write_prop_file(tmp_path / 'props.prop', range(0, 5000, 10))
+    TimeStepOffsetIndex(prop_file_path).load()
+    write_prop_file(tmp_path / 'props.prop', list(range(0, 5000, 10)) + list(range(2000, 3000, 10)))
+
+    data_df = GlobalTimeAvgPropertyReader(GeneralFileReader(prop_file_path)).read(1, 2500)
+    pd.testing.assert_frame_equal(data_df, read_full(prop_file_path, 2500))
+
+
+def test_chunk_file_restart_matches_full_parse(tmp_path):
+    chunk_file_path = write_chunk_file(tmp_path / 'restart.rdf', list(range(0, 1000, 2)) + list(range(900, 2000, 2)))
+    indexed_reader = PropProfileReader(GeneralFileReader(chunk_file_path), 950, 10 ** 9)
+    indexed_reader.read(num_args_per_tstep_line=2)
+
+    # File lines read beforehand make the reader iterate over them instead of seeking.
+    general_file_reader = GeneralFileReader(chunk_file_path)
+    general_file_reader.read()
+    full_reader = PropProfileReader(general_file_reader, 950, 10 ** 9)
+    full_reader.read(num_args_per_tstep_line=2)
+
+    np.testing.assert_array_equal(indexed_reader.time_steps, full_reader.time_steps)
+    np.testing.assert_array_equal(indexed_reader.data_array, full_reader.data_array)
+    assert indexed_reader.time_steps[0] == 950
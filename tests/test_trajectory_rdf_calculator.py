@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from utilities.files.file_reader import GeneralFileReader
+from src.modules.parsers.molecular_trajectory_parsers.lmp_trj_parser import LAMMPSTrajParser
+from src.modules.simulation.properties.property_calculator.simcase.rdf.trajectory_rdf_calculator import \
+    TrajectoryRDFCalculator
+
+BOX_LO = np.array([-3.0, 0.0, 2.0])
+BOX_LENGTHS = np.array([12.0, 14.0, 13.0])
+
+
+def make_frames(num_frames=4, num_atoms=150, seed=1):
+    rng = np.random.default_rng(seed)
+    return [{'time-step': 100 * frame_num, 'types': rng.integers(1, 3, num_atoms),
+             'positions': BOX_LO + rng.uniform(0.0, 1.0, (num_atoms, 3)) * BOX_LENGTHS} for frame_num in range(num_frames)]
+
+
+def write_trajectory(file_path, frames, coordinates='x y z', boundary='pp pp pp', tilt=False):
+    with open(file_path, 'w') as trj_file:
+        for frame in frames:
+            positions = frame['positions']
+            if coordinates == 'xs ys zs':
+                positions = (positions - BOX_LO) / BOX_LENGTHS
+            elif coordinates == 'xu yu zu':
+                # Unwrapped coordinates of atoms that crossed the box a few times.
+                positions = positions + BOX_LENGTHS * np.arange(-1, 2)[np.arange(len(positions)) % 3, None]
+            trj_file.write(f'ITEM: TIMESTEP\n{frame["time-step"]}\nITEM: NUMBER OF ATOMS\n{len(positions)}\n')
+            trj_file.write(f'ITEM: BOX BOUNDS {"xy xz yz " if tilt else ""}{boundary}\n')
+            for lo, length in zip(BOX_LO, BOX_LENGTHS):
+                trj_file.write(f'{lo} {lo + length}{" 0.0" if tilt else ""}\n')
+            trj_file.write(f'ITEM: ATOMS id type {coordinates}\n')
+            for atom_num, (atom_type, position) in enumerate(zip(frame['types'], positions)):
+                trj_file.write(f'{atom_num + 1} {atom_type} {position[0]:.10f} {position[1]:.10f} {position[2]:.10f}\n')
+    return str(file_path)
+
+
+def brute_force_rdf(frames, types_a, types_b, num_bins, r_max, periodic=(True, True, True)):
+    histogram = np.zeros(num_bins)
+    pair_normalization = 0.0
+    num_central_atoms = 0
+    for frame in frames:
+        indices_a = np.flatnonzero(np.isin(frame['types'], types_a))
+        indices_b = np.flatnonzero(np.isin(frame['types'], types_b))
+        displacements = frame['positions'][indices_a][:, None] - frame['positions'][indices_b][None]
+        displacements -= np.where(periodic, BOX_LENGTHS * np.round(displacements / BOX_LENGTHS), 0.0)
+        distances = np.sqrt((displacements ** 2).sum(axis=-1))
+        # An atom in both selections is not its own neighbour.
+        is_self_pair = indices_a[:, None] == indices_b[None]
+        distances[is_self_pair] = np.inf
+        histogram += np.histogram(distances[distances < r_max], bins=num_bins, range=(0.0, r_max))[0]
+        pair_normalization += (len(indices_a) * len(indices_b) - is_self_pair.sum()) / np.prod(BOX_LENGTHS)
+        num_central_atoms += len(indices_a)
+
+    bin_edges = np.linspace(0.0, r_max, num_bins + 1)
+    shell_volumes = 4.0 / 3.0 * np.pi * np.diff(bin_edges ** 3)
+    return histogram / (pair_normalization * shell_volumes), np.cumsum(histogram) / num_central_atoms
+
+
+def calculate(file_path, *args, **kwargs):
+    return TrajectoryRDFCalculator(LAMMPSTrajParser(GeneralFileReader(file_path)), *args, **kwargs).calculate()
+
+
+@pytest.mark.parametrize('types_a, types_b', [([1], [1]), ([1], [2]), ([1, 2], [1, 2]), ([1, 2], [2]),
+                                             ([2], [2, 1])])
+@pytest.mark.parametrize('coordinates', ['x y z', 'xu yu zu', 'xs ys zs'])
+def test_matches_brute_force(tmp_path, types_a, types_b, coordinates):
+    frames = make_frames()
+    trj_file_path = write_trajectory(tmp_path / 'traj.lammpstrj', frames, coordinates)
+    rdf_list = calculate(trj_file_path, types_a, types_b, num_bins=30, r_max=5.5)
+
+    assert len(rdf_list) == 1 and rdf_list[0]['time_step'] == 300
+    rdf_df = rdf_list[0]['data']
+    assert list(rdf_df.columns) == ['Row', 'r', 'g(r)', 'n(r)']
+    expected_rdf, expected_coordination_numbers = brute_force_rdf(frames, types_a, types_b, 30, 5.5)
+    np.testing.assert_allclose(rdf_df['r'], (np.arange(30) + 0.5) * 5.5 / 30)
+    np.testing.assert_allclose(rdf_df['g(r)'], expected_rdf, rtol=1e-9)
+    np.testing.assert_allclose(rdf_df['n(r)'], expected_coordination_numbers, rtol=1e-9)
+
+
+def test_non_periodic_dimension_has_no_images(tmp_path):
+    frames = make_frames()
+    trj_file_path = write_trajectory(tmp_path / 'slab.lammpstrj', frames, boundary='pp pp fs')
+    rdf_df = calculate(trj_file_path, [1, 2], [1, 2], num_bins=25, r_max=5.0)[0]['data']
+
+    expected_rdf, expected_coordination_numbers = brute_force_rdf(frames, [1, 2], [1, 2], 25, 5.0,
+                                                                  periodic=(True, True, False))
+    np.testing.assert_allclose(rdf_df['g(r)'], expected_rdf, rtol=1e-9)
+    np.testing.assert_allclose(rdf_df['n(r)'], expected_coordination_numbers, rtol=1e-9)
+
+
+def test_chunked_queries_and_blocks(tmp_path, monkeypatch):
+    frames = make_frames()
+    trj_file_path = write_trajectory(tmp_path / 'traj.lammpstrj', frames)
+    # Queries of a few central atoms at a time give the same pairs.
+    monkeypatch.setattr(TrajectoryRDFCalculator, 'MAX_PAIRS_PER_QUERY', 50)
+    rdf_list = calculate(trj_file_path, 1, 1, num_bins=20, r_max=6.0, frames_per_block=3)
+
+    assert [rdf['time_step'] for rdf in rdf_list] == [200, 300]
+    for rdf, block_frames in zip(rdf_list, (frames[:3], frames[3:])):
+        expected_rdf, expected_coordination_numbers = brute_force_rdf(block_frames, [1], [1], 20, 6.0)
+        np.testing.assert_allclose(rdf['data']['g(r)'], expected_rdf, rtol=1e-9)
+        np.testing.assert_allclose(rdf['data']['n(r)'], expected_coordination_numbers, rtol=1e-9)
+
+
+def test_default_r_max_is_half_the_shortest_box_length(tmp_path):
+    trj_file_path = write_trajectory(tmp_path / 'traj.lammpstrj', make_frames(num_frames=1))
+    rdf_df = calculate(trj_file_path, 1, 2, num_bins=10)[0]['data']
+    assert rdf_df['r'].iloc[-1] == pytest.approx(0.5 * BOX_LENGTHS.min() * 0.95)
+
+
+def test_invalid_boxes_and_cutoffs(tmp_path):
+    frames = make_frames(num_frames=1)
+    with pytest.raises(ValueError, match='exceeds half'):
+        calculate(write_trajectory(tmp_path / 'traj.lammpstrj', frames), 1, 1, r_max=6.5)
+    with pytest.raises(ValueError, match='Triclinic'):
+        calculate(write_trajectory(tmp_path / 'tri.lammpstrj', frames, tilt=True), 1, 1)
+    with pytest.raises(ValueError, match='r_max must be given'):
+        calculate(write_trajectory(tmp_path / 'fff.lammpstrj', frames, boundary='ff ff ff'), 1, 1)